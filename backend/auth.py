@@ -1,19 +1,29 @@
 from __future__ import annotations
 
 from datetime import datetime, timedelta
-from typing import Optional
+from functools import lru_cache
+from typing import Any, Optional
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from .config import settings
-from .database import get_db
+from .database import get_async_read_db, get_read_db
 from . import models, schemas
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+# ``passlib``/bcrypt and ``jose`` are only imported the first time a password or
+# token is handled, keeping them off the application import path.
+@lru_cache(maxsize=1)
+def _password_context() -> Any:
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 
@@ -27,14 +37,16 @@ class CredentialsException(HTTPException):
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return _password_context().verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return _password_context().hash(password)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
+    from jose import jwt
+
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=settings.security.access_token_expire_minutes))
     to_encode.update({"exp": expire})
@@ -42,10 +54,9 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db),
-) -> models.User:
+def _username_from_token(token: str) -> str:
+    from jose import JWTError, jwt
+
     try:
         payload = jwt.decode(
             token,
@@ -58,8 +69,39 @@ def get_current_user(
         token_data = schemas.TokenData(username=username)
     except JWTError as exc:  # pragma: no cover - guard path
         raise CredentialsException() from exc
+    return token_data.username
+
+
+def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_read_db),
+) -> models.User:
+    username = _username_from_token(token)
+    user = db.query(models.User).filter(models.User.username == username).first()
+    if user is None:
+        raise CredentialsException()
+    return user
+
+
+async def get_current_user_async(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_read_db),
+) -> models.User:
+    return await user_for_username_async(db, _username_from_token(token))
+
+
+def get_token_username(token: str = Depends(oauth2_scheme)) -> str:
+    """Validate the bearer token without touching the database.
+
+    Used by conditional GETs so a ``304`` costs no queries; load the user with
+    :func:`user_for_username_async` before serving a full response.
+    """
+
+    return _username_from_token(token)
+
 
-    user = db.query(models.User).filter(models.User.username == token_data.username).first()
+async def user_for_username_async(db: AsyncSession, username: str) -> models.User:
+    user = await db.scalar(select(models.User).where(models.User.username == username))
     if user is None:
         raise CredentialsException()
     return user
@@ -1,12 +1,19 @@
 from __future__ import annotations
 
 import json
+import os
 from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict
 
 BASE_DIR = Path(__file__).resolve().parent.parent
-CONFIG_PATH = BASE_DIR / "config" / "settings.json"
+CONFIG_PATH = Path(os.environ.get("REQUIEM_SETTINGS_PATH") or BASE_DIR / "config" / "settings.json")
+# ``backend.serve`` sets this to "0" in all but one worker so background loops run once per host.
+BACKGROUND_TASKS_ENV = "REQUIEM_BACKGROUND_TASKS"
+
+
+def runs_background_tasks() -> bool:
+    return os.environ.get(BACKGROUND_TASKS_ENV, "1") != "0"
 
 
 class Settings:
@@ -42,4 +49,11 @@ def get_settings() -> Settings:
     return Settings(data)
 
 
-settings = get_settings()
+class _LazySettings:
+    """Module-level handle that defers reading settings.json until first use."""
+
+    def __getattr__(self, item: str) -> Any:
+        return getattr(get_settings(), item)
+
+
+settings = _LazySettings()
@@ -1,17 +1,217 @@
 from __future__ import annotations
 
+import logging
+import re
+import threading
+import time
 from contextlib import contextmanager
-from typing import Generator
+from contextvars import ContextVar
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, AsyncGenerator, Dict, Generator, Iterator, List
 
-from sqlalchemy import create_engine
+from sqlalchemy import MetaData, create_engine, event, inspect, text
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 from .config import settings
 
+_PRAGMA_NAME = re.compile(r"^[a-z_]+$")
+_PRAGMA_VALUE = re.compile(r"^-?\w+$")
+_ASYNC_DRIVERS = {"sqlite": "aiosqlite", "postgresql": "asyncpg"}
+
+slow_query_logger = logging.getLogger("backend.database.slow_query")
+
 DATABASE_URL = settings.database.url
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {})
+READ_DATABASE_URL = settings.database.get("read_url", default=None) or DATABASE_URL
+
+
+@dataclass(slots=True)
+class QueryStats:
+    """Query count and database time accumulated for one request or capture block."""
+
+    count: int = 0
+    total_seconds: float = 0.0
+    slowest_seconds: float = 0.0
+    slowest_statement: str | None = None
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.count += 1
+        self.total_seconds += elapsed
+        if elapsed > self.slowest_seconds:
+            self.slowest_seconds = elapsed
+            self.slowest_statement = statement
+
+
+_request_query_stats: ContextVar[QueryStats | None] = ContextVar("request_query_stats", default=None)
+_active_captures: List[QueryStats] = []
+_captures_lock = threading.Lock()
+
+
+def begin_request_query_stats() -> QueryStats:
+    """Start accumulating query stats for the current request context."""
+
+    stats = QueryStats()
+    _request_query_stats.set(stats)
+    return stats
+
+
+@contextmanager
+def capture_queries() -> Iterator[QueryStats]:
+    """Count every statement executed by any engine, on any thread, inside the block."""
+
+    stats = QueryStats()
+    with _captures_lock:
+        _active_captures.append(stats)
+    try:
+        yield stats
+    finally:
+        with _captures_lock:
+            _active_captures.remove(stats)
+
+
+@lru_cache(maxsize=1)
+def _slow_query_threshold() -> float | None:
+    threshold_ms = settings.get("sql_instrumentation", "slow_query_ms", default=None)
+    return float(threshold_ms) / 1000 if threshold_ms is not None else None
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany) -> None:  # noqa: ARG001
+    conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record_query_time(conn, cursor, statement, parameters, context, executemany) -> None:  # noqa: ARG001
+    started = conn.info["query_started_at"].pop()
+    elapsed = time.perf_counter() - started
+
+    stats = _request_query_stats.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+    if _active_captures:
+        with _captures_lock:
+            for capture in _active_captures:
+                capture.record(statement, elapsed)
+
+    threshold = _slow_query_threshold()
+    if threshold is not None and elapsed >= threshold:
+        slow_query_logger.warning("Slow query (%.1f ms): %s", elapsed * 1000, " ".join(statement.split()))
+
+
+@event.listens_for(Engine, "handle_error")
+def _discard_query_timer(exception_context) -> None:
+    connection = exception_context.connection
+    timers = connection.info.get("query_started_at") if connection is not None else None
+    if timers:
+        timers.pop()
+
+
+def _is_sqlite(url: str) -> bool:
+    return url.startswith("sqlite")
+
+
+def _is_memory_sqlite(url: str) -> bool:
+    return _is_sqlite(url) and (url.rstrip("/").endswith("sqlite:") or ":memory:" in url or "mode=memory" in url)
+
+
+def _pool_options(pool_settings: Dict[str, Any] | None) -> Dict[str, Any]:
+    pool_settings = pool_settings or {}
+    options: Dict[str, Any] = {}
+    if "size" in pool_settings:
+        options["pool_size"] = int(pool_settings["size"])
+    if "max_overflow" in pool_settings:
+        options["max_overflow"] = int(pool_settings["max_overflow"])
+    if "timeout_seconds" in pool_settings:
+        options["pool_timeout"] = float(pool_settings["timeout_seconds"])
+    if "recycle_seconds" in pool_settings:
+        options["pool_recycle"] = int(pool_settings["recycle_seconds"])
+    if "pre_ping" in pool_settings:
+        options["pool_pre_ping"] = bool(pool_settings["pre_ping"])
+    return options
+
+
+def _install_sqlite_pragmas(target: Engine, pragmas: Dict[str, Any], *, read_only: bool) -> None:
+    statements = []
+    for name, value in pragmas.items():
+        rendered = str(value)
+        if not _PRAGMA_NAME.match(name) or not _PRAGMA_VALUE.match(rendered):
+            raise ValueError(f"Invalid SQLite pragma in config/settings.json: {name}={value}")
+        statements.append(f"PRAGMA {name}={rendered}")
+    if read_only:
+        statements.append("PRAGMA query_only=ON")
+
+    @event.listens_for(target, "connect")
+    def _apply_pragmas(dbapi_connection, connection_record) -> None:  # noqa: ARG001 - event signature
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+
+
+def _engine_options(url: str, pool_key: str) -> Dict[str, Any]:
+    database_settings = settings.get("database", default={}) or {}
+    if _is_sqlite(url):
+        busy_timeout_ms = int((database_settings.get("sqlite_pragmas") or {}).get("busy_timeout", 5000))
+        return {"connect_args": {"check_same_thread": False, "timeout": busy_timeout_ms / 1000}}
+    return _pool_options(database_settings.get(pool_key))
+
+
+def _configure_engine(target: Engine, url: str, *, read_only: bool) -> Engine:
+    if _is_sqlite(url) and not _is_memory_sqlite(url):
+        pragmas = settings.get("database", "sqlite_pragmas", default={}) or {}
+        _install_sqlite_pragmas(target, pragmas, read_only=read_only)
+    return target
+
+
+def build_engine(url: str, *, pool_key: str = "pool", read_only: bool = False) -> Engine:
+    return _configure_engine(create_engine(url, **_engine_options(url, pool_key)), url, read_only=read_only)
+
+
+def async_database_url(url: str) -> str:
+    """Swap the sync DBAPI driver in ``url`` for its asyncio counterpart."""
+
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    driver = _ASYNC_DRIVERS.get(backend)
+    if driver is None or parsed.get_driver_name() == driver:
+        return url
+    return parsed.set(drivername=f"{backend}+{driver}").render_as_string(hide_password=False)
+
+
+def build_async_engine(url: str, *, pool_key: str = "pool", read_only: bool = False) -> AsyncEngine:
+    async_url = async_database_url(url)
+    built = create_async_engine(async_url, **_engine_options(url, pool_key))
+    _configure_engine(built.sync_engine, url, read_only=read_only)
+    return built
+
+
+engine = build_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# In-memory SQLite databases are per-connection, so reads must share the writer engine.
+if _is_memory_sqlite(DATABASE_URL):
+    read_engine = engine
+else:
+    read_engine = build_engine(READ_DATABASE_URL, pool_key="read_pool", read_only=True)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+# Async engines are built on first use so deployments without an asyncio driver
+# installed can still import the sync layer.
+AsyncSessionLocal = async_sessionmaker(autoflush=False, expire_on_commit=False)
+
+
+@lru_cache(maxsize=None)
+def get_async_engine(read_only: bool = False) -> AsyncEngine:
+    if not read_only:
+        return build_async_engine(DATABASE_URL)
+    if _is_memory_sqlite(DATABASE_URL):
+        return get_async_engine(read_only=False)
+    return build_async_engine(READ_DATABASE_URL, pool_key="read_pool", read_only=True)
+
 
 @contextmanager
 def session_scope() -> Generator:
@@ -26,6 +226,109 @@ def session_scope() -> Generator:
         session.close()
 
 
+@contextmanager
+def read_session_scope() -> Generator:
+    """Session bound to the read engine; never commits."""
+
+    session = ReadSessionLocal()
+    try:
+        yield session
+    finally:
+        session.rollback()
+        session.close()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal(bind=get_async_engine()) as session:
+        try:
+            yield session
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
+
+
+async def get_async_read_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal(bind=get_async_engine(read_only=True)) as session:
+        try:
+            yield session
+        finally:
+            await session.rollback()
+
+
 def get_db() -> Generator:
     with session_scope() as session:
         yield session
+
+
+def get_read_db() -> Generator:
+    with read_session_scope() as session:
+        yield session
+
+
+def _column_default_sql(column) -> str | None:
+    if column.server_default is None:
+        return None
+    arg = getattr(column.server_default, "arg", None)
+    if isinstance(arg, str):
+        return "'" + arg.replace("'", "''") + "'"
+    return getattr(arg, "text", None)
+
+
+def sync_schema(metadata: MetaData, bind: Engine | None = None) -> None:
+    """Create missing tables, columns and indexes introduced since the database was created.
+
+    Only additive changes are handled; new non-nullable columns must declare a
+    ``server_default`` so existing rows can be backfilled by ``ALTER TABLE``.
+    """
+
+    bind = bind or engine
+    metadata.create_all(bind=bind)
+    inspector = inspect(bind)
+    with bind.begin() as connection:
+        for table in metadata.sorted_tables:
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                ddl = f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(bind.dialect)}"
+                default_sql = _column_default_sql(column)
+                if default_sql is not None:
+                    ddl += f" DEFAULT {default_sql}"
+                    if not column.nullable:
+                        ddl += " NOT NULL"
+                connection.execute(text(ddl))
+            for index in table.indexes:
+                index.create(connection, checkfirst=True)
+
+
+async def begin_snapshot_async(db: AsyncSession) -> None:
+    """Make the following reads in ``db`` see one consistent snapshot; call before any query."""
+
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        # The sqlite3 driver only opens a transaction before DML, so without an
+        # explicit BEGIN each SELECT would read the latest commit on its own.
+        await db.execute(text("BEGIN"))
+    elif dialect == "postgresql":
+        await db.execute(text("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ"))
+
+
+def reset_engines_after_fork() -> None:
+    """Drop pooled connections inherited from a parent process without closing them for it."""
+
+    engine.dispose(close=False)
+    if read_engine is not engine:
+        read_engine.dispose(close=False)
+    if get_async_engine.cache_info().currsize:
+        for read_only in (False, True):
+            get_async_engine(read_only=read_only).sync_engine.dispose(close=False)
+        get_async_engine.cache_clear()
+
+
+async def dispose_async_engines() -> None:
+    if get_async_engine.cache_info().currsize == 0:
+        return
+    for read_only in (False, True):
+        await get_async_engine(read_only=read_only).dispose()
+    get_async_engine.cache_clear()
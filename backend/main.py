@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import logging
 from pathlib import Path
 from typing import List
 
@@ -7,48 +8,46 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 
-from .config import settings
-from .database import SessionLocal, engine
-from .models import Base, Task
+from .config import runs_background_tasks, settings
+from .database import dispose_async_engines
+from .migrate import ensure_migrated
 from .routers import auth as auth_router
+from .routers import bootstrap as bootstrap_router
 from .routers import chat as chat_router
+from .routers import export as export_router
 from .routers import progress as progress_router
 from .routers import monitoring as monitoring_router
+from .services.compression import CompressionConfig, CompressionMiddleware
+from .services.generation_reaper import get_reaper
+from .services.ingest import create_listener_from_config
+from .services.profiler import ProfilingConfig, ProfilingMiddleware, profile_store_from_config
+from .services.reply_queue import get_worker_pool
+from .services.serialization import json_response_class
+from .services.sql_instrumentation import SQLInstrumentationMiddleware
 from .services.telemetry_agent import create_agent_from_config
 
-app = FastAPI(title=settings.app.name, version=settings.app.version)
+logger = logging.getLogger(__name__)
+
+app = FastAPI(
+    title=settings.app.name,
+    version=settings.app.version,
+    default_response_class=json_response_class(),
+)
 
 telemetry_agent = create_agent_from_config()
+ingest_listener = create_listener_from_config()
 
 
 @app.on_event("startup")
 def on_startup() -> None:
-    Base.metadata.create_all(bind=engine)
-
-    # Ensure progress tasks exist based on config
-    from sqlalchemy.orm import Session
-
-    session: Session = SessionLocal()
-    try:
-        existing_tasks = {task.name: task for task in session.query(Task).all()}
-        for entry in settings.progress:
-            task = existing_tasks.get(entry["name"])
-            if task:
-                task.progress = entry.get("progress", task.progress)
-                task.description = entry.get("description", task.description)
-            else:
-                session.add(
-                    Task(
-                        name=entry["name"],
-                        progress=entry.get("progress", 0),
-                        description=entry.get("description"),
-                    )
-                )
-        session.commit()
-    finally:
-        session.close()
-
-    telemetry_agent.start()
+    ensure_migrated()
+    if runs_background_tasks():
+        telemetry_agent.start()
+        get_reaper().start()
+        # Only one process can own the ingest port.
+        ingest_listener.start()
+    # Jobs are claimed atomically, so every process can drain the shared queue.
+    get_worker_pool().start()
 
 origins: List[str] = list(settings.cors.allowed_origins)
 app.add_middleware(
@@ -59,10 +58,31 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.get("sql_instrumentation", "enabled", default=True):
+    app.add_middleware(SQLInstrumentationMiddleware)
+
+# The profiler is only wired in when enabled, so unprofiled deployments pay nothing.
+profiling_config = ProfilingConfig.from_settings()
+if profiling_config.enabled:
+    if len(profiling_config.token) < 16 or "change" in profiling_config.token.lower():
+        logger.warning("Request profiling is enabled but profiling.token is unset or a placeholder; not installing it.")
+    else:
+        app.add_middleware(
+            ProfilingMiddleware,
+            config=profiling_config,
+            store=profile_store_from_config(profiling_config),
+        )
+
+compression_config = CompressionConfig.from_settings()
+if compression_config.enabled:
+    app.add_middleware(CompressionMiddleware, config=compression_config)
+
 app.include_router(auth_router.router)
 app.include_router(chat_router.router)
 app.include_router(progress_router.router)
 app.include_router(monitoring_router.router)
+app.include_router(export_router.router)
+app.include_router(bootstrap_router.router)
 
 
 @app.get("/health")
@@ -73,13 +93,19 @@ def health() -> dict[str, str]:
 @app.on_event("shutdown")
 def on_shutdown() -> None:
     telemetry_agent.stop()
+    get_reaper().stop()
+    ingest_listener.stop()
+    get_worker_pool().stop()
+
+
+@app.on_event("shutdown")
+async def dispose_database_engines() -> None:
+    await dispose_async_engines()
 
 
-config_path = Path(__file__).resolve().parent.parent / "config"
 media_path = Path(settings.files.media_root)
 media_path.mkdir(parents=True, exist_ok=True)
 
-app.mount("/config", StaticFiles(directory=config_path), name="config")
 app.mount("/media", StaticFiles(directory=media_path), name="media")
 
 frontend_dist = Path(__file__).resolve().parent.parent / "frontend" / "dist"
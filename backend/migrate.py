@@ -0,0 +1,107 @@
+"""One-time schema and seed reconciliation.
+
+Run ``python -m backend.migrate`` once per deploy, before starting workers. When
+``database.auto_migrate`` is enabled, application startup only performs a single
+fingerprint lookup and migrates when the schema or seed configuration changed.
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import logging
+
+from sqlalchemy import select
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from .config import settings
+from .database import engine, sync_schema
+from .models import AppMetadata, Base
+from .services import progress_tracker, search
+
+logger = logging.getLogger(__name__)
+
+FINGERPRINT_KEY = "migration_fingerprint"
+
+
+def migration_fingerprint() -> str:
+    schema = {
+        table.name: sorted(column.name for column in table.columns)
+        for table in Base.metadata.sorted_tables
+    }
+    payload = {
+        "schema": schema,
+        "seed": getattr(settings, "progress", None) or [],
+        "search_index": search.INDEX_VERSION,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _stored_fingerprint(bind: Engine) -> str | None:
+    try:
+        with bind.connect() as connection:
+            return connection.execute(
+                select(AppMetadata.value).where(AppMetadata.key == FINGERPRINT_KEY)
+            ).scalar_one_or_none()
+    except SQLAlchemyError:
+        # Missing table on a fresh database.
+        return None
+
+
+def is_current(bind: Engine | None = None) -> bool:
+    return _stored_fingerprint(bind or engine) == migration_fingerprint()
+
+
+def run_migrations(bind: Engine | None = None, *, force: bool = False) -> bool:
+    """Bring the schema and seed tasks up to date; returns ``True`` if work was done."""
+
+    bind = bind or engine
+    fingerprint = migration_fingerprint()
+    if not force and _stored_fingerprint(bind) == fingerprint:
+        return False
+
+    sync_schema(Base.metadata, bind=bind)
+    search.ensure_search_index(bind)
+    with Session(bind=bind, autoflush=False) as session, session.begin():
+        progress_tracker.seed_tasks_from_config(session)
+        session.merge(AppMetadata(key=FINGERPRINT_KEY, value=fingerprint))
+    logger.info("Database schema and seed tasks reconciled (fingerprint %s).", fingerprint[:12])
+    return True
+
+
+def ensure_migrated() -> None:
+    if not settings.get("database", "auto_migrate", default=True):
+        return
+    try:
+        run_migrations()
+    except SQLAlchemyError:
+        # Another worker may have migrated concurrently; only fail if still behind.
+        if not is_current():
+            raise
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Apply schema changes and seed tasks from config/settings.json")
+    parser.add_argument("--force", action="store_true", help="Reconcile even if the stored fingerprint matches")
+    parser.add_argument("--check", action="store_true", help="Exit non-zero if a migration is pending")
+    parser.add_argument(
+        "--rebuild-search", action="store_true", help="Re-index all chat messages for /chat/search and exit"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if args.check:
+        raise SystemExit(0 if is_current() else 1)
+    if args.rebuild_search:
+        run_migrations()
+        search.rebuild_search_index(engine)
+        print("Chat search index rebuilt.")
+        return
+    if not run_migrations(force=args.force):
+        print("Database already up to date.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,12 @@
 from __future__ import annotations
 
-from datetime import datetime
+import json
+import zlib
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Iterable
 
-from sqlalchemy import DateTime, ForeignKey, Integer, String, Text, UniqueConstraint
+from sqlalchemy import Date, DateTime, Float, ForeignKey, Index, Integer, LargeBinary, String, Text, UniqueConstraint
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 
@@ -25,6 +29,8 @@ class User(Base):
 
 class Message(Base):
     __tablename__ = "messages"
+    # Lets the history buffer's per-user tail check seek straight to the user's newest rows.
+    __table_args__ = (Index("ix_messages_user_id_id", "user_id", "id"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"))
@@ -35,6 +41,87 @@ class Message(Base):
     user: Mapped[User] = relationship(back_populates="messages")
 
 
+@dataclass(frozen=True, slots=True)
+class ArchivedMessage:
+    """Read-only view of a message stored in the cold tier; mirrors ``Message``'s columns."""
+
+    id: int
+    user_id: int
+    role: str
+    content: str
+    created_at: datetime
+
+
+class MessageArchive(Base):
+    """One user's messages for one day, compressed as a single blob."""
+
+    __tablename__ = "message_archives"
+    __table_args__ = (Index("ix_message_archives_user_last_id", "user_id", "last_message_id"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    day: Mapped[date] = mapped_column(Date, nullable=False, index=True)
+    first_message_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    last_message_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    first_created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    last_created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    message_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    codec: Mapped[str] = mapped_column(String(16), nullable=False, default="zlib")
+    raw_bytes: Mapped[int] = mapped_column(Integer, nullable=False)
+    payload: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+    @staticmethod
+    def pack(messages: Iterable[Message | ArchivedMessage], level: int = 6) -> tuple[bytes, int]:
+        """Serialise messages to a zlib blob; returns ``(payload, uncompressed_size)``."""
+
+        raw = json.dumps(
+            [[message.id, message.role, message.content, message.created_at.isoformat()] for message in messages],
+            ensure_ascii=False,
+            separators=(",", ":"),
+        ).encode("utf-8")
+        return zlib.compress(raw, level), len(raw)
+
+    @property
+    def messages(self) -> list[ArchivedMessage]:
+        if self.codec != "zlib":
+            raise ValueError(f"Unsupported message archive codec '{self.codec}'")
+        return [
+            ArchivedMessage(
+                id=message_id,
+                user_id=self.user_id,
+                role=role,
+                content=content,
+                created_at=datetime.fromisoformat(created_at),
+            )
+            for message_id, role, content, created_at in json.loads(zlib.decompress(self.payload))
+        ]
+
+
+class ReplyJob(Base):
+    """A queued AI reply; rows persist so pending work survives restarts.
+
+    Message ids are plain integers rather than foreign keys because messages can
+    later move to the archive tier.
+    """
+
+    __tablename__ = "reply_jobs"
+    __table_args__ = (Index("ix_reply_jobs_status_id", "status", "id"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    message_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    prompt: Mapped[str] = mapped_column(Text, nullable=False)
+    status: Mapped[str] = mapped_column(String(16), nullable=False, default="queued")
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    reply_message_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    started_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    lease_expires_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
+
 class Task(Base):
     __tablename__ = "tasks"
     __table_args__ = (UniqueConstraint("name", name="uq_task_name"),)
@@ -43,7 +130,17 @@ class Task(Base):
     name: Mapped[str] = mapped_column(String(120), nullable=False)
     progress: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
     description: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1, server_default="1")
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Running velocity estimate maintained by ``services.forecast`` (points per second).
+    velocity: Mapped[float | None] = mapped_column(Float, nullable=True)
+    velocity_variance: Mapped[float] = mapped_column(Float, nullable=False, default=0.0, server_default="0")
+    velocity_samples: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    velocity_sampled_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    velocity_sampled_progress: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    # ``POST /progress/reset`` starts a new generation instead of deleting rows;
+    # see ``progress_tracker.active_generation``.
+    generation: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0", index=True)
 
     events: Mapped[list["TaskEvent"]] = relationship(
         back_populates="task", cascade="all, delete-orphan", lazy="selectin"
@@ -59,9 +156,18 @@ class TaskEvent(Base):
     source: Mapped[str] = mapped_column(String(120), nullable=False, default="api")
     note: Mapped[str | None] = mapped_column(String(255), nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, index=True)
+    generation: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0", index=True)
 
     task: Mapped[Task] = relationship(back_populates="events")
 
     @property
     def task_name(self) -> str:
         return self.task.name if self.task else ""
+
+
+class AppMetadata(Base):
+    __tablename__ = "app_metadata"
+
+    key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    value: Mapped[str] = mapped_column(String(255), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, Query, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .. import auth as auth_utils
+from .. import schemas
+from ..config import settings
+from ..database import begin_snapshot_async, get_async_read_db
+from ..services import bootstrap, data_version, http_cache, serialization
+
+router = APIRouter(prefix="/bootstrap", tags=["bootstrap"])
+
+PUBLIC_CONFIG_MAX_AGE = 300
+
+
+@router.get("", response_model=schemas.Bootstrap)
+async def get_bootstrap(
+    request: Request,
+    history_limit: int = Query(100, ge=1, le=200),
+    username: str = Depends(auth_utils.get_token_username),
+    db: AsyncSession = Depends(get_async_read_db),
+) -> Response:
+    """Profile, progress, recent chat history, analytics and public config in one response."""
+
+    event_limit = int(settings.get("progress_settings", "event_history_limit", default=20))
+    etag, not_modified = http_cache.conditional_etag(
+        request,
+        (*data_version.PROGRESS_TABLES, *data_version.MESSAGE_TABLES),
+        variant=f"bootstrap:{username}:{history_limit}:{event_limit}:{bootstrap.public_config_etag()}",
+    )
+    if not_modified is not None:
+        return not_modified
+
+    await begin_snapshot_async(db)
+    current_user = await auth_utils.user_for_username_async(db, username)
+    payload = await bootstrap.build_bootstrap_async(
+        db, user=current_user, history_limit=history_limit, event_limit=event_limit
+    )
+    response = serialization.json_response(payload)
+    http_cache.set_etag(response, etag)
+    return response
+
+
+@router.get("/config", response_model=schemas.PublicConfig)
+def get_public_config(request: Request) -> Response:
+    """Browser-facing settings subset; needed before login, so unauthenticated and cacheable."""
+
+    etag = bootstrap.public_config_etag()
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={PUBLIC_CONFIG_MAX_AGE}"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return serialization.json_response(bootstrap.public_config(), headers=headers)
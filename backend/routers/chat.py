@@ -1,16 +1,25 @@
 from __future__ import annotations
 
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, Query, status
-from sqlalchemy import desc
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from .. import auth as auth_utils
 from .. import models, schemas
 from ..config import settings
-from ..database import get_db
-from ..services import progress_tracker
+from ..database import get_async_db, get_async_read_db, get_db
+from ..services import (
+    archive,
+    data_version,
+    history_cache,
+    http_cache,
+    progress_tracker,
+    reply_queue,
+    search,
+    serialization,
+)
 from ..services.responder import generate_ai_response
 
 
@@ -31,33 +40,64 @@ router = APIRouter(prefix="/chat", tags=["chat"])
 
 
 @router.get("/history", response_model=List[schemas.MessageResponse])
-def chat_history(
+async def chat_history(
+    request: Request,
     limit: int = Query(50, ge=1, le=200),
-    current_user: models.User = Depends(auth_utils.get_current_user),
-    db: Session = Depends(get_db),
-) -> List[schemas.MessageResponse]:
-    messages = (
-        db.query(models.Message)
-        .filter(models.Message.user_id == current_user.id)
-        .order_by(desc(models.Message.created_at))
-        .limit(limit)
-        .all()
+    before: Optional[int] = Query(None, ge=1, description="Only return messages with an id below this one"),
+    username: str = Depends(auth_utils.get_token_username),
+    db: AsyncSession = Depends(get_async_read_db),
+) -> Response:
+    etag, not_modified = http_cache.conditional_etag(
+        request, data_version.MESSAGE_TABLES, variant=f"{username}:{limit}:{before}"
+    )
+    if not_modified is not None:
+        return not_modified
+
+    cache = history_cache.get_history_cache()
+    # Taken before any query, like the ETag, so a concurrent write can only make the buffer look stale.
+    version = data_version.DATA_VERSIONS.current(data_version.MESSAGE_TABLES)
+    messages = cache.read(username, limit=limit, before=before, version=version) if cache.enabled else None
+    if messages is not None:
+        history_cache.LOOKUPS.inc(outcome="hit")
+    else:
+
+        async def user_id_for() -> int:
+            return (await auth_utils.user_for_username_async(db, username)).id
+
+        if cache.enabled:
+            messages = await history_cache.history_page_async(
+                db, cache=cache, username=username, user_id_for=user_id_for, limit=limit, before=before, version=version
+            )
+        else:
+            user_id = await user_id_for()
+            messages = await archive.message_history_async(db, user_id=user_id, limit=limit, before_id=before)
+    response = serialization.json_response(messages)
+    http_cache.set_etag(response, etag)
+    return response
+
+
+@router.get("/search", response_model=schemas.MessageSearchPage)
+async def search_history(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, max_length=200),
+    current_user: models.User = Depends(auth_utils.get_current_user_async),
+    db: AsyncSession = Depends(get_async_read_db),
+) -> schemas.MessageSearchPage:
+    try:
+        hits, next_cursor = await search.search_messages_async(
+            db, user_id=current_user.id, query=q, limit=limit, cursor=cursor
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    return schemas.MessageSearchPage(
+        results=[schemas.MessageSearchHit.model_validate(hit) for hit in hits], next_cursor=next_cursor
     )
-    return list(reversed(messages))
 
 
-@router.post("/message", response_model=List[schemas.MessageResponse], status_code=status.HTTP_201_CREATED)
-def post_message(
-    message: schemas.MessageCreate,
-    current_user: models.User = Depends(auth_utils.get_current_user),
-    db: Session = Depends(get_db),
-) -> List[schemas.MessageResponse]:
-    content = message.content.strip()
+def _save_user_message(db: Session, current_user: models.User, content: str) -> models.Message:
     user_message = models.Message(user_id=current_user.id, role="user", content=content)
-    ai_content = generate_ai_response(message.content)
-    ai_message = models.Message(user_id=current_user.id, role="ai", content=ai_content)
-
-    db.add_all([user_message, ai_message])
+    db.add(user_message)
     db.flush()
 
     annotations = progress_tracker.extract_progress_annotations(content)
@@ -66,20 +106,60 @@ def post_message(
     if progress_settings is not None:
         annotation_source = progress_settings.get("chat_annotation_source", default="chat-annotation")
 
-    for annotation in annotations:
-        task = progress_tracker.get_or_create_task(db, annotation.task_name)
-        note = annotation.note or f"Reported from chat message #{user_message.id}"
-        progress_tracker.apply_progress_event(
-            db,
-            task=task,
-            progress_value=annotation.progress,
-            source=annotation_source,
-            note=note,
-        )
+    progress_tracker.apply_annotations(
+        db,
+        annotations,
+        source=annotation_source,
+        default_note=f"Reported from chat message #{user_message.id}",
+    )
 
     advance_task_progress(db, skip_auto=bool(annotations))
+    return user_message
+
+
+@router.post("/message", response_model=List[schemas.MessageResponse], status_code=status.HTTP_201_CREATED)
+def post_message(
+    message: schemas.MessageCreate,
+    current_user: models.User = Depends(auth_utils.get_current_user),
+    db: Session = Depends(get_db),
+) -> List[schemas.MessageResponse]:
+    ai_content = generate_ai_response(message.content)
+    user_message = _save_user_message(db, current_user, message.content.strip())
+    ai_message = models.Message(user_id=current_user.id, role="ai", content=ai_content)
+    db.add(ai_message)
     db.commit()
     db.refresh(user_message)
     db.refresh(ai_message)
+    history_cache.get_history_cache().append(current_user.id, [user_message, ai_message])
 
     return [user_message, ai_message]
+
+
+@router.post("/jobs", response_model=schemas.ReplyJobResponse, status_code=status.HTTP_202_ACCEPTED)
+def enqueue_message(
+    message: schemas.MessageCreate,
+    response: Response,
+    current_user: models.User = Depends(auth_utils.get_current_user),
+    db: Session = Depends(get_db),
+) -> schemas.ReplyJobResponse:
+    """Store the user message now and generate the AI reply in the background."""
+
+    user_message = _save_user_message(db, current_user, message.content.strip())
+    job = reply_queue.enqueue_reply(db, user_id=current_user.id, message_id=user_message.id, prompt=message.content)
+    db.commit()
+    history_cache.get_history_cache().append(current_user.id, [user_message])
+    reply_queue.notify_workers()
+    response.headers["Location"] = f"/chat/jobs/{job.id}"
+    return schemas.ReplyJobResponse.model_validate(reply_queue.job_payload(job))
+
+
+@router.get("/jobs/{job_id}", response_model=schemas.ReplyJobResponse)
+async def reply_job_status(
+    job_id: int,
+    current_user: models.User = Depends(auth_utils.get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+) -> schemas.ReplyJobResponse:
+    payload = await reply_queue.job_status_async(db, job_id=job_id, user_id=current_user.id)
+    if payload is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Reply job not found")
+    return schemas.ReplyJobResponse.model_validate(payload)
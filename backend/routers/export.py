@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Callable, Iterator, Literal, Sequence
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from .. import auth as auth_utils
+from .. import models
+from ..database import read_session_scope
+from ..services import exporter
+
+router = APIRouter(prefix="/export", tags=["export"])
+
+
+def _streaming_export(
+    dataset: str,
+    columns: Sequence[str],
+    build_rows: Callable[[Session, exporter.ExportFilters], Iterator[Sequence[Any]]],
+    filters: exporter.ExportFilters,
+    export_format: str,
+    compress: bool,
+) -> StreamingResponse:
+    # The session lives inside the generator: request-scoped dependencies are torn
+    # down before the body is streamed, which would close the cursor mid-export.
+    def rows() -> Iterator[Sequence[Any]]:
+        with read_session_scope() as session:
+            yield from build_rows(session, filters)
+
+    body = exporter.encode_rows(columns, rows(), export_format=export_format, compress=compress)
+    filename = exporter.filename_for(dataset, export_format, compress)
+    return StreamingResponse(
+        body,
+        media_type=exporter.media_type_for(export_format, compress),
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get("/events")
+def export_task_events(
+    export_format: Literal["csv", "ndjson"] = Query("ndjson", alias="format"),
+    gzip: bool = Query(False),
+    since: datetime | None = Query(None),
+    until: datetime | None = Query(None),
+    task: str | None = Query(None, max_length=120),
+    current_user: models.User = Depends(auth_utils.get_current_user),
+) -> StreamingResponse:
+    filters = exporter.ExportFilters(since=since, until=until, task_name=task)
+    return _streaming_export(
+        "task-events",
+        exporter.EVENT_COLUMNS,
+        exporter.task_event_rows,
+        filters,
+        export_format,
+        gzip,
+    )
+
+
+@router.get("/messages")
+def export_messages(
+    export_format: Literal["csv", "ndjson"] = Query("ndjson", alias="format"),
+    gzip: bool = Query(False),
+    since: datetime | None = Query(None),
+    until: datetime | None = Query(None),
+    current_user: models.User = Depends(auth_utils.get_current_user),
+) -> StreamingResponse:
+    # Only the caller's own conversation; exporting every user is left to scripts/export_history.py.
+    filters = exporter.ExportFilters(since=since, until=until, username=current_user.username)
+    return _streaming_export(
+        "messages",
+        exporter.MESSAGE_COLUMNS,
+        exporter.message_rows,
+        filters,
+        export_format,
+        gzip,
+    )
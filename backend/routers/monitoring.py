@@ -1,21 +1,29 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends
-from fastapi.responses import PlainTextResponse
-from sqlalchemy.orm import Session
+from dataclasses import asdict
+from typing import List
 
-from ..database import get_db
-from ..services.analytics import compute_progress_analytics
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import FileResponse, PlainTextResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .. import auth as auth_utils
+from .. import models, schemas
+from ..database import get_async_read_db
+from ..services.analytics import compute_progress_analytics_async
+from ..services.metrics import REGISTRY, escape_label_value
+from ..services.profiler import profile_store_from_config
+from ..services.reply_queue import queue_depths_async
 
 
 router = APIRouter(prefix="/monitoring", tags=["monitoring"])
 
 
 @router.get("/metrics", response_class=PlainTextResponse)
-def metrics(db: Session = Depends(get_db)) -> str:
+async def metrics(db: AsyncSession = Depends(get_async_read_db)) -> str:
     """Expose Prometheus-style metrics for external monitoring systems."""
 
-    analytics = compute_progress_analytics(db)
+    analytics = await compute_progress_analytics_async(db)
 
     lines = [
         "# HELP requiem_tasks_total Total number of tasks tracked by Requiem.",
@@ -52,8 +60,9 @@ def metrics(db: Session = Depends(get_db)) -> str:
             ]
         )
 
+    task_labels = {entry.name: f'task="{escape_label_value(entry.name)}"' for entry in analytics.per_task}
     for entry in analytics.per_task:
-        labels = f'task="{entry.name}"'
+        labels = task_labels[entry.name]
         lines.append(
             f"requiem_task_progress{{{labels}}} {entry.progress}"
         )
@@ -65,5 +74,52 @@ def metrics(db: Session = Depends(get_db)) -> str:
                 f"requiem_task_completion_seconds{{{labels}}} {entry.seconds_to_completion}"
             )
 
+    # One group per family, as the exposition format requires.
+    forecast_families = [
+        ("requiem_task_velocity_per_hour", "Smoothed progress points per hour, per task.", "velocity_per_hour"),
+        ("requiem_task_eta_seconds", "Seconds until the task's predicted completion.", "eta_seconds"),
+        ("requiem_task_forecast_confidence", "Confidence (0-1) in the task's completion forecast.", "forecast_confidence"),
+    ]
+    for name, documentation, attribute in forecast_families:
+        lines.extend([f"# HELP {name} {documentation}", f"# TYPE {name} gauge"])
+        for entry in analytics.per_task:
+            value = getattr(entry, attribute)
+            if value is not None:
+                lines.append(f"{name}{{{task_labels[entry.name]}}} {value}")
+
+    lines.extend(
+        [
+            "# HELP requiem_reply_jobs_pending AI reply jobs waiting for or being processed by a worker.",
+            "# TYPE requiem_reply_jobs_pending gauge",
+        ]
+    )
+    for job_status, count in sorted((await queue_depths_async(db)).items()):
+        lines.append(f'requiem_reply_jobs_pending{{status="{job_status}"}} {count}')
+
+    lines.extend(REGISTRY.render())
     return "\n".join(lines) + "\n"
 
+
+@router.get("/profiles", response_model=List[schemas.ProfileSummary])
+def list_profiles(
+    current_user: models.User = Depends(auth_utils.get_current_user),
+) -> List[schemas.ProfileSummary]:
+    """List stored request profiles, newest first."""
+
+    return [
+        schemas.ProfileSummary(**asdict(info), download_url=f"/monitoring/profiles/{info.id}")
+        for info in profile_store_from_config().list()
+    ]
+
+
+@router.get("/profiles/{profile_id}", response_class=FileResponse)
+def download_profile(
+    profile_id: str,
+    current_user: models.User = Depends(auth_utils.get_current_user),
+) -> FileResponse:
+    """Download a profile as collapsed stacks (``flamegraph.pl`` / speedscope input)."""
+
+    path = profile_store_from_config().collapsed_path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    return FileResponse(path, media_type="text/plain", filename=f"{profile_id}.collapsed")
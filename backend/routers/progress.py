@@ -1,120 +1,201 @@
 from __future__ import annotations
 
-from dataclasses import asdict
-from typing import List
+from datetime import datetime
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from .. import auth as auth_utils
 from .. import models, schemas
 from ..config import settings
-from ..database import get_db
-from ..services import analytics, progress_tracker
+from ..database import get_async_db, get_async_read_db
+from ..services import (
+    analytics,
+    data_version,
+    generation_reaper,
+    http_cache,
+    progress_tracker,
+    progress_view,
+    serialization,
+    timeseries,
+)
 
 router = APIRouter(prefix="/progress", tags=["progress"])
 
 
 @router.get("/", response_model=schemas.ProgressReport)
-def get_progress(
-    current_user: models.User = Depends(auth_utils.get_current_user),
-    db: Session = Depends(get_db),
-) -> schemas.ProgressReport:
+async def get_progress(
+    request: Request,
+    username: str = Depends(auth_utils.get_token_username),
+    db: AsyncSession = Depends(get_async_read_db),
+) -> Response:
     progress_settings = getattr(settings, "progress_settings", None)
     history_limit = 20
     if progress_settings is not None:
         history_limit = int(progress_settings.get("event_history_limit", default=20))
 
-    tasks = db.query(models.Task).order_by(models.Task.id).all()
-    events = progress_tracker.get_recent_events(db, limit=history_limit)
-    overall = progress_tracker.calculate_overall_progress(tasks)
-    return schemas.ProgressReport(tasks=tasks, events=events, overall_progress=overall)
+    etag, not_modified = http_cache.conditional_etag(
+        request, data_version.PROGRESS_TABLES, variant=f"events={history_limit}"
+    )
+    if not_modified is not None:
+        return not_modified
+
+    view = progress_view.get_progress_view()
+    # Taken before any query, like the ETag, so a concurrent write can only make the snapshot look stale.
+    version = data_version.DATA_VERSIONS.current(data_version.PROGRESS_TABLES)
+    report = view.read(limit=history_limit, data_version=version) if view.enabled else None
+    if report is not None:
+        progress_view.READS.inc(outcome="hit")
+    else:
+        await auth_utils.user_for_username_async(db, username)
+        report = await progress_tracker.progress_report_async(db, limit=history_limit, data_version=version)
+    response = serialization.json_response(report)
+    http_cache.set_etag(response, etag)
+    return response
 
 
 @router.get("/analytics", response_model=schemas.ProgressAnalytics)
-def get_progress_analytics(
-    current_user: models.User = Depends(auth_utils.get_current_user),
-    db: Session = Depends(get_db),
-) -> schemas.ProgressAnalytics:
-    result = analytics.compute_progress_analytics(db)
-    payload = asdict(result)
-    payload["per_task"] = [asdict(entry) for entry in result.per_task]
-    return schemas.ProgressAnalytics(**payload)
+async def get_progress_analytics(
+    request: Request,
+    username: str = Depends(auth_utils.get_token_username),
+    db: AsyncSession = Depends(get_async_read_db),
+) -> Response:
+    etag, not_modified = http_cache.conditional_etag(request, data_version.PROGRESS_TABLES, variant="analytics")
+    if not_modified is not None:
+        return not_modified
+    await auth_utils.user_for_username_async(db, username)
+
+    result = await analytics.compute_progress_analytics_async(db)
+    payload = serialization.dataclass_to_dict(result)
+    payload["per_task"] = [serialization.dataclass_to_dict(entry) for entry in result.per_task]
+    response = serialization.json_response(payload)
+    http_cache.set_etag(response, etag)
+    return response
+
+
+@router.get("/timeseries", response_model=schemas.ProgressTimeseries)
+async def get_progress_timeseries(
+    request: Request,
+    start: Optional[datetime] = Query(None, description="Range start (defaults to 7 days before end)"),
+    end: Optional[datetime] = Query(None, description="Range end, exclusive (defaults to now)"),
+    buckets: int = Query(120, ge=1, le=1000),
+    task: Optional[List[str]] = Query(None, description="Restrict to these task names"),
+    username: str = Depends(auth_utils.get_token_username),
+    db: AsyncSession = Depends(get_async_read_db),
+) -> Response:
+    if end is not None:
+        end = timeseries.naive_utc(end)
+    else:
+        # Rounded up so polls for "up to now" share one window, payload and ETag: by bucket
+        # width for the default range, otherwise to the minute.
+        granularity = timeseries.DEFAULT_RANGE.total_seconds() / buckets if start is None else 60
+        end = timeseries.round_up(datetime.utcnow(), granularity)
+    start = timeseries.naive_utc(start) if start is not None else end - timeseries.DEFAULT_RANGE
+    if start >= end:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="start must be before end")
+    task_names = sorted(set(task)) if task else None
+
+    etag, not_modified = http_cache.conditional_etag(
+        request,
+        data_version.PROGRESS_TABLES,
+        variant=f"timeseries:{start.isoformat()}:{end.isoformat()}:{buckets}:{task_names}",
+    )
+    if not_modified is not None:
+        return not_modified
+    await auth_utils.user_for_username_async(db, username)
+
+    window = timeseries.TimeseriesWindow(start=start, end=end, buckets=buckets)
+    response = serialization.json_response(await timeseries.progress_timeseries_async(db, window, task_names))
+    http_cache.set_etag(response, etag)
+    return response
 
 
 @router.put("/{task_id}", response_model=schemas.TaskResponse)
-def update_task(
+async def update_task(
     task_id: int,
-    task_update: schemas.TaskBase,
-    current_user: models.User = Depends(auth_utils.get_current_user),
-    db: Session = Depends(get_db),
+    task_update: schemas.TaskUpdate,
+    current_user: models.User = Depends(auth_utils.get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
 ) -> schemas.TaskResponse:
-    task = db.query(models.Task).filter(models.Task.id == task_id).first()
+    task = await progress_tracker.get_task_async(db, task_id)
     if not task:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
 
     previous_progress = task.progress
-    task.name = task_update.name
-    task.progress = task_update.progress
-    task.description = task_update.description
-    db.add(task)
+    expected_version = task_update.version if task_update.version is not None else task.version
+    updated = await progress_tracker.update_task_if_current_async(
+        db,
+        task_id,
+        expected_version=expected_version,
+        name=task_update.name,
+        progress_value=task_update.progress,
+        description=task_update.description,
+    )
+    if updated is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Task was modified concurrently; reload it and retry",
+        )
 
     if task_update.progress != previous_progress:
-        progress_tracker.apply_progress_event(
+        await progress_tracker.apply_progress_event_async(
             db,
-            task=task,
+            task=updated,
             progress_value=task_update.progress,
             source="manual-update",
             note="Progress updated via dashboard",
         )
 
-    db.commit()
-    db.refresh(task)
-    return task
+    await db.commit()
+    await db.refresh(updated)
+    return updated
 
 
 @router.post("/reset", response_model=schemas.ProgressReport, status_code=status.HTTP_202_ACCEPTED)
-def reset_progress(
-    current_user: models.User = Depends(auth_utils.get_current_user),
-    db: Session = Depends(get_db),
+async def reset_progress(
+    current_user: models.User = Depends(auth_utils.get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
 ) -> schemas.ProgressReport:
-    # Rehydrate tasks from configuration file to guarantee baseline values.
-    progress_tracker.reset_progress_from_config(db)
-    db.commit()
-    tasks = db.query(models.Task).order_by(models.Task.id).all()
+    # Rehydrate tasks from configuration file to guarantee baseline values. The
+    # previous generation stays in place until the reaper purges it.
+    await progress_tracker.reset_progress_from_config_async(db)
+    await db.commit()
+    generation_reaper.get_reaper().notify()
+    tasks = await progress_tracker.list_tasks_async(db)
     overall = progress_tracker.calculate_overall_progress(tasks)
     return schemas.ProgressReport(tasks=tasks, events=[], overall_progress=overall)
 
 
 @router.post("/events", response_model=schemas.TaskEventResponse, status_code=status.HTTP_201_CREATED)
-def create_progress_event(
+async def create_progress_event(
     event: schemas.TaskEventCreate,
-    current_user: models.User = Depends(auth_utils.get_current_user),
-    db: Session = Depends(get_db),
+    current_user: models.User = Depends(auth_utils.get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
 ) -> schemas.TaskEventResponse:
     default_source = "api"
     progress_settings = getattr(settings, "progress_settings", None)
     if progress_settings is not None:
         default_source = progress_settings.get("default_event_source", default="api")
 
-    task = progress_tracker.get_or_create_task(db, event.task_name)
-    recorded = progress_tracker.apply_progress_event(
+    task = await progress_tracker.get_or_create_task_async(db, event.task_name)
+    recorded = await progress_tracker.apply_progress_event_async(
         db,
         task=task,
         progress_value=event.progress,
         source=event.source or default_source,
         note=event.note,
     )
-    db.commit()
-    db.refresh(recorded)
+    await db.commit()
+    await db.refresh(recorded, attribute_names=["task"])
     return recorded
 
 
 @router.get("/events", response_model=List[schemas.TaskEventResponse])
-def list_progress_events(
+async def list_progress_events(
     limit: int = Query(None, ge=1, le=200),
-    current_user: models.User = Depends(auth_utils.get_current_user),
-    db: Session = Depends(get_db),
+    current_user: models.User = Depends(auth_utils.get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
 ) -> List[schemas.TaskEventResponse]:
     progress_settings = getattr(settings, "progress_settings", None)
     history_limit = 20
@@ -122,5 +203,5 @@ def list_progress_events(
         history_limit = int(progress_settings.get("event_history_limit", default=20))
     if limit is not None:
         history_limit = min(history_limit, limit)
-    events = progress_tracker.get_recent_events(db, limit=history_limit)
+    events = await progress_tracker.get_recent_events_async(db, limit=history_limit)
     return events
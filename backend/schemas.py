@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 
 from pydantic import BaseModel, EmailStr, Field
 
@@ -50,14 +50,46 @@ class MessageResponse(MessageBase):
         from_attributes = True
 
 
+class ReplyJobResponse(BaseModel):
+    id: int
+    status: str
+    attempts: int
+    message_id: Optional[int] = None
+    reply: Optional[MessageResponse] = None
+    error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+
+class MessageSearchHit(BaseModel):
+    id: int
+    role: str
+    snippet: str
+    rank: float
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class MessageSearchPage(BaseModel):
+    results: List[MessageSearchHit]
+    next_cursor: Optional[str] = None
+
+
 class TaskBase(BaseModel):
     name: str
     progress: int = Field(..., ge=0, le=100)
     description: Optional[str] = None
 
 
+class TaskUpdate(TaskBase):
+    version: Optional[int] = Field(None, ge=1)
+
+
 class TaskResponse(TaskBase):
     id: int
+    version: int
     updated_at: datetime
 
     class Config:
@@ -94,6 +126,30 @@ class ProgressReport(BaseModel):
     overall_progress: float
 
 
+class TimeseriesPoint(BaseModel):
+    bucket: int
+    start: datetime
+    min_progress: int
+    max_progress: int
+    last_progress: int
+    events: int
+
+
+class TaskTimeseries(BaseModel):
+    task_id: int
+    task_name: str
+    points: List[TimeseriesPoint]
+
+
+class ProgressTimeseries(BaseModel):
+    start: datetime
+    end: datetime
+    buckets: int
+    bucket_seconds: float
+    events_per_bucket: List[int]
+    tasks: List[TaskTimeseries]
+
+
 class TaskAnalytics(BaseModel):
     name: str
     progress: int
@@ -103,6 +159,10 @@ class TaskAnalytics(BaseModel):
     last_event_source: Optional[str]
     last_event_note: Optional[str]
     seconds_to_completion: Optional[float]
+    velocity_per_hour: Optional[float]
+    eta_seconds: Optional[float]
+    predicted_completion_at: Optional[datetime]
+    forecast_confidence: float
 
 
 class ProgressAnalytics(BaseModel):
@@ -115,4 +175,30 @@ class ProgressAnalytics(BaseModel):
     events_by_source: Dict[str, int]
     last_event_at: Optional[datetime]
     average_completion_seconds: Optional[float]
+    predicted_completion_at: Optional[datetime]
     per_task: List[TaskAnalytics]
+
+
+class PublicConfig(BaseModel):
+    app: Dict[str, Any]
+    frontend: Dict[str, Any]
+    api: Dict[str, Any]
+
+
+class Bootstrap(BaseModel):
+    user: UserResponse
+    progress: ProgressReport
+    messages: List[MessageResponse]
+    analytics: ProgressAnalytics
+    config: PublicConfig
+
+
+class ProfileSummary(BaseModel):
+    id: str
+    method: str
+    path: str
+    status_code: Optional[int]
+    duration_ms: float
+    samples: int
+    created_at: datetime
+    download_url: str
@@ -0,0 +1,272 @@
+"""Production server entrypoint: ``python -m backend.serve``.
+
+The master process migrates the database, imports the application once and
+binds the listening socket, then forks ``server.workers`` uvicorn workers that
+share the preloaded code and objects copy-on-write. Workers exit after
+``server.max_requests`` requests (plus up to ``max_requests_jitter`` so they do
+not all recycle at once) and are replaced. SIGTERM or SIGINT drains the workers
+for ``graceful_timeout_seconds`` before they are killed.
+
+Forking needs a POSIX host. Elsewhere the entrypoint runs a single tuned process.
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import importlib
+import importlib.util
+import logging
+import os
+import random
+import signal
+import socket
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from .config import BACKGROUND_TASKS_ENV, settings
+
+logger = logging.getLogger("backend.serve")
+
+# Imported lazily by request handlers; loading them before forking lets every
+# worker share one copy instead of importing them on its first request.
+_PRELOAD_MODULES = ("passlib.context", "jose.jwt", "httpx")
+_RESPAWN_BACKOFF_SECONDS = 1.0
+_POLL_SECONDS = 0.5
+
+
+@dataclass(slots=True)
+class ServerConfig:
+    host: str = "0.0.0.0"
+    port: int = 8000
+    workers: int = 1
+    backlog: int = 2048
+    keep_alive_seconds: int = 5
+    loop: str = "auto"
+    http: str = "auto"
+    graceful_timeout_seconds: int = 30
+    max_requests: int = 0
+    max_requests_jitter: int = 0
+    preload: bool = True
+
+    @classmethod
+    def from_settings(cls) -> "ServerConfig":
+        config = settings.get("server", default=None) or {}
+        workers = int(config.get("workers", 0))
+        return cls(
+            host=str(settings.get("app", "host", default="0.0.0.0")),
+            port=int(settings.get("app", "port", default=8000)),
+            workers=workers if workers > 0 else (os.cpu_count() or 1),
+            backlog=max(1, int(config.get("backlog", 2048))),
+            keep_alive_seconds=max(1, int(config.get("keep_alive_seconds", 5))),
+            loop=str(config.get("loop", "auto")),
+            http=str(config.get("http", "auto")),
+            graceful_timeout_seconds=max(1, int(config.get("graceful_timeout_seconds", 30))),
+            max_requests=max(0, int(config.get("max_requests", 0))),
+            max_requests_jitter=max(0, int(config.get("max_requests_jitter", 0))),
+            preload=bool(config.get("preload", True)),
+        )
+
+
+def _uvicorn_config(config: ServerConfig, app: Any) -> Any:
+    import uvicorn
+
+    max_requests = None
+    if config.max_requests:
+        max_requests = config.max_requests + random.randint(0, config.max_requests_jitter)
+    return uvicorn.Config(
+        app,
+        host=config.host,
+        port=config.port,
+        backlog=config.backlog,
+        timeout_keep_alive=config.keep_alive_seconds,
+        loop=config.loop,
+        http=config.http,
+        lifespan="on",
+        limit_max_requests=max_requests,
+        timeout_graceful_shutdown=config.graceful_timeout_seconds,
+    )
+
+
+def _preload_application() -> Any:
+    from .migrate import ensure_migrated
+
+    # Migrate once here so workers only see an up-to-date fingerprint at startup.
+    ensure_migrated()
+    from .main import app
+
+    for module in _PRELOAD_MODULES:
+        try:
+            importlib.import_module(module)
+        except ImportError:
+            continue
+    return app
+
+
+def _implementation_names(config: ServerConfig) -> str:
+    loop, http = config.loop, config.http
+    if loop == "auto":
+        loop = "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+    if http == "auto":
+        http = "httptools" if importlib.util.find_spec("httptools") else "h11"
+    return f"loop={loop} http={http}"
+
+
+class PreforkServer:
+    def __init__(self, config: ServerConfig) -> None:
+        self.config = config
+        self.app: Any = None
+        self.sock: Optional[socket.socket] = None
+        self.workers: Dict[int, int] = {}
+        self._started: Dict[int, float] = {}
+        self._stopping = False
+
+    def run(self) -> None:
+        from .services.data_version import DATA_VERSIONS
+
+        if self.config.preload:
+            self.app = _preload_application()
+        DATA_VERSIONS.share_across_forks()
+        self.sock = _uvicorn_config(self.config, self.app or "backend.main:app").bind_socket()
+        if self.config.preload:
+            # Objects created so far are never freed; keep the collector from
+            # touching their pages so they stay shared after the fork.
+            gc.freeze()
+
+        signal.signal(signal.SIGTERM, self._request_stop)
+        signal.signal(signal.SIGINT, self._request_stop)
+        logger.info(
+            "Master %s serving on %s:%s with %s workers (%s, preload=%s).",
+            os.getpid(),
+            self.config.host,
+            self.config.port,
+            self.config.workers,
+            _implementation_names(self.config),
+            self.config.preload,
+        )
+        try:
+            self._supervise()
+        finally:
+            self._shutdown()
+            self.sock.close()
+
+    def _request_stop(self, signum: int, frame: object) -> None:  # noqa: ARG002
+        self._stopping = True
+
+    def _supervise(self) -> None:
+        while not self._stopping:
+            for slot in range(self.config.workers):
+                if slot not in self.workers.values():
+                    self._spawn(slot)
+            self._reap()
+            time.sleep(_POLL_SECONDS)
+
+    def _reap(self) -> None:
+        while self.workers:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                self.workers.clear()
+                return
+            if pid == 0:
+                return
+            slot = self.workers.pop(pid, None)
+            if slot is None:
+                continue
+            lifetime = time.monotonic() - self._started.pop(pid, 0.0)
+            code = os.waitstatus_to_exitcode(status)
+            if self._stopping:
+                # Uvicorn re-raises SIGTERM after draining, so -15 is a clean stop here.
+                logger.info("Worker %s (slot %s) stopped.", pid, slot)
+            elif code == 0:
+                logger.info("Worker %s (slot %s) exited after %.0fs; replacing it.", pid, slot, lifetime)
+            else:
+                logger.warning("Worker %s (slot %s) exited with %s after %.1fs.", pid, slot, code, lifetime)
+                if lifetime < _RESPAWN_BACKOFF_SECONDS:
+                    # Avoid a hot crash loop when a worker cannot start at all.
+                    time.sleep(_RESPAWN_BACKOFF_SECONDS)
+
+    def _spawn(self, slot: int) -> None:
+        pid = os.fork()
+        if pid:
+            self.workers[pid] = slot
+            self._started[pid] = time.monotonic()
+            return
+        code = 0
+        try:
+            self._run_worker(slot)
+        except BaseException:  # noqa: BLE001 - the child must never return into the master loop
+            logger.exception("Worker %s crashed.", os.getpid())
+            code = 1
+        finally:
+            os._exit(code)
+
+    def _run_worker(self, slot: int) -> None:
+        import uvicorn
+
+        from .database import reset_engines_after_fork
+
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        os.environ[BACKGROUND_TASKS_ENV] = "1" if slot == 0 else "0"
+        reset_engines_after_fork()
+        app = self.app
+        if app is None:
+            from .main import app
+        uvicorn.Server(_uvicorn_config(self.config, app)).run(sockets=[self.sock])
+
+    def _shutdown(self) -> None:
+        for pid in self.workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        # Uvicorn drains in-flight requests for ``timeout_graceful_shutdown``; allow
+        # a little extra for lifespan shutdown before forcing the issue.
+        deadline = time.monotonic() + self.config.graceful_timeout_seconds + 5
+        while self.workers and time.monotonic() < deadline:
+            self._reap()
+            time.sleep(0.1)
+        for pid in list(self.workers):
+            logger.warning("Worker %s did not stop within the graceful timeout; killing it.", pid)
+            try:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+            except (ProcessLookupError, ChildProcessError):
+                pass
+        self.workers.clear()
+
+
+def serve(config: ServerConfig) -> None:
+    if hasattr(os, "fork"):
+        PreforkServer(config).run()
+        return
+
+    import uvicorn
+
+    if config.workers > 1:
+        logger.warning("Prefork workers need a POSIX host; serving from a single process instead.")
+    app = _preload_application() if config.preload else "backend.main:app"
+    uvicorn.Server(_uvicorn_config(config, app)).run()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the Requiem API with prefork workers")
+    parser.add_argument("--host", help="Bind address (default: app.host)")
+    parser.add_argument("--port", type=int, help="Bind port (default: app.port)")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: server.workers, 0 = CPU count)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s [%(name)s] %(message)s")
+    config = ServerConfig.from_settings()
+    if args.host:
+        config.host = args.host
+    if args.port:
+        config.port = args.port
+    if args.workers is not None:
+        config.workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+    serve(config)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,10 +5,12 @@ from dataclasses import dataclass
 from datetime import datetime
 from typing import Dict, Iterable, List, Optional
 
+from sqlalchemy import Row, Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from .. import models
-from . import progress_tracker
+from . import forecast, progress_tracker
 
 
 @dataclass(slots=True)
@@ -21,6 +23,10 @@ class TaskAnalyticsResult:
     last_event_source: Optional[str]
     last_event_note: Optional[str]
     seconds_to_completion: Optional[float]
+    velocity_per_hour: Optional[float]
+    eta_seconds: Optional[float]
+    predicted_completion_at: Optional[datetime]
+    forecast_confidence: float
 
 
 @dataclass(slots=True)
@@ -34,6 +40,7 @@ class ProgressAnalyticsResult:
     events_by_source: Dict[str, int]
     last_event_at: Optional[datetime]
     average_completion_seconds: Optional[float]
+    predicted_completion_at: Optional[datetime]
     per_task: List[TaskAnalyticsResult]
 
 
@@ -60,9 +67,10 @@ def _calculate_seconds_to_completion(task: models.Task, events: List[models.Task
     return (completion_event.created_at - start_time).total_seconds()
 
 
-def _build_task_analytics(task: models.Task, events: List[models.TaskEvent]) -> TaskAnalyticsResult:
+def _build_task_analytics(task: models.Task, events: List[models.TaskEvent], now: datetime) -> TaskAnalyticsResult:
     seconds_to_completion = _calculate_seconds_to_completion(task, events)
     last_event = events[-1] if events else None
+    prediction = forecast.forecast_for(task, now)
     return TaskAnalyticsResult(
         name=task.name,
         progress=task.progress,
@@ -72,23 +80,68 @@ def _build_task_analytics(task: models.Task, events: List[models.TaskEvent]) ->
         last_event_source=last_event.source if last_event else None,
         last_event_note=last_event.note if last_event else None,
         seconds_to_completion=seconds_to_completion,
+        velocity_per_hour=prediction.velocity_per_hour,
+        eta_seconds=prediction.eta_seconds,
+        predicted_completion_at=prediction.predicted_completion_at,
+        forecast_confidence=prediction.confidence,
     )
 
 
+# Analytics only reads a few columns, so fetch plain rows rather than hydrating
+# ORM objects; ``summarize_progress`` accesses them by attribute either way.
+def _task_rows_query() -> Select:
+    task = models.Task
+    return select(
+        task.id,
+        task.name,
+        task.progress,
+        task.updated_at,
+        task.velocity,
+        task.velocity_variance,
+        task.velocity_samples,
+        task.velocity_sampled_at,
+        task.velocity_sampled_progress,
+    ).where(task.generation == progress_tracker.active_generation()).order_by(task.id)
+
+
+def _events_query() -> Select:
+    return select(
+        models.TaskEvent.task_id,
+        models.TaskEvent.progress,
+        models.TaskEvent.source,
+        models.TaskEvent.note,
+        models.TaskEvent.created_at,
+    ).where(models.TaskEvent.generation == progress_tracker.active_generation()).order_by(models.TaskEvent.created_at)
+
+
 def compute_progress_analytics(db: Session) -> ProgressAnalyticsResult:
-    tasks: List[models.Task] = db.query(models.Task).order_by(models.Task.id).all()
-    events: List[models.TaskEvent] = (
-        db.query(models.TaskEvent).order_by(models.TaskEvent.created_at).all()
-    )
+    tasks = list(db.execute(_task_rows_query()).all())
+    events = list(db.execute(_events_query()).all())
+    return summarize_progress(tasks, events)
+
+
+async def event_rows_async(db: AsyncSession) -> List[Row]:
+    return list((await db.execute(_events_query())).all())
 
+
+async def compute_progress_analytics_async(db: AsyncSession) -> ProgressAnalyticsResult:
+    tasks = list((await db.execute(_task_rows_query())).all())
+    events = await event_rows_async(db)
+    return summarize_progress(tasks, events)
+
+
+def summarize_progress(
+    tasks: List[models.Task], events: List[models.TaskEvent]
+) -> ProgressAnalyticsResult:
     events_by_source: Dict[str, int] = defaultdict(int)
     for event in events:
         events_by_source[event.source] += 1
 
     grouped_events = _group_events_by_task(events)
 
+    now = datetime.utcnow()
     per_task = [
-        _build_task_analytics(task, grouped_events.get(task.id, []))
+        _build_task_analytics(task, grouped_events.get(task.id, []), now)
         for task in tasks
     ]
 
@@ -109,6 +162,12 @@ def compute_progress_analytics(db: Session) -> ProgressAnalyticsResult:
 
     last_event_at = events[-1].created_at if events else None
 
+    # The project finishes when its slowest open task does; unknown if any open task has no forecast.
+    open_predictions = [entry.predicted_completion_at for entry in per_task if not entry.completed]
+    predicted_completion_at = None
+    if open_predictions and all(value is not None for value in open_predictions):
+        predicted_completion_at = max(open_predictions)
+
     return ProgressAnalyticsResult(
         tasks_total=tasks_total,
         tasks_completed=tasks_completed,
@@ -119,6 +178,7 @@ def compute_progress_analytics(db: Session) -> ProgressAnalyticsResult:
         events_by_source=dict(events_by_source),
         last_event_at=last_event_at,
         average_completion_seconds=average_completion_seconds,
+        predicted_completion_at=predicted_completion_at,
         per_task=per_task,
     )
 
@@ -0,0 +1,312 @@
+"""Cold-tier storage for old chat messages.
+
+Whole days of a user's history older than ``archive.older_than_days`` are packed
+into one zlib-compressed ``message_archives`` row and removed from ``messages``.
+Each (user, day) batch moves in its own transaction, so an interrupted run leaves
+every message in exactly one tier. Archived messages are read back through
+``MessageArchive.messages`` by ``/chat/history`` paging and the exporters; full
+text search only covers the hot tier.
+"""
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, func, insert, select, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from .. import models
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OLDER_THAN_DAYS = 30
+DEFAULT_ZLIB_LEVEL = 6
+
+
+@dataclass(slots=True)
+class TierSize:
+    rows: int = 0
+    content_bytes: int = 0
+    table_bytes: Optional[int] = None
+
+
+@dataclass(slots=True)
+class ArchiveReport:
+    cutoff: date
+    dry_run: bool
+    batches: int = 0
+    messages: int = 0
+    raw_bytes: int = 0
+    compressed_bytes: int = 0
+    hot_before: TierSize = field(default_factory=TierSize)
+    hot_after: TierSize = field(default_factory=TierSize)
+    archive_bytes: Optional[int] = None
+    file_bytes_before: Optional[int] = None
+    file_bytes_after: Optional[int] = None
+
+    @property
+    def compression_ratio(self) -> Optional[float]:
+        return self.raw_bytes / self.compressed_bytes if self.compressed_bytes else None
+
+
+def _older_than_days() -> int:
+    return max(1, int(settings.get("archive", "older_than_days", default=DEFAULT_OLDER_THAN_DAYS)))
+
+
+def _zlib_level() -> int:
+    return min(9, max(1, int(settings.get("archive", "zlib_level", default=DEFAULT_ZLIB_LEVEL))))
+
+
+def archive_cutoff(older_than_days: Optional[int] = None, now: Optional[datetime] = None) -> date:
+    """First day that stays hot; only complete days before it are archived."""
+
+    days = older_than_days if older_than_days is not None else _older_than_days()
+    return ((now or datetime.utcnow()) - timedelta(days=days)).date()
+
+
+def _table_bytes(session: Session, table: str) -> Optional[int]:
+    if session.get_bind().dialect.name != "sqlite":
+        return None
+    try:
+        return session.execute(text("SELECT SUM(pgsize) FROM dbstat WHERE name = :name"), {"name": table}).scalar()
+    except OperationalError:
+        # SQLite builds without SQLITE_ENABLE_DBSTAT_VTAB.
+        return None
+
+
+def _file_bytes(session: Session) -> Optional[int]:
+    if session.get_bind().dialect.name != "sqlite":
+        return None
+    page_count = session.execute(text("PRAGMA page_count")).scalar() or 0
+    page_size = session.execute(text("PRAGMA page_size")).scalar() or 0
+    return page_count * page_size
+
+
+def hot_tier_size(session: Session) -> TierSize:
+    message = models.Message
+    rows, content_bytes = session.execute(
+        select(func.count(message.id), func.coalesce(func.sum(func.length(message.content)), 0))
+    ).one()
+    return TierSize(rows=rows, content_bytes=content_bytes, table_bytes=_table_bytes(session, "messages"))
+
+
+def _pending_batches(session: Session, cutoff: date) -> List[Tuple[int, str]]:
+    message = models.Message
+    day = func.date(message.created_at)
+    stmt = (
+        select(message.user_id, day.label("day"))
+        .where(message.created_at < datetime.combine(cutoff, time.min))
+        .group_by(message.user_id, day)
+        .order_by(day, message.user_id)
+    )
+    return [(row.user_id, row.day) for row in session.execute(stmt)]
+
+
+def _archive_batch(session: Session, user_id: int, day: date, level: int, report: ArchiveReport) -> None:
+    start = datetime.combine(day, time.min)
+    window = (
+        models.Message.user_id == user_id,
+        models.Message.created_at >= start,
+        models.Message.created_at < start + timedelta(days=1),
+    )
+    messages = list(
+        session.scalars(select(models.Message).where(*window).order_by(models.Message.created_at, models.Message.id))
+    )
+    if not messages:
+        return
+    payload, raw_bytes = models.MessageArchive.pack(messages, level)
+    report.batches += 1
+    report.messages += len(messages)
+    report.raw_bytes += raw_bytes
+    report.compressed_bytes += len(payload)
+    if report.dry_run:
+        return
+
+    session.execute(
+        insert(models.MessageArchive).values(
+            user_id=user_id,
+            day=day,
+            first_message_id=min(message.id for message in messages),
+            last_message_id=max(message.id for message in messages),
+            first_created_at=messages[0].created_at,
+            last_created_at=messages[-1].created_at,
+            message_count=len(messages),
+            codec="zlib",
+            raw_bytes=raw_bytes,
+            payload=payload,
+            created_at=datetime.utcnow(),
+        )
+    )
+    # Delete exactly the rows that were packed, even if a write raced in meanwhile.
+    session.execute(
+        delete(models.Message)
+        .where(models.Message.id.in_([message.id for message in messages]))
+        .execution_options(synchronize_session=False)
+    )
+
+
+def archive_old_messages(
+    session: Session,
+    *,
+    older_than_days: Optional[int] = None,
+    dry_run: bool = False,
+    vacuum: bool = False,
+) -> ArchiveReport:
+    """Move complete days older than the cutoff into the cold tier, committing per batch."""
+
+    cutoff = archive_cutoff(older_than_days)
+    level = _zlib_level()
+    report = ArchiveReport(cutoff=cutoff, dry_run=dry_run)
+    report.hot_before = hot_tier_size(session)
+    report.file_bytes_before = _file_bytes(session)
+    session.commit()
+
+    for user_id, day in _pending_batches(session, cutoff):
+        if isinstance(day, str):
+            day = date.fromisoformat(day)
+        _archive_batch(session, user_id, day, level, report)
+        if dry_run:
+            session.rollback()
+        else:
+            session.commit()
+        session.expunge_all()
+
+    if vacuum and not dry_run and session.get_bind().dialect.name == "sqlite":
+        # VACUUM cannot run inside a transaction; use a dedicated autocommit connection.
+        with session.get_bind().connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            connection.execute(text("VACUUM"))
+
+    report.hot_after = hot_tier_size(session)
+    report.archive_bytes = _table_bytes(session, "message_archives")
+    report.file_bytes_after = _file_bytes(session)
+    session.commit()
+    logger.info(
+        "Archived %s messages in %s batches older than %s (%s -> %s bytes).",
+        report.messages,
+        report.batches,
+        cutoff,
+        report.raw_bytes,
+        report.compressed_bytes,
+    )
+    return report
+
+
+def _archive_filters(user_id: Optional[int], before_id: Optional[int]) -> List[Any]:
+    clauses: List[Any] = []
+    if user_id is not None:
+        clauses.append(models.MessageArchive.user_id == user_id)
+    if before_id is not None:
+        clauses.append(models.MessageArchive.first_message_id < before_id)
+    return clauses
+
+
+async def archived_history_async(
+    db: AsyncSession, *, user_id: int, limit: int, before_id: Optional[int] = None
+) -> List[models.ArchivedMessage]:
+    """Newest-first archived messages for ``user_id`` with ids below ``before_id``."""
+
+    collected: List[models.ArchivedMessage] = []
+    stmt = (
+        select(models.MessageArchive)
+        .where(*_archive_filters(user_id, before_id))
+        .order_by(models.MessageArchive.last_message_id.desc())
+    )
+    result = await db.stream_scalars(stmt.execution_options(yield_per=8))
+    try:
+        async for batch in result:
+            for message in sorted(batch.messages, key=lambda item: (item.created_at, item.id), reverse=True):
+                if before_id is not None and message.id >= before_id:
+                    continue
+                collected.append(message)
+                if len(collected) >= limit:
+                    return collected
+    finally:
+        await result.close()
+    return collected
+
+
+async def message_history_async(
+    db: AsyncSession, *, user_id: int, limit: int, before_id: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """The ``limit`` newest messages below ``before_id`` across both tiers, oldest first."""
+
+    message = models.Message
+    stmt = (
+        select(message.content, message.id, message.role, message.created_at)
+        .where(message.user_id == user_id)
+        .order_by(message.created_at.desc(), message.id.desc())
+        .limit(limit)
+    )
+    if before_id is not None:
+        stmt = stmt.where(message.id < before_id)
+    newest_first = [dict(row._mapping) for row in (await db.execute(stmt)).all()]
+    if len(newest_first) < limit:
+        # The hot table is exhausted for this page; continue into the cold tier.
+        cursor = newest_first[-1]["id"] if newest_first else before_id
+        archived = await archived_history_async(db, user_id=user_id, limit=limit - len(newest_first), before_id=cursor)
+        newest_first.extend(
+            {"content": item.content, "id": item.id, "role": item.role, "created_at": item.created_at}
+            for item in archived
+        )
+    return newest_first[::-1]
+
+
+def iter_archived_messages(
+    session: Session,
+    *,
+    user_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> Iterator[models.ArchivedMessage]:
+    """Archived messages in ``(created_at, id)`` order, decoding one day at a time."""
+
+    archive = models.MessageArchive
+    stmt = select(archive).where(*_archive_filters(user_id, None)).order_by(archive.day, archive.id)
+    if since is not None:
+        stmt = stmt.where(archive.last_created_at >= since)
+    if until is not None:
+        stmt = stmt.where(archive.first_created_at < until)
+
+    day: Optional[date] = None
+    pending: List[models.ArchivedMessage] = []
+    result = session.execute(stmt.execution_options(yield_per=8)).scalars()
+    try:
+        for batch in result:
+            if batch.day != day:
+                yield from sorted(pending, key=lambda item: (item.created_at, item.id))
+                pending = []
+                day = batch.day
+            for message in batch.messages:
+                if since is not None and message.created_at < since:
+                    continue
+                if until is not None and message.created_at >= until:
+                    continue
+                pending.append(message)
+        yield from sorted(pending, key=lambda item: (item.created_at, item.id))
+    finally:
+        result.close()
+
+
+def describe(report: ArchiveReport) -> Sequence[str]:
+    """Human-readable summary lines for the CLI."""
+
+    def size(value: Optional[int]) -> str:
+        return "n/a" if value is None else f"{value:,} B"
+
+    action = "Would archive" if report.dry_run else "Archived"
+    lines = [
+        f"{action} {report.messages:,} messages in {report.batches:,} user/day batches older than {report.cutoff}.",
+        f"Payload: {report.raw_bytes:,} B raw -> {report.compressed_bytes:,} B zlib"
+        + (f" ({report.compression_ratio:.1f}x)." if report.compression_ratio else "."),
+        f"Hot tier rows: {report.hot_before.rows:,} -> {report.hot_after.rows:,}; "
+        f"content {report.hot_before.content_bytes:,} B -> {report.hot_after.content_bytes:,} B.",
+        f"messages table: {size(report.hot_before.table_bytes)} -> {size(report.hot_after.table_bytes)}; "
+        f"message_archives table: {size(report.archive_bytes)}.",
+        f"Database file: {size(report.file_bytes_before)} -> {size(report.file_bytes_after)}.",
+    ]
+    return lines
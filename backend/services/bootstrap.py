@@ -0,0 +1,122 @@
+"""Everything the dashboard needs on first load, in one response.
+
+``/bootstrap`` replaces five separate requests (profile, progress, history,
+analytics and the raw settings file). All sections read from one snapshot
+transaction, so they agree with each other. They are computed concurrently:
+queries take turns on the shared connection, and the CPU-heavy analytics
+summary runs in a thread while the other sections' queries proceed.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, List, TypeVar
+
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .. import models
+from ..config import settings
+from . import analytics, archive, progress_tracker, serialization
+
+T = TypeVar("T")
+
+_PROGRESS_TASK_FIELDS = ("name", "progress", "description", "id", "version", "updated_at")
+
+
+@lru_cache(maxsize=1)
+def public_config() -> Dict[str, Any]:
+    """The settings the browser needs; nothing secret and nothing server-side."""
+
+    frontend = dict(settings.get("frontend", default={}) or {})
+    frontend.pop("dev_server_port", None)
+    return {
+        "app": {
+            "name": settings.get("app", "name", default="Requiem AI Portal"),
+            "version": settings.get("app", "version", default=""),
+            "environment": settings.get("app", "environment", default="development"),
+        },
+        "frontend": frontend,
+        "api": {"base_url": settings.get("api", "base_url", default="")},
+    }
+
+
+@lru_cache(maxsize=1)
+def public_config_etag() -> str:
+    encoded = json.dumps(public_config(), sort_keys=True).encode("utf-8")
+    return '"' + hashlib.blake2b(encoded, digest_size=8).hexdigest() + '"'
+
+
+def _task_rows_query() -> Select:
+    # One task read shared by the progress and analytics sections.
+    task = models.Task
+    return select(
+        task.name,
+        task.progress,
+        task.description,
+        task.id,
+        task.version,
+        task.updated_at,
+        task.velocity,
+        task.velocity_variance,
+        task.velocity_samples,
+        task.velocity_sampled_at,
+        task.velocity_sampled_progress,
+    ).where(task.generation == progress_tracker.active_generation()).order_by(task.id)
+
+
+async def build_bootstrap_async(
+    db: AsyncSession, *, user: models.User, history_limit: int, event_limit: int
+) -> Dict[str, Any]:
+    """Call after ``begin_snapshot_async`` so every section sees the same data."""
+
+    # An AsyncSession runs one statement at a time; sections queue on this lock
+    # for the connection and overlap everything else.
+    connection = asyncio.Lock()
+
+    async def exclusive(run: Callable[[], Awaitable[T]]) -> T:
+        async with connection:
+            return await run()
+
+    async def task_rows() -> List[Any]:
+        return list((await db.execute(_task_rows_query())).all())
+
+    tasks = asyncio.ensure_future(exclusive(task_rows))
+
+    async def progress_section() -> Dict[str, Any]:
+        events = await exclusive(lambda: progress_tracker.get_recent_event_rows_async(db, event_limit))
+        task_rows = await tasks
+        return {
+            "tasks": [{field: getattr(row, field) for field in _PROGRESS_TASK_FIELDS} for row in task_rows],
+            "events": serialization.rows_to_dicts(events),
+            "overall_progress": progress_tracker.calculate_overall_progress(task_rows),
+        }
+
+    async def analytics_section() -> Dict[str, Any]:
+        events = await exclusive(lambda: analytics.event_rows_async(db))
+        result = await asyncio.to_thread(analytics.summarize_progress, await tasks, events)
+        payload = serialization.dataclass_to_dict(result)
+        payload["per_task"] = [serialization.dataclass_to_dict(entry) for entry in result.per_task]
+        return payload
+
+    async def history_section() -> List[Dict[str, Any]]:
+        return await exclusive(lambda: archive.message_history_async(db, user_id=user.id, limit=history_limit))
+
+    progress, analytics_payload, messages = await asyncio.gather(
+        progress_section(), analytics_section(), history_section()
+    )
+    return {
+        "user": {
+            "id": user.id,
+            "username": user.username,
+            "email": user.email,
+            "profile_image": user.profile_image,
+            "created_at": user.created_at,
+        },
+        "progress": progress,
+        "messages": messages,
+        "analytics": analytics_payload,
+        "config": public_config(),
+    }
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import asyncio
+import gzip
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+# Compressing multi-megabyte bodies inline would stall the event loop.
+_OFFLOAD_BYTES = 256 * 1024
+_COMPRESSIBLE_PREFIXES = ("text/", "application/json", "application/x-ndjson", "application/javascript")
+
+
+@dataclass(slots=True)
+class CompressionConfig:
+    enabled: bool = True
+    minimum_size: int = 1024
+    gzip_level: int = 6
+    brotli_quality: int = 4
+
+    @classmethod
+    def from_settings(cls) -> "CompressionConfig":
+        config = settings.get("serialization", "compression", default=None)
+        if not config:
+            return cls()
+        return cls(
+            enabled=bool(config.get("enabled", True)),
+            minimum_size=max(0, int(config.get("minimum_size", 1024))),
+            gzip_level=min(9, max(1, int(config.get("gzip_level", 6)))),
+            brotli_quality=min(11, max(0, int(config.get("brotli_quality", 4)))),
+        )
+
+
+def _load_brotli() -> Any:
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+
+def _accepted_encodings(accept_encoding: str) -> Dict[str, float]:
+    accepted: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        if not coding:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip().lower()] = quality
+    return accepted
+
+
+class CompressionMiddleware:
+    """Negotiate brotli or gzip for buffered responses above ``minimum_size``.
+
+    Streaming responses (bodies sent in several chunks, e.g. ``/export/*``) and
+    bodies that already carry a ``Content-Encoding`` pass through untouched.
+    """
+
+    def __init__(self, app: Any, config: CompressionConfig) -> None:
+        self.app = app
+        self._config = config
+        self._brotli = _load_brotli()
+
+    def _negotiate(self, scope: Dict[str, Any]) -> Optional[str]:
+        accepted = _accepted_encodings(Headers(scope=scope).get("accept-encoding", ""))
+        if self._brotli is not None and accepted.get("br", 0) > 0:
+            return "br"
+        if accepted.get("gzip", 0) > 0:
+            return "gzip"
+        return None
+
+    def _compress(self, encoding: str, body: bytes) -> bytes:
+        if encoding == "br":
+            return self._brotli.compress(body, quality=self._config.brotli_quality)
+        return gzip.compress(body, compresslevel=self._config.gzip_level, mtime=0)
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        encoding = self._negotiate(scope) if scope["type"] == "http" else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Optional[Dict[str, Any]] = None
+        passthrough = False
+
+        async def send_compressed(message: Dict[str, Any]) -> None:
+            nonlocal start_message, passthrough
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or passthrough or start_message is None:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            headers = MutableHeaders(scope=start_message)
+            content_type = headers.get("content-type", "")
+            if (
+                message.get("more_body", False)
+                or len(body) < self._config.minimum_size
+                or "content-encoding" in headers
+                or not content_type.startswith(_COMPRESSIBLE_PREFIXES)
+            ):
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            if len(body) >= _OFFLOAD_BYTES:
+                compressed = await asyncio.to_thread(self._compress, encoding, body)
+            else:
+                compressed = self._compress(encoding, body)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            headers.add_vary_header("Accept-Encoding")
+            await send(start_message)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
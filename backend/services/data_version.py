@@ -0,0 +1,113 @@
+"""Process-wide, monotonically increasing version counters for tracked tables.
+
+Writes made through any ORM session mark the tables they touch; the counters are
+bumped only after the transaction commits, so a reader can never observe a new
+version paired with uncommitted data. Marks left by a rolled-back transaction are
+kept and only cause one spurious bump later. Each process starts from a random
+epoch, which keeps versions from being reused across restarts. ``python -m
+backend.serve`` calls ``share_across_forks`` before forking, so all of its
+workers bump and read one set of counters.
+"""
+from __future__ import annotations
+
+import threading
+import uuid
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+TRACKED_TABLES = frozenset({"tasks", "task_events", "messages", "message_archives"})
+PROGRESS_TABLES = ("tasks", "task_events")
+MESSAGE_TABLES = ("messages", "message_archives")
+
+_PENDING_KEY = "data_version_pending"
+
+
+class DataVersions:
+    def __init__(self) -> None:
+        self.epoch = uuid.uuid4().hex[:8]
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._slots: Dict[str, int] = {}
+        self._shared: Optional[Any] = None
+        self._shared_lock: Optional[Any] = None
+
+    @property
+    def shared(self) -> bool:
+        return self._shared is not None
+
+    def share_across_forks(self) -> None:
+        """Move the counters into anonymous shared memory inherited by forked children."""
+
+        import multiprocessing
+
+        context = multiprocessing.get_context("fork")
+        with self._lock:
+            self._slots = {table: index for index, table in enumerate(sorted(TRACKED_TABLES))}
+            shared = context.RawArray("q", len(self._slots))
+            for table, index in self._slots.items():
+                shared[index] = self._versions.get(table, 0)
+            self._shared_lock = context.Lock()
+            self._shared = shared
+
+    def bump(self, tables: Iterable[str]) -> None:
+        if self._shared is not None:
+            # A worker killed mid-bump would hold the lock forever; an unguarded
+            # increment after a timeout is still at worst one lost bump.
+            acquired = self._shared_lock.acquire(timeout=1.0)
+            try:
+                for table in tables:
+                    index = self._slots.get(table)
+                    if index is not None:
+                        self._shared[index] += 1
+            finally:
+                if acquired:
+                    self._shared_lock.release()
+            return
+        with self._lock:
+            for table in tables:
+                self._versions[table] = self._versions.get(table, 0) + 1
+
+    def current(self, tables: Iterable[str]) -> Tuple[int, ...]:
+        if self._shared is not None:
+            # Counters only grow and the ETag is taken before querying, so an
+            # unlocked read can at worst be older than the payload, never newer.
+            return tuple(self._shared[self._slots[table]] if table in self._slots else 0 for table in tables)
+        with self._lock:
+            return tuple(self._versions.get(table, 0) for table in tables)
+
+
+DATA_VERSIONS = DataVersions()
+
+
+def mark_changed(session: Session, *tables: str) -> None:
+    """Record writes that bypass the ORM unit of work (e.g. ``session.connection().execute``)."""
+
+    pending: Set[str] = session.info.setdefault(_PENDING_KEY, set())
+    pending.update(table for table in tables if table in TRACKED_TABLES)
+
+
+@event.listens_for(Session, "after_flush")
+def _track_flush(session: Session, flush_context: object) -> None:
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        table = getattr(instance, "__tablename__", None)
+        if table is not None:
+            mark_changed(session, table)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_statement(state: object) -> None:
+    if state.is_insert or state.is_update or state.is_delete:  # type: ignore[attr-defined]
+        table = getattr(state.statement, "table", None)  # type: ignore[attr-defined]
+        name = getattr(table, "name", None)
+        if name is not None:
+            mark_changed(state.session, name)  # type: ignore[attr-defined]
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_after_commit(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending:
+        DATA_VERSIONS.bump(sorted(pending))
+
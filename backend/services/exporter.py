@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+import zlib
+from dataclasses import dataclass
+from datetime import datetime
+from itertools import chain, islice
+from typing import Any, Iterable, Iterator, Sequence
+
+from sqlalchemy import Select, select
+from sqlalchemy.orm import Session
+
+from .. import models
+from ..config import settings
+from . import archive, progress_tracker
+
+EXPORT_FORMATS = ("csv", "ndjson")
+EVENT_COLUMNS = ("id", "task_id", "task_name", "progress", "source", "note", "created_at")
+MESSAGE_COLUMNS = ("id", "user_id", "username", "role", "content", "created_at")
+
+_FLUSH_BYTES = 64 * 1024
+
+
+@dataclass(slots=True)
+class ExportFilters:
+    since: datetime | None = None
+    until: datetime | None = None
+    task_name: str | None = None
+    username: str | None = None
+
+
+def _batch_size() -> int:
+    export_settings = getattr(settings, "export", None)
+    if export_settings is not None:
+        return max(1, int(export_settings.get("yield_per", default=1000)))
+    return 1000
+
+
+def task_events_query(filters: ExportFilters) -> Select:
+    stmt = (
+        select(
+            models.TaskEvent.id,
+            models.TaskEvent.task_id,
+            models.Task.name,
+            models.TaskEvent.progress,
+            models.TaskEvent.source,
+            models.TaskEvent.note,
+            models.TaskEvent.created_at,
+        )
+        .join(models.Task, models.Task.id == models.TaskEvent.task_id)
+        .where(models.TaskEvent.generation == progress_tracker.active_generation())
+        .order_by(models.TaskEvent.created_at, models.TaskEvent.id)
+    )
+    if filters.since is not None:
+        stmt = stmt.where(models.TaskEvent.created_at >= filters.since)
+    if filters.until is not None:
+        stmt = stmt.where(models.TaskEvent.created_at < filters.until)
+    if filters.task_name:
+        stmt = stmt.where(models.Task.name == filters.task_name)
+    return stmt
+
+
+def messages_query(filters: ExportFilters) -> Select:
+    stmt = (
+        select(
+            models.Message.id,
+            models.Message.user_id,
+            models.User.username,
+            models.Message.role,
+            models.Message.content,
+            models.Message.created_at,
+        )
+        .join(models.User, models.User.id == models.Message.user_id)
+        .order_by(models.Message.created_at, models.Message.id)
+    )
+    if filters.since is not None:
+        stmt = stmt.where(models.Message.created_at >= filters.since)
+    if filters.until is not None:
+        stmt = stmt.where(models.Message.created_at < filters.until)
+    if filters.username:
+        stmt = stmt.where(models.User.username == filters.username)
+    return stmt
+
+
+def stream_rows(db: Session, stmt: Select) -> Iterator[Sequence[Any]]:
+    """Iterate a query through a server-side cursor, one partition at a time."""
+
+    result = db.execute(stmt.execution_options(yield_per=_batch_size()))
+    try:
+        for row in result:
+            yield tuple(row)
+    finally:
+        result.close()
+
+
+def task_event_rows(db: Session, filters: ExportFilters) -> Iterator[Sequence[Any]]:
+    return stream_rows(db, task_events_query(filters))
+
+
+def archived_message_rows(db: Session, filters: ExportFilters) -> Iterator[Sequence[Any]]:
+    user_id = None
+    if filters.username:
+        user_id = db.scalar(select(models.User.id).where(models.User.username == filters.username))
+        if user_id is None:
+            return
+    messages = archive.iter_archived_messages(db, user_id=user_id, since=filters.since, until=filters.until)
+    # Usernames are looked up per batch, only for the users that batch contains.
+    while batch := list(islice(messages, _batch_size())):
+        if user_id is not None:
+            usernames = {user_id: filters.username}
+        else:
+            user_ids = {message.user_id for message in batch}
+            usernames = dict(
+                db.execute(select(models.User.id, models.User.username).where(models.User.id.in_(user_ids))).all()
+            )
+        for message in batch:
+            username = usernames.get(message.user_id)
+            yield (message.id, message.user_id, username, message.role, message.content, message.created_at)
+
+
+def message_rows(db: Session, filters: ExportFilters) -> Iterator[Sequence[Any]]:
+    """Archived (cold) messages first, then the hot table; each tier is already in time order."""
+
+    return chain(archived_message_rows(db, filters), stream_rows(db, messages_query(filters)))
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _format_cell(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return "" if value is None else value
+
+
+def iter_csv(columns: Sequence[str], rows: Iterable[Sequence[Any]]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for row in rows:
+        writer.writerow([_format_cell(value) for value in row])
+        if buffer.tell() >= _FLUSH_BYTES:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate(0)
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def iter_ndjson(columns: Sequence[str], rows: Iterable[Sequence[Any]]) -> Iterator[bytes]:
+    pending: list[str] = []
+    size = 0
+    for row in rows:
+        line = json.dumps(dict(zip(columns, row)), default=_json_default, ensure_ascii=False)
+        pending.append(line)
+        size += len(line) + 1
+        if size >= _FLUSH_BYTES:
+            yield ("\n".join(pending) + "\n").encode("utf-8")
+            pending.clear()
+            size = 0
+    if pending:
+        yield ("\n".join(pending) + "\n").encode("utf-8")
+
+
+def iter_gzip(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    # ``wbits=31`` selects the gzip container so the output is a regular .gz file.
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def encode_rows(
+    columns: Sequence[str],
+    rows: Iterable[Sequence[Any]],
+    *,
+    export_format: str,
+    compress: bool = False,
+) -> Iterator[bytes]:
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format '{export_format}'")
+    encoder = iter_csv if export_format == "csv" else iter_ndjson
+    chunks = encoder(columns, rows)
+    return iter_gzip(chunks) if compress else chunks
+
+
+def media_type_for(export_format: str, compress: bool) -> str:
+    if compress:
+        return "application/gzip"
+    return "text/csv" if export_format == "csv" else "application/x-ndjson"
+
+
+def filename_for(dataset: str, export_format: str, compress: bool) -> str:
+    suffix = "csv" if export_format == "csv" else "ndjson"
+    return f"requiem-{dataset}.{suffix}{'.gz' if compress else ''}"
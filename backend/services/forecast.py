@@ -0,0 +1,107 @@
+"""Per-task progress velocity and completion forecasts.
+
+Each task carries a time-weighted exponential moving average of its progress
+velocity (points per second) and the variance around it. Every progress change
+folds one sample into that state in O(1), so forecasts never rescan history.
+Weighting by elapsed time (``alpha = 1 - 2^(-dt / half_life)``) handles irregular
+event spacing, and updates closer together than ``forecast_min_interval_seconds``
+are merged into the next sample so bursts do not produce meaningless rates.
+"""
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Optional
+
+from ..config import settings
+
+DEFAULT_HALF_LIFE_SECONDS = 3600.0
+DEFAULT_MIN_SAMPLES = 3
+DEFAULT_MIN_INTERVAL_SECONDS = 30.0
+
+
+@dataclass(slots=True)
+class Forecast:
+    velocity_per_hour: Optional[float]
+    eta_seconds: Optional[float]
+    predicted_completion_at: Optional[datetime]
+    confidence: float
+
+
+def _half_life_seconds() -> float:
+    return max(1.0, float(settings.get("progress_settings", "forecast_half_life_seconds", default=DEFAULT_HALF_LIFE_SECONDS)))
+
+
+def _min_interval_seconds() -> float:
+    return max(0.0, float(settings.get("progress_settings", "forecast_min_interval_seconds", default=DEFAULT_MIN_INTERVAL_SECONDS)))
+
+
+def _min_samples() -> int:
+    return max(1, int(settings.get("progress_settings", "forecast_min_samples", default=DEFAULT_MIN_SAMPLES)))
+
+
+def record_progress_sample(task: Any, progress: int, at: Optional[datetime] = None) -> None:
+    """Fold a progress observation into ``task``'s velocity state."""
+
+    at = at or datetime.utcnow()
+    previous_at = task.velocity_sampled_at
+    previous_progress = task.velocity_sampled_progress
+    if previous_at is None or previous_progress is None:
+        task.velocity_sampled_at = at
+        task.velocity_sampled_progress = progress
+        return
+
+    elapsed = (at - previous_at).total_seconds()
+    if elapsed <= 0 or elapsed < _min_interval_seconds():
+        # Keep the old baseline; this change is folded into the next sample's delta.
+        return
+
+    rate = (progress - previous_progress) / elapsed
+    if task.velocity is None or not task.velocity_samples:
+        task.velocity = rate
+        task.velocity_variance = 0.0
+    else:
+        alpha = 1.0 - math.pow(2.0, -elapsed / _half_life_seconds())
+        deviation = rate - task.velocity
+        task.velocity = task.velocity + alpha * deviation
+        task.velocity_variance = (1.0 - alpha) * ((task.velocity_variance or 0.0) + alpha * deviation * deviation)
+    task.velocity_samples = (task.velocity_samples or 0) + 1
+    task.velocity_sampled_at = at
+    task.velocity_sampled_progress = progress
+
+
+def reset_velocity(task: Any) -> None:
+    task.velocity = None
+    task.velocity_variance = 0.0
+    task.velocity_samples = 0
+    task.velocity_sampled_at = None
+    task.velocity_sampled_progress = None
+
+
+def forecast_for(task: Any, now: Optional[datetime] = None) -> Forecast:
+    """Predict completion from the stored state; works on ORM objects and plain rows."""
+
+    now = now or datetime.utcnow()
+    velocity = task.velocity
+    velocity_per_hour = velocity * 3600 if velocity is not None else None
+    if task.progress >= 100:
+        # When it actually finished; ``now`` would move forward on every poll.
+        return Forecast(velocity_per_hour, 0.0, task.velocity_sampled_at or task.updated_at, 1.0)
+    if velocity is None or velocity <= 0 or task.velocity_sampled_at is None:
+        return Forecast(velocity_per_hour, None, None, 0.0)
+
+    # Anchored to the last sample so the prediction only moves when new data arrives.
+    sampled_progress = task.velocity_sampled_progress
+    if sampled_progress is None:
+        sampled_progress = task.progress
+    remaining = max(0, 100 - sampled_progress)
+    predicted_at = task.velocity_sampled_at + timedelta(seconds=remaining / velocity)
+    eta_seconds = max(0.0, (predicted_at - now).total_seconds())
+    spread = math.sqrt(max(0.0, task.velocity_variance or 0.0)) / velocity
+    warmup = min(1.0, (task.velocity_samples or 0) / _min_samples())
+    # An estimate nobody has refreshed for a few half-lives says little about the present.
+    age = max(0.0, (now - task.velocity_sampled_at).total_seconds())
+    freshness = math.pow(2.0, -age / _half_life_seconds())
+    confidence = round(warmup * freshness / (1.0 + spread), 4)
+    return Forecast(velocity_per_hour, eta_seconds, predicted_at, confidence)
@@ -0,0 +1,105 @@
+"""Background purge of task and event rows retired by ``POST /progress/reset``.
+
+A reset only moves the live generation forward, so it costs the same however
+much history exists. This thread deletes the rows it left behind in batches of
+``batch_size`` events, committing after each batch so writers are never blocked
+for long, and sleeps for ``interval_seconds`` once nothing is left.
+"""
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from functools import lru_cache
+from threading import Event, Thread
+
+from ..config import settings
+from ..database import SessionLocal
+from . import progress_tracker
+from .metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+PURGED = REGISTRY.counter("requiem_generation_rows_purged_total", "Rows from retired progress generations deleted.")
+
+
+@dataclass(slots=True)
+class ReaperConfig:
+    enabled: bool = True
+    interval_seconds: float = 30.0
+    batch_size: int = 1000
+    pause_seconds: float = 0.05
+
+    @classmethod
+    def from_settings(cls) -> "ReaperConfig":
+        config = settings.get("progress_settings", "generation_reaper", default=None)
+        if not config:
+            return cls()
+        return cls(
+            enabled=bool(config.get("enabled", True)),
+            interval_seconds=max(0.1, float(config.get("interval_seconds", 30.0))),
+            batch_size=max(1, int(config.get("batch_size", 1000))),
+            pause_seconds=max(0.0, float(config.get("pause_seconds", 0.05))),
+        )
+
+
+class GenerationReaper:
+    def __init__(self, config: ReaperConfig) -> None:
+        self._config = config
+        self._stop_event = Event()
+        self._wakeup = Event()
+        self._thread: Thread | None = None
+
+    @property
+    def is_enabled(self) -> bool:
+        return self._config.enabled
+
+    def start(self) -> None:
+        if not self.is_enabled:
+            logger.info("Generation reaper is disabled by configuration.")
+            return
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = Thread(target=self._run, name="generation-reaper", daemon=True)
+        self._thread.start()
+
+    def notify(self) -> None:
+        """Skip the rest of the idle wait, e.g. right after a reset in this process."""
+
+        self._wakeup.set()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        if self._thread and self._thread.is_alive():
+            self._stop_event.set()
+            self._wakeup.set()
+            self._thread.join(timeout=timeout)
+        self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                drained = self.purge_batch()
+            except Exception as exc:  # noqa: BLE001 - background safety net
+                logger.exception("Generation reaper batch failed: %s", exc)
+                drained = True
+            wait = self._config.interval_seconds if drained else self._config.pause_seconds
+            self._wakeup.wait(wait)
+            self._wakeup.clear()
+
+    def purge_batch(self) -> bool:
+        """Delete one batch; returns ``True`` once no retired rows remain."""
+
+        with SessionLocal() as session:
+            events, tasks = progress_tracker.purge_retired_generations(session, batch_size=self._config.batch_size)
+            session.commit()
+        if events:
+            PURGED.inc(events, table="task_events")
+        if tasks:
+            PURGED.inc(tasks, table="tasks")
+            logger.info("Purged %s retired tasks.", tasks)
+        return events < self._config.batch_size
+
+
+@lru_cache(maxsize=1)
+def get_reaper() -> GenerationReaper:
+    return GenerationReaper(ReaperConfig.from_settings())
@@ -0,0 +1,300 @@
+"""Per-user ring buffer of recent chat messages for ``/chat/history``.
+
+Each buffer holds a user's newest ``messages_per_user`` messages as ready-to-
+serialise ``MessageResponse`` dicts, oldest first. Requests that fall inside the
+buffer are answered from memory, keyed by the username in the token, without a
+database query. Buffers are evicted least-recently-used across users once their
+estimated size exceeds ``max_bytes``.
+
+Consistency: a buffer is stamped with the ``messages`` data version and the
+time it was last checked against the database. It is served without a query
+only while that version is unchanged and the check is under
+``max_staleness_seconds`` old. Otherwise one indexed query fetches the user's
+messages newer than the buffer's newest id. That query is the stamp check: it
+comes back empty when nothing changed. So writes from other workers, or made
+directly in the database, appear within ``max_staleness_seconds`` even when the
+data versions are not shared between processes.
+
+Messages stored by this process are written through to their buffer, which then
+adopts the current data version. Its check time is left alone, so a local post
+does not cost the next read a query, nor push back the staleness bound for
+writes it did not see. A full reload every ``max_age_seconds`` covers drift the
+tail query cannot see, such as commits that land out of id order on PostgreSQL.
+"""
+from __future__ import annotations
+
+import bisect
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from functools import lru_cache
+from threading import Lock
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .. import models
+from ..config import settings
+from . import archive
+from .data_version import DATA_VERSIONS, MESSAGE_TABLES
+from .metrics import REGISTRY
+
+# Rough per-message cost of the dict, its keys and the datetime beyond the text itself.
+_MESSAGE_OVERHEAD_BYTES = 400
+
+LOOKUPS = REGISTRY.counter(
+    "requiem_history_cache_lookups_total",
+    "Chat history requests by how the ring buffer served them (hit, confirmed, revalidated, filled, bypass).",
+)
+BUFFERED_BYTES = REGISTRY.gauge("requiem_history_cache_bytes", "Estimated size of this process's chat history buffers.")
+BUFFERED_USERS = REGISTRY.gauge("requiem_history_cache_users", "Users with a chat history buffer in this process.")
+
+
+@dataclass(slots=True)
+class HistoryCacheConfig:
+    enabled: bool = True
+    messages_per_user: int = 200
+    max_bytes: int = 32 * 1024 * 1024
+    max_staleness_seconds: float = 1.0
+    max_age_seconds: float = 300.0
+
+    @classmethod
+    def from_settings(cls) -> "HistoryCacheConfig":
+        config = settings.get("chat", "history_cache", default=None)
+        if not config:
+            return cls()
+        return cls(
+            enabled=bool(config.get("enabled", True)),
+            messages_per_user=max(1, int(config.get("messages_per_user", 200))),
+            max_bytes=max(1, int(config.get("max_bytes", 32 * 1024 * 1024))),
+            max_staleness_seconds=max(0.0, float(config.get("max_staleness_seconds", 1.0))),
+            max_age_seconds=max(1.0, float(config.get("max_age_seconds", 300))),
+        )
+
+
+def message_payload(message: Any) -> Dict[str, Any]:
+    return {"content": message.content, "id": message.id, "role": message.role, "created_at": message.created_at}
+
+
+def _order_key(payload: Dict[str, Any]) -> Tuple[Any, int]:
+    return payload["created_at"], payload["id"]
+
+
+def _size(payload: Dict[str, Any]) -> int:
+    return len(payload["content"]) + _MESSAGE_OVERHEAD_BYTES
+
+
+@dataclass(slots=True)
+class _Buffer:
+    user_id: int
+    messages: Deque[Dict[str, Any]]
+    # True while the buffer holds the user's entire history.
+    complete: bool
+    version: Tuple[int, ...]
+    loaded_at: float
+    checked_at: float
+    ids: Set[int] = field(default_factory=set)
+    size: int = 0
+
+    @property
+    def newest_id(self) -> int:
+        return max(self.ids) if self.ids else 0
+
+
+class HistoryCache:
+    def __init__(self, config: HistoryCacheConfig) -> None:
+        self._config = config
+        self._buffers: "OrderedDict[str, _Buffer]" = OrderedDict()
+        self._usernames: Dict[int, str] = {}
+        self._bytes = 0
+        self._lock = Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self._config.enabled
+
+    @property
+    def capacity(self) -> int:
+        return self._config.messages_per_user
+
+    def read(
+        self, username: str, *, limit: int, before: Optional[int], version: Optional[Tuple[int, ...]] = None
+    ) -> Optional[List[Dict[str, Any]]]:
+        """The requested page if the buffer can answer it; ``version`` (if given) must match its stamp."""
+
+        with self._lock:
+            buffer = self._buffers.get(username)
+            if buffer is None or (version is not None and buffer.version != version):
+                return None
+            now = time.monotonic()
+            if now - buffer.checked_at > self._config.max_staleness_seconds:
+                return None
+            if now - buffer.loaded_at > self._config.max_age_seconds:
+                return None
+            page = self._page(buffer, limit, before)
+            if page is not None:
+                self._buffers.move_to_end(username)
+            return page
+
+    def stale_buffer(self, username: str) -> Optional[Tuple[int, int]]:
+        """``(user_id, newest_id)`` of a buffer that may only need a tail refresh."""
+
+        with self._lock:
+            buffer = self._buffers.get(username)
+            # Without a newest id the tail query would scan every message; refill instead.
+            if buffer is None or not buffer.ids or time.monotonic() - buffer.loaded_at > self._config.max_age_seconds:
+                return None
+            return buffer.user_id, buffer.newest_id
+
+    def fill(
+        self, username: str, user_id: int, messages: List[Dict[str, Any]], version: Tuple[int, ...]
+    ) -> None:
+        now = time.monotonic()
+        buffer = _Buffer(
+            user_id=user_id,
+            messages=deque(maxlen=self.capacity),
+            complete=len(messages) < self.capacity,
+            version=version,
+            loaded_at=now,
+            checked_at=now,
+        )
+        with self._lock:
+            self._drop(username)
+            self._buffers[username] = buffer
+            self._usernames[user_id] = username
+            self._extend(buffer, messages)
+            self._enforce_cap()
+
+    def revalidate(self, username: str, newer: List[Dict[str, Any]], version: Tuple[int, ...]) -> None:
+        """Append messages found by the tail query and mark the buffer current as of ``version``."""
+
+        with self._lock:
+            buffer = self._buffers.get(username)
+            if buffer is None:
+                return
+            self._extend(buffer, newer)
+            buffer.version = version
+            buffer.checked_at = time.monotonic()
+            self._enforce_cap()
+
+    def append(self, user_id: int, messages: Iterable[Any]) -> None:
+        """Write through messages this process just committed."""
+
+        with self._lock:
+            username = self._usernames.get(user_id)
+            buffer = self._buffers.get(username) if username is not None else None
+            if buffer is None:
+                return
+            self._extend(buffer, [message_payload(message) for message in messages])
+            # Another worker's concurrent write may be folded into this version too;
+            # the unchanged ``checked_at`` still brings it in within the staleness bound.
+            buffer.version = DATA_VERSIONS.current(MESSAGE_TABLES)
+            self._enforce_cap()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buffers.clear()
+            self._usernames.clear()
+            self._bytes = 0
+            self._report()
+
+    def _page(self, buffer: _Buffer, limit: int, before: Optional[int]) -> Optional[List[Dict[str, Any]]]:
+        if before is None:
+            candidates = list(buffer.messages)
+        else:
+            candidates = [message for message in buffer.messages if message["id"] < before]
+        if len(candidates) < limit and not buffer.complete:
+            return None
+        return candidates[-limit:]
+
+    def _extend(self, buffer: _Buffer, messages: Iterable[Dict[str, Any]]) -> None:
+        for payload in messages:
+            if payload["id"] in buffer.ids:
+                continue
+            key = _order_key(payload)
+            if len(buffer.messages) == buffer.messages.maxlen:
+                if key < _order_key(buffer.messages[0]):
+                    # Sorts before the whole window, so it is not among the newest.
+                    buffer.complete = False
+                    continue
+                dropped = buffer.messages.popleft()
+                buffer.ids.discard(dropped["id"])
+                buffer.size -= _size(dropped)
+                self._bytes -= _size(dropped)
+                buffer.complete = False
+            if not buffer.messages or key > _order_key(buffer.messages[-1]):
+                buffer.messages.append(payload)
+            else:
+                # Keep the history endpoint's (created_at, id) order when clocks disagree.
+                buffer.messages.insert(bisect.bisect(buffer.messages, key, key=_order_key), payload)
+            buffer.ids.add(payload["id"])
+            buffer.size += _size(payload)
+            self._bytes += _size(payload)
+
+    def _drop(self, username: str) -> None:
+        buffer = self._buffers.pop(username, None)
+        if buffer is not None:
+            self._bytes -= buffer.size
+            self._usernames.pop(buffer.user_id, None)
+
+    def _enforce_cap(self) -> None:
+        while self._bytes > self._config.max_bytes and len(self._buffers) > 1:
+            self._drop(next(iter(self._buffers)))
+        self._report()
+
+    def _report(self) -> None:
+        BUFFERED_BYTES.set(self._bytes)
+        BUFFERED_USERS.set(len(self._buffers))
+
+
+@lru_cache(maxsize=1)
+def get_history_cache() -> HistoryCache:
+    return HistoryCache(HistoryCacheConfig.from_settings())
+
+
+async def _newer_messages(db: AsyncSession, user_id: int, newest_id: int) -> List[Dict[str, Any]]:
+    message = models.Message
+    rows = await db.execute(
+        select(message.content, message.id, message.role, message.created_at)
+        # No ORDER BY: sorting on created_at would tempt the planner off the (user_id, id)
+        # index, and ``_extend`` inserts in history order anyway.
+        .where(message.id > newest_id, message.user_id == user_id)
+    )
+    return [dict(row._mapping) for row in rows.all()]
+
+
+async def history_page_async(
+    db: AsyncSession,
+    *,
+    cache: HistoryCache,
+    username: str,
+    user_id_for: Callable[[], Awaitable[int]],
+    limit: int,
+    before: Optional[int],
+    version: Tuple[int, ...],
+) -> List[Dict[str, Any]]:
+    """Revalidate or refill ``username``'s buffer (``version`` read before querying), then page from it.
+
+    ``user_id_for`` looks the user up; it is only awaited when there is no buffer to revalidate.
+    """
+
+    stale = cache.stale_buffer(username)
+    if stale is not None:
+        user_id, newest_id = stale
+        newer = await _newer_messages(db, user_id, newest_id)
+        cache.revalidate(username, newer, version)
+        outcome = "revalidated" if newer else "confirmed"
+    else:
+        user_id = await user_id_for()
+        messages = await archive.message_history_async(db, user_id=user_id, limit=cache.capacity)
+        cache.fill(username, user_id, messages, version)
+        outcome = "filled"
+
+    page = cache.read(username, limit=limit, before=before)
+    if page is None:
+        # Older than anything the buffer holds.
+        outcome = "bypass"
+        page = await archive.message_history_async(db, user_id=user_id, limit=limit, before_id=before)
+    LOOKUPS.inc(outcome=outcome)
+    return page
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import hashlib
+from typing import Iterable, Optional
+
+from fastapi import Request, Response, status
+
+from ..config import settings
+from .data_version import DATA_VERSIONS
+
+CACHE_CONTROL = "private, no-cache"
+
+
+def etags_enabled() -> bool:
+    return bool(settings.get("http_cache", "etags", default=True))
+
+
+def version_etag(tables: Iterable[str], variant: str = "") -> str:
+    """Weak ETag from the current data versions of ``tables`` plus a per-representation variant."""
+
+    versions = ".".join(str(version) for version in DATA_VERSIONS.current(tables))
+    tag = f"{DATA_VERSIONS.epoch}-{versions}"
+    if variant:
+        tag += "-" + hashlib.blake2b(variant.encode("utf-8"), digest_size=6).hexdigest()
+    return f'W/"{tag}"'
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in if_none_match.split(","))
+
+
+def conditional_etag(request: Request, tables: Iterable[str], variant: str = "") -> tuple[Optional[str], Optional[Response]]:
+    """Return ``(etag, None)`` to serve fresh data, or ``(etag, 304 response)`` when the client is current.
+
+    Call this before any query so a write landing mid-request can only make the
+    ETag stale (forcing a later refetch), never newer than the payload.
+    """
+
+    if not etags_enabled():
+        return None, None
+    etag = version_etag(tables, variant)
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _matches(if_none_match, etag):
+        return etag, Response(
+            status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL}
+        )
+    return etag, None
+
+
+def set_etag(response: Response, etag: Optional[str]) -> None:
+    if etag is not None:
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = CACHE_CONTROL
@@ -0,0 +1,260 @@
+"""Local datagram listener for high-rate progress pings.
+
+Build tools send ``task|progress|note`` lines (the note is optional, several
+lines may share one datagram) over UDP or a Unix datagram socket. Pings are
+coalesced per task: only the latest value seen during each ``window_seconds``
+is kept, and every window is written as one ``apply_annotations`` batch, i.e.
+one ``TaskEvent`` per task and a single commit however many pings arrived.
+
+There is no authentication, so the listener binds to loopback by default and
+the Unix socket is only as open as its directory permits.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import selectors
+import socket
+import time
+from dataclasses import dataclass
+from threading import Event, Lock, Thread
+from typing import Dict, List, Optional, Tuple
+
+from ..config import settings
+from ..database import SessionLocal
+from .metrics import REGISTRY
+from .progress_tracker import ProgressAnnotation, apply_annotations
+
+logger = logging.getLogger(__name__)
+
+MAX_TASK_NAME_LENGTH = 120
+MAX_NOTE_LENGTH = 255
+
+PINGS = REGISTRY.counter("requiem_ingest_pings_total", "Progress pings received on the ingest socket, by outcome.")
+EVENTS_WRITTEN = REGISTRY.counter("requiem_ingest_events_written_total", "Task events written from coalesced pings.")
+FLUSH_SECONDS = REGISTRY.histogram(
+    "requiem_ingest_flush_seconds",
+    "Time taken to write one window of coalesced pings.",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+
+
+@dataclass(slots=True)
+class IngestConfig:
+    enabled: bool = False
+    udp_host: str = "127.0.0.1"
+    udp_port: int = 0
+    unix_socket: str = ""
+    window_seconds: float = 1.0
+    source: str = "socket-ingest"
+    receive_buffer_bytes: int = 1 << 20
+
+    @classmethod
+    def from_settings(cls) -> "IngestConfig":
+        config = settings.get("ingest", default=None)
+        if not config:
+            return cls()
+        return cls(
+            enabled=bool(config.get("enabled", False)),
+            udp_host=str(config.get("udp_host", "127.0.0.1")),
+            udp_port=max(0, int(config.get("udp_port", 0))),
+            unix_socket=str(config.get("unix_socket", "") or ""),
+            window_seconds=max(0.05, float(config.get("window_seconds", 1.0))),
+            source=str(config.get("source", "socket-ingest")),
+            receive_buffer_bytes=max(65536, int(config.get("receive_buffer_bytes", 1 << 20))),
+        )
+
+
+def parse_ping(line: str) -> Optional[ProgressAnnotation]:
+    """Parse one ``task|progress|note`` line; returns ``None`` if it is malformed."""
+
+    parts = line.split("|", 2)
+    if len(parts) < 2:
+        return None
+    task_name = parts[0].strip()
+    if not task_name or len(task_name) > MAX_TASK_NAME_LENGTH:
+        return None
+    try:
+        progress = max(0, min(100, int(parts[1])))
+    except ValueError:
+        return None
+    note = parts[2].strip()[:MAX_NOTE_LENGTH] if len(parts) == 3 else ""
+    return ProgressAnnotation(task_name=task_name, progress=progress, note=note or None)
+
+
+class Coalescer:
+    """Latest ping per task since the last ``drain``; arrival order is kept for the write."""
+
+    def __init__(self) -> None:
+        self._pending: Dict[str, ProgressAnnotation] = {}
+        self._lock = Lock()
+
+    def add(self, annotation: ProgressAnnotation) -> None:
+        with self._lock:
+            self._pending.pop(annotation.task_name, None)
+            self._pending[annotation.task_name] = annotation
+
+    def drain(self) -> List[ProgressAnnotation]:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        return list(pending.values())
+
+    def restore(self, annotations: List[ProgressAnnotation]) -> None:
+        """Put back a batch that failed to write, unless newer pings replaced it meanwhile."""
+
+        with self._lock:
+            restored = {annotation.task_name: annotation for annotation in annotations}
+            restored.update(self._pending)
+            self._pending = restored
+
+
+class IngestListener:
+    """A receiver thread feeding the coalescer and a flusher thread writing each window."""
+
+    def __init__(self, config: IngestConfig) -> None:
+        self._config = config
+        self._coalescer = Coalescer()
+        self._stop_event = Event()
+        self._sockets: List[socket.socket] = []
+        self._threads: List[Thread] = []
+
+    @property
+    def is_enabled(self) -> bool:
+        return self._config.enabled and bool(self._config.udp_port or self._config.unix_socket)
+
+    @property
+    def addresses(self) -> List[str]:
+        return [str(sock.getsockname()) for sock in self._sockets]
+
+    def start(self) -> None:
+        if not self.is_enabled:
+            logger.info("Progress ingest listener is disabled by configuration.")
+            return
+        if self._threads:
+            return
+        self._stop_event.clear()
+        self._sockets = self._bind()
+        self._threads = [
+            Thread(target=self._receive, name="ingest-receiver", daemon=True),
+            Thread(target=self._flush_loop, name="ingest-flusher", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+        logger.info("Progress ingest listening on %s (window=%ss).", ", ".join(self.addresses), self._config.window_seconds)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        if not self._threads:
+            return
+        self._stop_event.set()
+        deadline = time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(timeout=max(0.0, deadline - time.monotonic()))
+        self._threads = []
+        for sock in self._sockets:
+            sock.close()
+        self._sockets = []
+        if self._config.unix_socket:
+            try:
+                os.unlink(self._config.unix_socket)
+            except FileNotFoundError:
+                pass
+
+    def _bind(self) -> List[socket.socket]:
+        sockets: List[socket.socket] = []
+        if self._config.udp_port:
+            family = socket.AF_INET6 if ":" in self._config.udp_host else socket.AF_INET
+            sockets.append(self._open(family, (self._config.udp_host, self._config.udp_port)))
+        if self._config.unix_socket:
+            if not hasattr(socket, "AF_UNIX"):
+                logger.warning("Unix sockets are unavailable on this platform; ignoring ingest.unix_socket.")
+            else:
+                try:
+                    # A path left behind by a process that did not shut down cleanly.
+                    os.unlink(self._config.unix_socket)
+                except FileNotFoundError:
+                    pass
+                sockets.append(self._open(socket.AF_UNIX, self._config.unix_socket))
+        return sockets
+
+    def _open(self, family: int, address: object) -> socket.socket:
+        sock = socket.socket(family, socket.SOCK_DGRAM)
+        try:
+            # Bursts arrive faster than one thread can parse them; let the kernel buffer them.
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self._config.receive_buffer_bytes)
+        except OSError:
+            pass
+        sock.bind(address)
+        sock.setblocking(False)
+        return sock
+
+    def _receive(self) -> None:
+        with selectors.DefaultSelector() as selector:
+            for sock in self._sockets:
+                selector.register(sock, selectors.EVENT_READ)
+            while not self._stop_event.is_set():
+                for key, _ in selector.select(timeout=0.25):
+                    self._drain_socket(key.fileobj)  # type: ignore[arg-type]
+
+    def _drain_socket(self, sock: socket.socket) -> None:
+        while True:
+            try:
+                datagram = sock.recv(65535)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError as exc:
+                logger.warning("Ingest socket receive failed: %s", exc)
+                return
+            accepted, rejected = self.feed(datagram)
+            if accepted:
+                PINGS.inc(accepted, outcome="accepted")
+            if rejected:
+                PINGS.inc(rejected, outcome="rejected")
+
+    def feed(self, datagram: bytes) -> Tuple[int, int]:
+        """Parse one datagram into the coalescer; returns (accepted, rejected) line counts."""
+
+        accepted = rejected = 0
+        for line in datagram.decode("utf-8", errors="replace").splitlines():
+            if not line.strip():
+                continue
+            annotation = parse_ping(line)
+            if annotation is None:
+                rejected += 1
+                continue
+            self._coalescer.add(annotation)
+            accepted += 1
+        return accepted, rejected
+
+    def _flush_loop(self) -> None:
+        while not self._stop_event.wait(self._config.window_seconds):
+            self._flush_safely()
+        # Write whatever arrived in the final partial window.
+        self._flush_safely()
+
+    def _flush_safely(self) -> None:
+        try:
+            self.flush()
+        except Exception as exc:  # noqa: BLE001 - background safety net
+            logger.exception("Progress ingest flush failed: %s", exc)
+
+    def flush(self) -> int:
+        """Write the pending window; returns the number of events stored."""
+
+        annotations = self._coalescer.drain()
+        if not annotations:
+            return 0
+        started = time.perf_counter()
+        try:
+            with SessionLocal() as session:
+                events = apply_annotations(session, annotations, source=self._config.source)
+                session.commit()
+        except Exception:
+            self._coalescer.restore(annotations)
+            raise
+        FLUSH_SECONDS.observe(time.perf_counter() - started)
+        EVENTS_WRITTEN.inc(len(events))
+        return len(events)
+
+
+def create_listener_from_config() -> IngestListener:
+    return IngestListener(IngestConfig.from_settings())
@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import asyncio
+import hmac
+import json
+import logging
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qsl
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+_PROFILE_ID = re.compile(r"^[0-9a-f]{32}$")
+
+# Leaf frames of threads that are parked rather than doing work for a request.
+_IDLE_LEAVES = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+}
+
+
+@dataclass(slots=True)
+class ProfilingConfig:
+    enabled: bool = False
+    token: str = ""
+    header: str = "X-Requiem-Profile"
+    query_param: str = "__profile"
+    interval_ms: float = 5.0
+    directory: str = "profiles"
+    max_profiles: int = 50
+
+    @classmethod
+    def from_settings(cls) -> "ProfilingConfig":
+        config = settings.get("profiling", default=None)
+        if not config:
+            return cls()
+        return cls(
+            enabled=bool(config.get("enabled", False)),
+            token=str(config.get("token") or ""),
+            header=str(config.get("header", "X-Requiem-Profile")),
+            query_param=str(config.get("query_param", "__profile")),
+            interval_ms=max(1.0, float(config.get("interval_ms", 5))),
+            directory=str(config.get("directory", "profiles")),
+            max_profiles=max(1, int(config.get("max_profiles", 50))),
+        )
+
+
+@dataclass(slots=True)
+class ProfileInfo:
+    id: str
+    method: str
+    path: str
+    status_code: Optional[int]
+    duration_ms: float
+    samples: int
+    created_at: str
+
+
+class StackSampler:
+    """Samples every thread's Python stack at a fixed interval into collapsed-stack counts."""
+
+    def __init__(self, interval_seconds: float) -> None:
+        self._interval = interval_seconds
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self.stacks: Counter[str] = Counter()
+        self.samples = 0
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        while not self._stop.wait(self._interval):
+            self.samples += 1
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                code = frame.f_code
+                if (Path(code.co_filename).name, code.co_name) in _IDLE_LEAVES:
+                    continue
+                parts = []
+                while frame is not None:
+                    code = frame.f_code
+                    parts.append(f"{code.co_name} ({Path(code.co_filename).name}:{frame.f_lineno})")
+                    frame = frame.f_back
+                if thread_id not in names:
+                    names = {thread.ident: thread.name for thread in threading.enumerate()}
+                parts.append(names.get(thread_id) or f"thread-{thread_id}")
+                self.stacks[";".join(reversed(parts))] += 1
+
+
+class ProfileStore:
+    """Bounded on-disk ring of collapsed-stack profiles; the oldest entries are evicted."""
+
+    def __init__(self, directory: Path, max_profiles: int) -> None:
+        self.directory = directory
+        self.max_profiles = max_profiles
+        self._lock = threading.Lock()
+
+    def save(self, info: ProfileInfo, stacks: Counter[str]) -> None:
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            collapsed = "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+            (self.directory / f"{info.id}.collapsed").write_text(collapsed, encoding="utf-8")
+            (self.directory / f"{info.id}.json").write_text(json.dumps(asdict(info)), encoding="utf-8")
+            self._evict()
+
+    def _evict(self) -> None:
+        metadata = sorted(self.directory.glob("*.json"), key=lambda path: path.stat().st_mtime)
+        for path in metadata[: max(0, len(metadata) - self.max_profiles)]:
+            path.unlink(missing_ok=True)
+            path.with_suffix(".collapsed").unlink(missing_ok=True)
+
+    def list(self) -> List[ProfileInfo]:
+        if not self.directory.exists():
+            return []
+        entries = []
+        for path in self.directory.glob("*.json"):
+            try:
+                entries.append(ProfileInfo(**json.loads(path.read_text(encoding="utf-8"))))
+            except (OSError, ValueError, TypeError):
+                logger.debug("Skipping unreadable profile metadata %s", path)
+        entries.sort(key=lambda entry: entry.created_at, reverse=True)
+        return entries
+
+    def collapsed_path(self, profile_id: str) -> Path | None:
+        if not _PROFILE_ID.match(profile_id):
+            return None
+        path = self.directory / f"{profile_id}.collapsed"
+        return path if path.exists() else None
+
+
+class ProfilingMiddleware:
+    """ASGI middleware that profiles a request only when it carries the profiling token."""
+
+    def __init__(self, app: Any, config: ProfilingConfig, store: ProfileStore) -> None:
+        self.app = app
+        self._token = config.token.encode("utf-8")
+        self._header = config.header.lower().encode("latin-1")
+        self._query_param = config.query_param
+        self._interval = config.interval_ms / 1000
+        self._store = store
+
+    def _requested(self, scope: Dict[str, Any]) -> bool:
+        for name, value in scope.get("headers", ()):
+            if name == self._header:
+                return hmac.compare_digest(value, self._token)
+        query = scope.get("query_string", b"")
+        if query and self._query_param.encode("latin-1") in query:
+            for name, value in parse_qsl(query.decode("latin-1")):
+                if name == self._query_param:
+                    return hmac.compare_digest(value.encode("latin-1"), self._token)
+        return False
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http" or not self._requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex
+        status_code: Optional[int] = None
+
+        async def send_with_profile_id(message: Dict[str, Any]) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"x-requiem-profile-id", profile_id.encode("ascii")),
+                ]
+            await send(message)
+
+        sampler = StackSampler(self._interval)
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            sampler.stop()
+            info = ProfileInfo(
+                id=profile_id,
+                method=scope.get("method", ""),
+                path=scope.get("path", ""),
+                status_code=status_code,
+                duration_ms=round((time.perf_counter() - started) * 1000, 3),
+                samples=sampler.samples,
+                created_at=datetime.utcnow().isoformat(),
+            )
+            await asyncio.to_thread(self._store.save, info, sampler.stacks)
+
+
+def profile_store_from_config(config: ProfilingConfig | None = None) -> ProfileStore:
+    config = config or ProfilingConfig.from_settings()
+    return ProfileStore(Path(config.directory), config.max_profiles)
@@ -3,13 +3,16 @@ from __future__ import annotations
 import logging
 import re
 from dataclasses import dataclass
-from typing import Iterable, List
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Mapping, Sequence, Tuple
 
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy import ColumnElement, Integer, Row, Select, String, case, cast, delete, exists, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, lazyload
 
 from .. import models
 from ..config import settings
+from . import forecast, progress_view
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +20,10 @@ _PROGRESS_BLOCK_PATTERN = re.compile(
     r"\[progress\|(?P<task>[^|\]]+)\|(?P<value>\d{1,3})(?:\|(?P<note>[^\]]+))?\]",
     flags=re.IGNORECASE,
 )
+_PROGRESS_BLOCK_MARKER = "[progress|"
+
+GENERATION_KEY = "progress_generation"
+_RETIRED_NAME_PREFIX = "~retired-"
 
 
 @dataclass(slots=True)
@@ -32,7 +39,10 @@ def _clamp_progress(value: int) -> int:
 
 def extract_progress_annotations(message: str) -> List[ProgressAnnotation]:
     annotations: List[ProgressAnnotation] = []
-    for match in _PROGRESS_BLOCK_PATTERN.finditer(message or ""):
+    # Most chat messages carry no annotations; a substring probe is far cheaper than the regex.
+    if not message or "|" not in message or _PROGRESS_BLOCK_MARKER not in message.lower():
+        return annotations
+    for match in _PROGRESS_BLOCK_PATTERN.finditer(message):
         task_name = match.group("task").strip()
         if not task_name:
             continue
@@ -53,15 +63,116 @@ def extract_progress_annotations(message: str) -> List[ProgressAnnotation]:
     return annotations
 
 
+def active_generation() -> ColumnElement[int]:
+    """The live progress generation as a scalar subquery.
+
+    Every task and event read filters on it, so scoping costs no extra round trip
+    and a query can never mix rows from before and after a reset.
+    """
+
+    metadata = models.AppMetadata
+    stored = (
+        select(cast(metadata.value, Integer)).where(metadata.key == GENERATION_KEY).scalar_subquery()
+    )
+    return func.coalesce(stored, 0)
+
+
+def current_generation(db: Session) -> int:
+    return int(db.scalar(select(active_generation())))
+
+
+def _task_row(task: models.Task) -> Dict[str, Any]:
+    return {name: getattr(task, name) for name in progress_view.TASK_FIELDS}
+
+
+def _event_row(event: models.TaskEvent, task_name: str) -> Dict[str, Any]:
+    return {
+        "id": event.id,
+        "task_id": event.task_id,
+        "task_name": task_name,
+        "progress": event.progress,
+        "source": event.source,
+        "note": event.note,
+        "created_at": event.created_at,
+    }
+
+
+def _record_for_view(
+    db: Session, tasks: Sequence[models.Task], events: Sequence[models.TaskEvent] = (), *, reloaded: bool = True
+) -> None:
+    """Queue written rows for the in-process read model; see ``progress_view``.
+
+    ``reloaded`` says the task objects already hold their stored values (e.g.
+    from ``RETURNING``). Otherwise the ``version + 1`` expressions were expired
+    by the flush and the rows are read back in one query.
+    """
+
+    if not tasks or not progress_view.get_progress_view().enabled:
+        return
+    if reloaded:
+        rows = {task.id: _task_row(task) for task in tasks}
+    else:
+        query = _task_rows_query().where(models.Task.id.in_({task.id for task in tasks}))
+        rows = {row.id: dict(row._mapping) for row in db.execute(query)}
+    progress_view.record(
+        db,
+        generation=tasks[0].generation,
+        tasks=rows.values(),
+        events=[_event_row(event, rows[event.task_id]["name"]) for event in events if event.task_id in rows],
+    )
+
+
+def _insert_missing_tasks(db: Session, task_names: Sequence[str]) -> None:
+    generation = current_generation(db)
+    rows = [{"name": name, "progress": 0, "generation": generation} for name in task_names]
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    elif dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        # No portable ON CONFLICT; isolate each insert so a concurrent winner is tolerated.
+        from sqlalchemy.exc import IntegrityError
+
+        for row in rows:
+            try:
+                with db.begin_nested():
+                    db.execute(insert(models.Task), [row])
+            except IntegrityError:
+                logger.debug("Task '%s' was created concurrently", row["name"])
+        return
+
+    stmt = dialect_insert(models.Task).on_conflict_do_nothing(index_elements=[models.Task.name])
+    db.execute(stmt, rows)
+
+
+def resolve_tasks(db: Session, task_names: Iterable[str]) -> Dict[str, models.Task]:
+    """Load tasks by name, creating any that are missing, in a constant number of queries."""
+
+    names = list(dict.fromkeys(task_names))
+    if not names:
+        return {}
+
+    # Skip the selectin event collection; callers only need the task rows themselves.
+    query = (
+        select(models.Task)
+        .options(lazyload(models.Task.events))
+        .where(models.Task.generation == active_generation())
+    )
+    resolved = {
+        task.name: task for task in db.execute(query.where(models.Task.name.in_(names))).scalars()
+    }
+    missing = [name for name in names if name not in resolved]
+    if missing:
+        _insert_missing_tasks(db, missing)
+        resolved.update(
+            (task.name, task) for task in db.execute(query.where(models.Task.name.in_(missing))).scalars()
+        )
+    return resolved
+
+
 def get_or_create_task(db: Session, task_name: str) -> models.Task:
-    task = db.execute(
-        select(models.Task).where(models.Task.name == task_name)
-    ).scalar_one_or_none()
-    if task is None:
-        task = models.Task(name=task_name, progress=0)
-        db.add(task)
-        db.flush()
-    return task
+    return resolve_tasks(db, [task_name])[task_name]
 
 
 def apply_progress_event(
@@ -74,37 +185,231 @@ def apply_progress_event(
 ) -> models.TaskEvent:
     progress_value = _clamp_progress(progress_value)
     task.progress = progress_value
-    event = models.TaskEvent(task_id=task.id, progress=progress_value, source=source, note=note)
+    task.version = models.Task.version + 1
+    forecast.record_progress_sample(task, progress_value)
+    event = models.TaskEvent(
+        task_id=task.id, progress=progress_value, source=source, note=note, generation=task.generation
+    )
     db.add(event)
     db.flush()
+    _record_for_view(db, [task], [event], reloaded=False)
     return event
 
 
+def apply_annotations(
+    db: Session,
+    annotations: Sequence[ProgressAnnotation],
+    *,
+    source: str,
+    default_note: str | None = None,
+) -> List[models.TaskEvent]:
+    """Record a batch of annotations with one task lookup and one event insert."""
+
+    if not annotations:
+        return []
+
+    tasks = resolve_tasks(db, (annotation.task_name for annotation in annotations))
+    rows = []
+    for annotation in annotations:
+        task = tasks[annotation.task_name]
+        progress_value = _clamp_progress(annotation.progress)
+        task.progress = progress_value
+        task.version = models.Task.version + 1
+        forecast.record_progress_sample(task, progress_value)
+        rows.append(
+            {
+                "task_id": task.id,
+                "progress": progress_value,
+                "source": source,
+                "note": annotation.note or default_note,
+                "generation": task.generation,
+            }
+        )
+
+    events = list(db.scalars(insert(models.TaskEvent).returning(models.TaskEvent), rows))
+    db.flush()
+    _record_for_view(db, list(tasks.values()), events, reloaded=False)
+    return events
+
+
+def advance_tasks(
+    db: Session,
+    *,
+    step: int,
+    limit: int = 1,
+    step_overrides: Mapping[str, int] | None = None,
+    only: Sequence[str] | None = None,
+    exclude: Sequence[str] | None = None,
+) -> List[models.Task]:
+    """Atomically advance the ``limit`` stalest incomplete tasks.
+
+    Selection and increment happen inside a single ``UPDATE ... RETURNING`` so
+    concurrent writers can never read the same progress value and lose a step.
+    ``only`` and ``exclude`` restrict the candidates by task name.
+    """
+
+    increment = max(1, step)
+    if step_overrides:
+        increment = case(
+            {name: max(1, value) for name, value in step_overrides.items()},
+            value=models.Task.name,
+            else_=increment,
+        )
+    advanced = models.Task.progress + increment
+
+    stalest = (
+        select(models.Task.id)
+        .where(models.Task.progress < 100, models.Task.generation == active_generation())
+        .order_by(models.Task.updated_at, models.Task.id)
+        .limit(max(1, limit))
+    )
+    if only is not None:
+        stalest = stalest.where(models.Task.name.in_(only))
+    if exclude:
+        stalest = stalest.where(models.Task.name.not_in(exclude))
+    stmt = (
+        update(models.Task)
+        .where(models.Task.id.in_(stalest.scalar_subquery()))
+        .values(
+            progress=case((advanced > 100, 100), else_=advanced),
+            version=models.Task.version + 1,
+            updated_at=datetime.utcnow(),
+        )
+        .returning(models.Task)
+        .execution_options(synchronize_session=False, populate_existing=True)
+    )
+    tasks = list(db.scalars(stmt))
+    tasks.sort(key=lambda task: task.updated_at)
+    # The velocity state is folded in afterwards; a sample lost to a concurrent
+    # writer only perturbs the estimate, never the progress value itself.
+    for task in tasks:
+        forecast.record_progress_sample(task, task.progress, task.updated_at)
+    if tasks and progress_view.get_progress_view().enabled:
+        # The samples bump ``updated_at`` again when flushed, and a batched flush
+        # leaves the objects holding one value for every row, so read them back.
+        db.flush()
+        _record_for_view(db, tasks, reloaded=False)
+    return tasks
+
+
 def advance_next_task(db: Session, step: int) -> models.Task | None:
-    task = db.execute(
-        select(models.Task).where(models.Task.progress < 100).order_by(models.Task.updated_at)
-    ).scalar_one_or_none()
-    if task is None:
-        return None
-    bounded_step = max(1, step)
-    increment = bounded_step if task.progress <= 100 - bounded_step else max(1, 100 - task.progress)
-    task.progress = min(100, task.progress + increment)
-    db.add(task)
+    tasks = advance_tasks(db, step=step, limit=1)
+    return tasks[0] if tasks else None
+
+
+def update_task_if_current(
+    db: Session,
+    task_id: int,
+    *,
+    expected_version: int,
+    name: str,
+    progress_value: int,
+    description: str | None,
+) -> models.Task | None:
+    """Apply a manual edit only if nobody else changed the task since ``expected_version``."""
+
+    stmt = (
+        update(models.Task)
+        .where(
+            models.Task.id == task_id,
+            models.Task.version == expected_version,
+            models.Task.generation == active_generation(),
+        )
+        .values(
+            name=name,
+            progress=_clamp_progress(progress_value),
+            description=description,
+            version=models.Task.version + 1,
+            updated_at=datetime.utcnow(),
+        )
+        .returning(models.Task)
+        .execution_options(synchronize_session=False, populate_existing=True)
+    )
+    task = db.scalars(stmt).one_or_none()
+    if task is not None:
+        _record_for_view(db, [task])
     return task
 
 
-def get_recent_events(db: Session, limit: int) -> List[models.TaskEvent]:
+def _tasks_query() -> Select:
+    return (
+        select(models.Task)
+        .options(lazyload(models.Task.events))
+        .where(models.Task.generation == active_generation())
+        .order_by(models.Task.id)
+    )
+
+
+def _recent_events_query(limit: int) -> Select:
+    # Eager-load the owning task for ``task_name`` but not that task's full event history.
     return (
-        db.execute(
-            select(models.TaskEvent)
-            .order_by(models.TaskEvent.created_at.desc())
-            .limit(limit)
+        select(models.TaskEvent)
+        .options(joinedload(models.TaskEvent.task).lazyload(models.Task.events))
+        .where(models.TaskEvent.generation == active_generation())
+        .order_by(models.TaskEvent.created_at.desc())
+        .limit(limit)
+    )
+
+
+# Column-only variants for read endpoints that serialise rows straight to JSON.
+# Labels match the ``TaskResponse`` / ``TaskEventResponse`` field names.
+def _task_rows_query() -> Select:
+    task = models.Task
+    return (
+        select(task.name, task.progress, task.description, task.id, task.version, task.updated_at)
+        .where(task.generation == active_generation())
+        .order_by(task.id)
+    )
+
+
+def _recent_event_rows_query(limit: int) -> Select:
+    event = models.TaskEvent
+    return (
+        select(
+            event.id,
+            event.task_id,
+            models.Task.name.label("task_name"),
+            event.progress,
+            event.source,
+            event.note,
+            event.created_at,
         )
-        .scalars()
-        .all()
+        .join(models.Task, models.Task.id == event.task_id)
+        .where(event.generation == active_generation())
+        .order_by(event.created_at.desc())
+        .limit(limit)
     )
 
 
+def _stamp_query() -> Select:
+    """One row matching ``ProgressSnapshot.stamp``: (generation, newest event id, task count, version sum)."""
+
+    generation = active_generation()
+    event, task = models.TaskEvent, models.Task
+    newest_event = (
+        select(func.coalesce(func.max(event.id), 0)).where(event.generation == generation).scalar_subquery()
+    )
+    return select(
+        generation, newest_event, func.count(task.id), func.coalesce(func.sum(task.version), 0)
+    ).where(task.generation == generation)
+
+
+def list_tasks(db: Session) -> List[models.Task]:
+    return list(db.execute(_tasks_query()).scalars().all())
+
+
+def get_recent_events(db: Session, limit: int) -> List[models.TaskEvent]:
+    return list(db.execute(_recent_events_query(limit)).scalars().all())
+
+
+def list_task_rows(db: Session) -> List[Row]:
+    return list(db.execute(_task_rows_query()).all())
+
+
+def get_recent_event_rows(db: Session, limit: int) -> List[Row]:
+    return list(db.execute(_recent_event_rows_query(limit)).all())
+
+
 def calculate_overall_progress(tasks: Iterable[models.Task]) -> float:
     tasks_list = list(tasks)
     if not tasks_list:
@@ -113,18 +418,194 @@ def calculate_overall_progress(tasks: Iterable[models.Task]) -> float:
     return round(total / len(tasks_list), 2)
 
 
+def seed_tasks_from_config(db: Session) -> None:
+    """Create configured tasks that are missing and align existing ones with the config."""
+
+    existing_tasks = {task.name: task for task in list_tasks(db)}
+    generation = current_generation(db)
+    written: List[models.Task] = []
+    for entry in getattr(settings, "progress", None) or []:
+        task = existing_tasks.get(entry["name"])
+        if task:
+            progress_value = entry.get("progress", task.progress)
+            description = entry.get("description", task.description)
+            if progress_value == task.progress and description == task.description:
+                continue
+            if progress_value != task.progress:
+                forecast.reset_velocity(task)
+            task.progress = progress_value
+            task.description = description
+            # Like every other write, so running workers' read-model stamps stop matching.
+            task.version = models.Task.version + 1
+            written.append(task)
+        else:
+            task = models.Task(
+                name=entry["name"],
+                progress=entry.get("progress", 0),
+                description=entry.get("description"),
+                generation=generation,
+            )
+            db.add(task)
+            written.append(task)
+    db.flush()
+    _record_for_view(db, written, reloaded=False)
+
+
+def start_new_generation(db: Session) -> int:
+    """Retire every task and event at once; returns the new generation number."""
+
+    metadata = models.AppMetadata
+    stored = db.scalar(
+        update(metadata)
+        .where(metadata.key == GENERATION_KEY)
+        .values(value=cast(cast(metadata.value, Integer) + 1, String), updated_at=datetime.utcnow())
+        .returning(metadata.value)
+        .execution_options(synchronize_session=False)
+    )
+    if stored is None:
+        db.add(metadata(key=GENERATION_KEY, value="1"))
+        db.flush()
+        stored = "1"
+    generation = int(stored)
+    # ``uq_task_name`` spans generations, so retired tasks give up their names.
+    # There are only ever a handful of tasks; the events are left for the reaper.
+    db.execute(
+        update(models.Task)
+        .where(models.Task.generation < generation, ~models.Task.name.startswith(_RETIRED_NAME_PREFIX))
+        .values(name=_RETIRED_NAME_PREFIX + cast(models.Task.id, String))
+        .execution_options(synchronize_session=False)
+    )
+    return generation
+
+
 def reset_progress_from_config(db: Session) -> List[models.Task]:
-    db.query(models.TaskEvent).delete()
-    db.query(models.Task).delete()
+    """Start a new generation seeded from the config; old rows are purged in the background."""
 
+    generation = start_new_generation(db)
     seeded_tasks: List[models.Task] = []
     for entry in getattr(settings, "progress", []):
         task = models.Task(
             name=entry["name"],
             progress=_clamp_progress(int(entry.get("progress", 0))),
             description=entry.get("description"),
+            generation=generation,
         )
         db.add(task)
         seeded_tasks.append(task)
     db.flush()
+    progress_view.record(db, generation=generation, tasks=[_task_row(task) for task in seeded_tasks], reset=True)
     return seeded_tasks
+
+
+def purge_retired_generations(db: Session, *, batch_size: int) -> Tuple[int, int]:
+    """Delete up to ``batch_size`` events from earlier generations, then their emptied tasks.
+
+    Returns the number of (events, tasks) removed. The statements run on the
+    connection rather than through the ORM so they do not bump the data versions:
+    nothing a reader can see changes.
+    """
+
+    event, task = models.TaskEvent, models.Task
+    connection = db.connection()
+    doomed = select(event.id).where(event.generation < active_generation()).limit(batch_size)
+    events = connection.execute(delete(event).where(event.id.in_(doomed.scalar_subquery()))).rowcount
+    tasks = 0
+    if events < batch_size:
+        tasks = connection.execute(
+            delete(task).where(
+                task.generation < active_generation(),
+                ~exists().where(event.task_id == task.id),
+            )
+        ).rowcount
+    return events, tasks
+
+
+# Async variants: reads run natively on the AsyncSession, writes reuse the sync
+# implementations through ``run_sync`` so there is a single code path to maintain.
+
+
+async def get_task_async(db: AsyncSession, task_id: int) -> models.Task | None:
+    stmt = _tasks_query().where(models.Task.id == task_id)
+    return (await db.scalars(stmt)).one_or_none()
+
+
+async def list_tasks_async(db: AsyncSession) -> List[models.Task]:
+    return list((await db.scalars(_tasks_query())).all())
+
+
+async def get_recent_events_async(db: AsyncSession, limit: int) -> List[models.TaskEvent]:
+    return list((await db.scalars(_recent_events_query(limit))).all())
+
+
+async def list_task_rows_async(db: AsyncSession) -> List[Row]:
+    return list((await db.execute(_task_rows_query())).all())
+
+
+async def get_recent_event_rows_async(db: AsyncSession, limit: int) -> List[Row]:
+    return list((await db.execute(_recent_event_rows_query(limit))).all())
+
+
+async def progress_report_async(
+    db: AsyncSession, *, limit: int, data_version: Tuple[int, ...]
+) -> Dict[str, Any]:
+    """The ``GET /progress/`` payload, confirming or reloading the read model as needed.
+
+    ``data_version`` must be read before calling, like the ETag, so a write that
+    lands during the queries can only make the snapshot look stale.
+    """
+
+    view = progress_view.get_progress_view()
+    if not view.enabled or limit > view.capacity:
+        tasks = await list_task_rows_async(db)
+        events = await get_recent_event_rows_async(db, limit=limit)
+        progress_view.READS.inc(outcome="bypass")
+        return {
+            "tasks": [dict(row._mapping) for row in tasks],
+            "events": [dict(row._mapping) for row in events],
+            "overall_progress": calculate_overall_progress(tasks),
+        }
+
+    snapshot = view.snapshot
+    stamp = tuple((await db.execute(_stamp_query())).one())
+    if snapshot is not None and snapshot.stamp == stamp:
+        view.confirm(snapshot, data_version)
+        progress_view.READS.inc(outcome="confirmed")
+        return snapshot.report(limit)
+
+    tasks = await list_task_rows_async(db)
+    events = await get_recent_event_rows_async(db, limit=view.capacity)
+    snapshot = view.load(
+        generation=stamp[0],
+        newest_event_id=stamp[1],
+        tasks=[dict(row._mapping) for row in tasks],
+        events=[dict(row._mapping) for row in events],
+        data_version=data_version,
+    )
+    progress_view.READS.inc(outcome="reloaded")
+    return snapshot.report(limit)
+
+
+async def get_or_create_task_async(db: AsyncSession, task_name: str) -> models.Task:
+    return await db.run_sync(get_or_create_task, task_name)
+
+
+async def apply_progress_event_async(db: AsyncSession, **kwargs) -> models.TaskEvent:
+    return await db.run_sync(apply_progress_event, **kwargs)
+
+
+async def apply_annotations_async(
+    db: AsyncSession, annotations: Sequence[ProgressAnnotation], **kwargs
+) -> List[models.TaskEvent]:
+    return await db.run_sync(apply_annotations, annotations, **kwargs)
+
+
+async def advance_next_task_async(db: AsyncSession, step: int) -> models.Task | None:
+    return await db.run_sync(advance_next_task, step)
+
+
+async def update_task_if_current_async(db: AsyncSession, task_id: int, **kwargs) -> models.Task | None:
+    return await db.run_sync(update_task_if_current, task_id, **kwargs)
+
+
+async def reset_progress_from_config_async(db: AsyncSession) -> List[models.Task]:
+    return await db.run_sync(reset_progress_from_config)
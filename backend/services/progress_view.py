@@ -0,0 +1,284 @@
+"""In-process read model behind ``GET /progress/``.
+
+The task list, the overall progress and the newest ``event_history_limit``
+events are held as an immutable ``ProgressSnapshot``. Writers build the next
+snapshot under a lock and swap the reference; readers take the reference
+without locking, so one response can never mix two writes.
+
+Writes made through ``progress_tracker`` queue the rows they changed on the
+session. Those rows are folded into the snapshot after the transaction commits
+and dropped if it rolls back.
+
+Each snapshot carries a stamp: the generation, the newest event id, the task
+count and the sum of task versions. Every task write bumps a version and events
+are only ever appended, so a stamp matching the database's means the snapshot is
+current. A snapshot is served without any query while the ``tasks`` /
+``task_events`` data versions are unchanged and it was checked within
+``max_staleness_seconds``. Otherwise ``progress_tracker`` compares stamps with
+one small query and reloads only if they differ. Writes from other workers, or
+made directly in the database, are therefore visible within
+``max_staleness_seconds``.
+"""
+from __future__ import annotations
+
+import bisect
+import time
+from collections import deque
+from dataclasses import dataclass, field, replace
+from functools import lru_cache
+from threading import Lock
+from typing import Any, Deque, Dict, Iterable, Mapping, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from .metrics import REGISTRY
+
+# Field names match ``TaskResponse`` / ``TaskEventResponse`` and the row queries in ``progress_tracker``.
+TASK_FIELDS = ("name", "progress", "description", "id", "version", "updated_at")
+EVENT_FIELDS = ("id", "task_id", "task_name", "progress", "source", "note", "created_at")
+
+_PENDING_KEY = "progress_view_pending"
+
+READS = REGISTRY.counter(
+    "requiem_progress_view_reads_total",
+    "Progress reports by how the read model served them (hit, confirmed, reloaded, bypass).",
+)
+WRITES = REGISTRY.counter(
+    "requiem_progress_view_writes_total",
+    "Committed progress writes by what the read model did with them (applied, ignored, invalidated).",
+)
+
+
+@dataclass(slots=True)
+class ProgressViewConfig:
+    enabled: bool = True
+    max_staleness_seconds: float = 1.0
+    event_capacity: int = 20
+
+    @classmethod
+    def from_settings(cls) -> "ProgressViewConfig":
+        capacity = max(1, int(settings.get("progress_settings", "event_history_limit", default=20)))
+        config = settings.get("progress_settings", "read_model", default=None)
+        if not config:
+            return cls(event_capacity=capacity)
+        return cls(
+            enabled=bool(config.get("enabled", True)),
+            max_staleness_seconds=max(0.0, float(config.get("max_staleness_seconds", 1.0))),
+            event_capacity=capacity,
+        )
+
+
+Stamp = Tuple[int, int, int, int]
+
+
+@dataclass(frozen=True, slots=True)
+class ProgressSnapshot:
+    version: int
+    generation: int
+    tasks: Tuple[Dict[str, Any], ...]
+    # Newest first, as ``GET /progress/`` returns them.
+    events: Tuple[Dict[str, Any], ...]
+    overall_progress: float
+    stamp: Stamp
+    data_version: Tuple[int, ...]
+    checked_at: float
+
+    def report(self, limit: int) -> Dict[str, Any]:
+        return {
+            "tasks": list(self.tasks),
+            "events": list(self.events[:limit]),
+            "overall_progress": self.overall_progress,
+        }
+
+
+@dataclass(slots=True)
+class _PendingWrites:
+    generation: int
+    reset: bool = False
+    tasks: Dict[int, Dict[str, Any]] = field(default_factory=dict)
+    events: Dict[int, Dict[str, Any]] = field(default_factory=dict)
+
+
+def _event_key(row: Mapping[str, Any]) -> Tuple[Any, int]:
+    return row["created_at"], row["id"]
+
+
+class ProgressView:
+    def __init__(self, config: ProgressViewConfig) -> None:
+        self._config = config
+        self._lock = Lock()
+        self._snapshot: Optional[ProgressSnapshot] = None
+        self._version = 0
+        # Writer-side state; snapshots only ever hold copies of it.
+        self._generation = 0
+        self._tasks: Dict[int, Dict[str, Any]] = {}
+        self._events: Deque[Dict[str, Any]] = deque(maxlen=config.event_capacity)
+        self._newest_event_id = 0
+        self._progress_sum = 0
+        self._version_sum = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._config.enabled
+
+    @property
+    def capacity(self) -> int:
+        return self._config.event_capacity
+
+    @property
+    def snapshot(self) -> Optional[ProgressSnapshot]:
+        return self._snapshot
+
+    def read(self, *, limit: int, data_version: Tuple[int, ...]) -> Optional[Dict[str, Any]]:
+        """The report if the snapshot needs no database check; ``data_version`` must be read first."""
+
+        snapshot = self._snapshot
+        if snapshot is None or limit > self.capacity or snapshot.data_version != data_version:
+            return None
+        if time.monotonic() - snapshot.checked_at > self._config.max_staleness_seconds:
+            return None
+        return snapshot.report(limit)
+
+    def confirm(self, snapshot: ProgressSnapshot, data_version: Tuple[int, ...]) -> None:
+        """Mark ``snapshot`` current as of ``data_version`` after its stamp matched the database."""
+
+        with self._lock:
+            # A write applied meanwhile keeps its own (older) stamp; the next read re-checks it.
+            if self._snapshot is snapshot:
+                self._snapshot = replace(snapshot, data_version=data_version, checked_at=time.monotonic())
+
+    def load(
+        self,
+        *,
+        generation: int,
+        newest_event_id: int,
+        tasks: Iterable[Dict[str, Any]],
+        events: Iterable[Dict[str, Any]],
+        data_version: Tuple[int, ...],
+    ) -> ProgressSnapshot:
+        """Replace everything with freshly queried rows (events newest first)."""
+
+        with self._lock:
+            self._generation = generation
+            self._tasks = {row["id"]: row for row in tasks}
+            self._events = deque(sorted(events, key=_event_key), maxlen=self.capacity)
+            self._newest_event_id = max([newest_event_id, *(row["id"] for row in self._events)])
+            self._progress_sum = sum(row["progress"] for row in self._tasks.values())
+            self._version_sum = sum(row["version"] for row in self._tasks.values())
+            return self._publish(data_version, time.monotonic())
+
+    def apply(self, pending: _PendingWrites) -> None:
+        with self._lock:
+            if self._snapshot is None or pending.generation < self._generation:
+                WRITES.inc(outcome="ignored")
+                return
+            if pending.reset:
+                self._generation = pending.generation
+                self._tasks = {}
+                self._events.clear()
+                self._newest_event_id = 0
+                self._progress_sum = self._version_sum = 0
+            elif pending.generation > self._generation:
+                # A reset committed elsewhere; only a reload has the whole new generation.
+                self._snapshot = None
+                WRITES.inc(outcome="invalidated")
+                return
+            for row in pending.tasks.values():
+                self._apply_task(row)
+            for row in pending.events.values():
+                self._apply_event(row)
+            # Keep the last confirmed data version: this commit has bumped it, so the
+            # next read compares stamps with the database before trusting the result.
+            self._publish(self._snapshot.data_version, self._snapshot.checked_at)
+            WRITES.inc(outcome="applied")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._snapshot = None
+
+    def _apply_task(self, row: Dict[str, Any]) -> None:
+        previous = self._tasks.get(row["id"])
+        if previous is not None:
+            if previous["version"] > row["version"]:
+                # A later write to the same task committed and was applied first.
+                return
+            self._progress_sum -= previous["progress"]
+            self._version_sum -= previous["version"]
+        self._tasks[row["id"]] = row
+        self._progress_sum += row["progress"]
+        self._version_sum += row["version"]
+        if previous is not None and previous["name"] != row["name"]:
+            # Event rows carry the task's current name, as the joined query does.
+            self._events = deque(
+                ({**entry, "task_name": row["name"]} if entry["task_id"] == row["id"] else entry for entry in self._events),
+                maxlen=self.capacity,
+            )
+
+    def _apply_event(self, row: Dict[str, Any]) -> None:
+        self._newest_event_id = max(self._newest_event_id, row["id"])
+        if any(entry["id"] == row["id"] for entry in self._events):
+            return
+        key = _event_key(row)
+        if len(self._events) == self.capacity:
+            if key < _event_key(self._events[0]):
+                return
+            self._events.popleft()
+        self._events.insert(bisect.bisect(self._events, key, key=_event_key), row)
+
+    def _publish(self, data_version: Tuple[int, ...], checked_at: float) -> ProgressSnapshot:
+        self._version += 1
+        tasks = tuple(self._tasks[task_id] for task_id in sorted(self._tasks))
+        overall = round(self._progress_sum / len(tasks), 2) if tasks else 0.0
+        snapshot = ProgressSnapshot(
+            version=self._version,
+            generation=self._generation,
+            tasks=tasks,
+            events=tuple(reversed(self._events)),
+            overall_progress=overall,
+            stamp=(self._generation, self._newest_event_id, len(tasks), self._version_sum),
+            data_version=data_version,
+            checked_at=checked_at,
+        )
+        self._snapshot = snapshot
+        return snapshot
+
+
+@lru_cache(maxsize=1)
+def get_progress_view() -> ProgressView:
+    return ProgressView(ProgressViewConfig.from_settings())
+
+
+def record(
+    session: Session,
+    *,
+    generation: int,
+    tasks: Iterable[Mapping[str, Any]] = (),
+    events: Iterable[Mapping[str, Any]] = (),
+    reset: bool = False,
+) -> None:
+    """Queue rows written in ``session``'s transaction; they reach the read model only if it commits."""
+
+    pending: Optional[_PendingWrites] = session.info.get(_PENDING_KEY)
+    if pending is None or reset or generation > pending.generation:
+        pending = _PendingWrites(generation=generation, reset=reset or (pending is not None and pending.reset))
+        session.info[_PENDING_KEY] = pending
+    elif generation < pending.generation:
+        return
+    for row in tasks:
+        pending.tasks[row["id"]] = {name: row[name] for name in TASK_FIELDS}
+    for row in events:
+        pending.events[row["id"]] = {name: row[name] for name in EVENT_FIELDS}
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_after_commit(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending is not None:
+        get_progress_view().apply(pending)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,281 @@
+"""Near-duplicate cache for AI replies.
+
+Prompts are normalised (case, punctuation, contractions, articles) and
+fingerprinted with a 64-bit SimHash over character trigrams, so small edits
+flip only a few fingerprint bits. Fingerprints are split into ``bands`` equal
+slices and indexed by slice: two fingerprints within ``bands - 1`` bits of each
+other must agree on at least one whole slice, so a lookup only compares
+against entries sharing a slice instead of scanning the cache.
+
+A candidate is served when it is within the persona's ``max_distance`` bits and
+its token overlap (Jaccard) with the new prompt is at least
+``min_token_similarity``. Candidates that pass the first test but fail the
+second are counted and logged as suspected false matches. A sample of the
+matches that are served (``audit_sample_rate``) is logged too, with both
+original prompts, so false matches that slip through can be found. Those logs
+and the distance histogram are what the thresholds should be tuned from.
+
+Replies are cached per provider, model and persona, and only when the
+configured provider answered: template replies echo the prompt and fallbacks
+are not answers worth repeating. The cache is per process.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import random
+import re
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
+from functools import lru_cache
+from threading import Lock
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+
+from ..config import settings
+from .metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+FINGERPRINT_BITS = 64
+
+LOOKUPS = REGISTRY.counter(
+    "requiem_prompt_cache_lookups_total",
+    "Prompt cache lookups by persona and outcome (exact, near, miss, suspect).",
+)
+MATCH_DISTANCE = REGISTRY.histogram(
+    "requiem_prompt_cache_match_distance",
+    "SimHash distance to the closest cached prompt, by persona and outcome.",
+    buckets=(0, 1, 2, 3, 4, 6, 8, 12, 16),
+)
+ENTRIES = REGISTRY.gauge("requiem_prompt_cache_entries", "Replies held in this process's prompt cache.")
+
+_WORD_PATTERN = re.compile(r"[a-z0-9]+")
+_POSSESSIVE_PATTERN = re.compile(r"['’]s\b")
+# Only words that never change what is being asked; tense, modals and pronouns
+# ("did" vs "will", "I" vs "you") must survive or different questions collide.
+_FILLER_WORDS = frozenset({"a", "an", "the", "please"})
+_ALIASES = {"whats": "what", "hows": "how", "wheres": "where", "whos": "who", "thats": "that", "pls": "please"}
+
+
+@dataclass(slots=True)
+class PromptCacheConfig:
+    enabled: bool = True
+    max_entries: int = 5000
+    ttl_seconds: float = 3600.0
+    bands: int = 4
+    max_prompt_chars: int = 2000
+    min_token_similarity: float = 0.75
+    audit_sample_rate: float = 0.01
+    max_distance: Dict[str, int] = field(default_factory=lambda: {"default": 3})
+
+    @classmethod
+    def from_settings(cls) -> "PromptCacheConfig":
+        config = settings.get("chat", "prompt_cache", default=None)
+        if not config:
+            return cls()
+        bands = int(config.get("bands", 4))
+        if bands not in (1, 2, 4, 8, 16):
+            logger.warning("chat.prompt_cache.bands must be 1, 2, 4, 8 or 16; using 4.")
+            bands = 4
+        distances = config.get("max_distance", 3)
+        if not isinstance(distances, dict):
+            distances = {"default": distances}
+        return cls(
+            enabled=bool(config.get("enabled", True)),
+            max_entries=max(1, int(config.get("max_entries", 5000))),
+            ttl_seconds=max(1.0, float(config.get("ttl_seconds", 3600))),
+            bands=bands,
+            max_prompt_chars=max(1, int(config.get("max_prompt_chars", 2000))),
+            min_token_similarity=min(1.0, max(0.0, float(config.get("min_token_similarity", 0.75)))),
+            audit_sample_rate=min(1.0, max(0.0, float(config.get("audit_sample_rate", 0.01)))),
+            max_distance={str(persona): int(value) for persona, value in distances.items()},
+        )
+
+    def distance_for(self, persona: str) -> int:
+        distance = self.max_distance.get(persona, self.max_distance.get("default", 3))
+        # The band index only guarantees to find matches up to ``bands - 1`` bits apart.
+        return max(0, min(distance, self.bands - 1))
+
+
+def normalize(prompt: str) -> Tuple[str, ...]:
+    text = _POSSESSIVE_PATTERN.sub("", prompt.lower()).replace("'", "").replace("’", "")
+    words = [_ALIASES.get(word, word) for word in _WORD_PATTERN.findall(text)]
+    meaningful = tuple(word for word in words if word not in _FILLER_WORDS)
+    return meaningful or tuple(words)
+
+
+@lru_cache(maxsize=65536)
+def _feature_hash(feature: str) -> int:
+    return int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def simhash(tokens: Tuple[str, ...]) -> int:
+    text = " ".join(tokens)
+    features = Counter(text[index : index + 3] for index in range(max(1, len(text) - 2)))
+    weights = [0] * FINGERPRINT_BITS
+    for feature, count in features.items():
+        hashed = _feature_hash(feature)
+        for bit in range(FINGERPRINT_BITS):
+            weights[bit] += count if (hashed >> bit) & 1 else -count
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def token_similarity(left: FrozenSet[str], right: FrozenSet[str]) -> float:
+    if not left and not right:
+        return 1.0
+    return len(left & right) / len(left | right)
+
+
+@dataclass(slots=True)
+class _Entry:
+    namespace: Tuple[str, str, str]
+    tokens: Tuple[str, ...]
+    fingerprint: int
+    reply: str
+    stored_at: float
+    # Kept (truncated) only so served matches can be audited.
+    prompt: str
+
+
+class PromptCache:
+    def __init__(self, config: PromptCacheConfig) -> None:
+        self._config = config
+        self._band_bits = FINGERPRINT_BITS // config.bands
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        self._exact: Dict[Tuple[Tuple[str, str, str], Tuple[str, ...]], int] = {}
+        self._bands: Dict[Tuple[Tuple[str, str, str], int, int], Set[int]] = {}
+        self._next_id = 0
+        self._lock = Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self._config.enabled
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _band_keys(self, namespace: Tuple[str, str, str], fingerprint: int) -> List[Tuple[Tuple[str, str, str], int, int]]:
+        mask = (1 << self._band_bits) - 1
+        return [
+            (namespace, band, (fingerprint >> (band * self._band_bits)) & mask) for band in range(self._config.bands)
+        ]
+
+    def lookup(self, prompt: str, *, provider: str, model: str, persona: str) -> Optional[str]:
+        if len(prompt) > self._config.max_prompt_chars:
+            return None
+        namespace = (provider, model, persona)
+        tokens = normalize(prompt)
+        now = time.monotonic()
+        with self._lock:
+            entry_id = self._exact.get((namespace, tokens))
+            if entry_id is not None and self._fresh(entry_id, now):
+                self._entries.move_to_end(entry_id)
+                LOOKUPS.inc(persona=persona, outcome="exact")
+                MATCH_DISTANCE.observe(0, persona=persona, outcome="exact")
+                entry = self._entries[entry_id]
+                self._audit("exact", persona, 0, prompt, entry)
+                return entry.reply
+
+        # Fingerprinting is the expensive part; keep it outside the lock.
+        fingerprint = simhash(tokens)
+        with self._lock:
+            best: Optional[Tuple[int, int]] = None
+            for key in self._band_keys(namespace, fingerprint):
+                for candidate in self._bands.get(key, ()):
+                    distance = (self._entries[candidate].fingerprint ^ fingerprint).bit_count()
+                    if best is None or distance < best[0]:
+                        best = (distance, candidate)
+
+            if best is None or best[0] > self._config.distance_for(persona) or not self._fresh(best[1], now):
+                LOOKUPS.inc(persona=persona, outcome="miss")
+                if best is not None:
+                    MATCH_DISTANCE.observe(best[0], persona=persona, outcome="miss")
+                return None
+
+            distance, entry_id = best
+            entry = self._entries[entry_id]
+            similarity = token_similarity(frozenset(tokens), frozenset(entry.tokens))
+            if similarity < self._config.min_token_similarity:
+                LOOKUPS.inc(persona=persona, outcome="suspect")
+                MATCH_DISTANCE.observe(distance, persona=persona, outcome="suspect")
+                logger.info(
+                    "Prompt cache rejected a suspected false match for persona '%s' "
+                    "(distance %s, token similarity %.2f): %r vs cached %r",
+                    persona,
+                    distance,
+                    similarity,
+                    " ".join(tokens)[:120],
+                    " ".join(entry.tokens)[:120],
+                )
+                return None
+            self._entries.move_to_end(entry_id)
+            LOOKUPS.inc(persona=persona, outcome="near")
+            MATCH_DISTANCE.observe(distance, persona=persona, outcome="near")
+            self._audit("near", persona, distance, prompt, entry)
+            return entry.reply
+
+    def store(self, prompt: str, reply: str, *, provider: str, model: str, persona: str) -> None:
+        if len(prompt) > self._config.max_prompt_chars:
+            return
+        namespace = (provider, model, persona)
+        tokens = normalize(prompt)
+        fingerprint = simhash(tokens)
+        with self._lock:
+            previous = self._exact.get((namespace, tokens))
+            if previous is not None:
+                self._remove(previous)
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = _Entry(namespace, tokens, fingerprint, reply, time.monotonic(), prompt[:120])
+            self._exact[(namespace, tokens)] = entry_id
+            for key in self._band_keys(namespace, fingerprint):
+                self._bands.setdefault(key, set()).add(entry_id)
+            while len(self._entries) > self._config.max_entries:
+                self._remove(next(iter(self._entries)))
+            ENTRIES.set(len(self._entries))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._exact.clear()
+            self._bands.clear()
+            ENTRIES.set(0)
+
+    def _audit(self, outcome: str, persona: str, distance: int, prompt: str, entry: _Entry) -> None:
+        if random.random() >= self._config.audit_sample_rate:
+            return
+        logger.info(
+            "Prompt cache %s match served for persona '%s' (distance %s): %r answered with the reply to %r",
+            outcome,
+            persona,
+            distance,
+            prompt[:120],
+            entry.prompt,
+        )
+
+    def _fresh(self, entry_id: int, now: float) -> bool:
+        if now - self._entries[entry_id].stored_at <= self._config.ttl_seconds:
+            return True
+        self._remove(entry_id)
+        ENTRIES.set(len(self._entries))
+        return False
+
+    def _remove(self, entry_id: int) -> None:
+        entry = self._entries.pop(entry_id)
+        self._exact.pop((entry.namespace, entry.tokens), None)
+        for key in self._band_keys(entry.namespace, entry.fingerprint):
+            bucket = self._bands.get(key)
+            if bucket is not None:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del self._bands[key]
+
+
+@lru_cache(maxsize=1)
+def get_prompt_cache() -> PromptCache:
+    return PromptCache(PromptCacheConfig.from_settings())
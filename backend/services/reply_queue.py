@@ -0,0 +1,297 @@
+"""Database-backed queue for AI replies.
+
+``POST /chat/jobs`` stores the user message and a ``reply_jobs`` row, then
+returns immediately. Worker threads claim jobs with a single conditional
+``UPDATE ... RETURNING`` that also takes a lease, call the provider, and store
+the ``ai`` message together with the job result. Work left unfinished by a
+crashed or restarted process is picked up again when its lease expires. A
+worker whose lease was taken over discards its reply instead of storing a
+duplicate.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from functools import lru_cache
+from threading import Condition, Event, Thread
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import and_, exists, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from .. import models
+from ..config import settings
+from ..database import SessionLocal
+from .history_cache import get_history_cache
+from .metrics import REGISTRY
+from .responder import generate_provider_response
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+JOBS = REGISTRY.counter("requiem_reply_jobs_total", "AI reply jobs finished by this process, by outcome.")
+WAIT_SECONDS = REGISTRY.histogram(
+    "requiem_reply_job_wait_seconds",
+    "Time reply jobs spent queued before a worker claimed them.",
+    buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0),
+)
+RUN_SECONDS = REGISTRY.histogram(
+    "requiem_reply_job_run_seconds",
+    "Time from claiming a reply job to storing its result.",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0, 60.0),
+)
+
+
+@dataclass(slots=True)
+class ReplyQueueConfig:
+    enabled: bool = True
+    workers: int = 2
+    poll_interval_seconds: float = 1.0
+    lease_seconds: float = 120.0
+    max_attempts: int = 3
+
+    @classmethod
+    def from_settings(cls) -> "ReplyQueueConfig":
+        config = settings.get("chat", "reply_jobs", default=None)
+        if not config:
+            return cls()
+        return cls(
+            enabled=bool(config.get("enabled", True)),
+            workers=max(1, int(config.get("workers", 2))),
+            poll_interval_seconds=max(0.05, float(config.get("poll_interval_seconds", 1.0))),
+            lease_seconds=max(1.0, float(config.get("lease_seconds", 120.0))),
+            max_attempts=max(1, int(config.get("max_attempts", 3))),
+        )
+
+
+@dataclass(slots=True)
+class ClaimedJob:
+    id: int
+    user_id: int
+    prompt: str
+    attempts: int
+    created_at: datetime
+
+
+def enqueue_reply(db: Session, *, user_id: int, message_id: Optional[int], prompt: str) -> models.ReplyJob:
+    """Add a job to the caller's transaction; call ``notify_workers`` after committing."""
+
+    job = models.ReplyJob(user_id=user_id, message_id=message_id, prompt=prompt, status=JOB_QUEUED, attempts=0)
+    db.add(job)
+    db.flush()
+    return job
+
+
+def _claimable(now: datetime) -> Any:
+    job = models.ReplyJob
+    return or_(job.status == JOB_QUEUED, and_(job.status == JOB_RUNNING, job.lease_expires_at < now))
+
+
+def claim_next_job(db: Session, *, lease_seconds: float, now: Optional[datetime] = None) -> Optional[ClaimedJob]:
+    now = now or datetime.utcnow()
+    job = models.ReplyJob
+    # Idle workers poll; a read keeps that from taking the write lock every time.
+    if not db.scalar(select(exists().where(_claimable(now)))):
+        return None
+    candidate = select(job.id).where(_claimable(now)).order_by(job.id).limit(1).scalar_subquery()
+    row = db.execute(
+        update(job)
+        # Re-checking the condition makes a concurrent claim of the same row a no-op.
+        .where(job.id == candidate, _claimable(now))
+        .values(
+            status=JOB_RUNNING,
+            attempts=job.attempts + 1,
+            started_at=now,
+            lease_expires_at=now + timedelta(seconds=lease_seconds),
+        )
+        .returning(job.id, job.user_id, job.prompt, job.attempts, job.created_at)
+        .execution_options(synchronize_session=False)
+    ).first()
+    if row is None:
+        return None
+    return ClaimedJob(id=row.id, user_id=row.user_id, prompt=row.prompt, attempts=row.attempts, created_at=row.created_at)
+
+
+def _owned(claimed: ClaimedJob) -> Any:
+    job = models.ReplyJob
+    return and_(job.id == claimed.id, job.status == JOB_RUNNING, job.attempts == claimed.attempts)
+
+
+def complete_job(db: Session, claimed: ClaimedJob, content: str) -> Optional[models.Message]:
+    """Store the reply; returns ``None`` (and rolls back) if the lease was lost meanwhile."""
+
+    reply = models.Message(user_id=claimed.user_id, role="ai", content=content)
+    db.add(reply)
+    db.flush()
+    result = db.execute(
+        update(models.ReplyJob)
+        .where(_owned(claimed))
+        .values(status=JOB_DONE, reply_message_id=reply.id, finished_at=datetime.utcnow(), lease_expires_at=None, error=None)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
+        db.rollback()
+        return None
+    return reply
+
+
+def fail_job(db: Session, claimed: ClaimedJob, error: str, *, max_attempts: int) -> str:
+    status = JOB_FAILED if claimed.attempts >= max_attempts else JOB_QUEUED
+    db.execute(
+        update(models.ReplyJob)
+        .where(_owned(claimed))
+        .values(
+            status=status,
+            error=error[:2000],
+            finished_at=datetime.utcnow() if status == JOB_FAILED else None,
+            lease_expires_at=None,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    return status
+
+
+class ReplyWorkerPool:
+    """Threads that drain ``reply_jobs``; every server process runs its own pool."""
+
+    def __init__(self, config: ReplyQueueConfig) -> None:
+        self._config = config
+        self._stop_event = Event()
+        self._wakeup = Condition()
+        self._threads: List[Thread] = []
+
+    @property
+    def is_enabled(self) -> bool:
+        return self._config.enabled
+
+    def start(self) -> None:
+        if not self.is_enabled:
+            logger.info("Reply job workers are disabled by configuration.")
+            return
+        if any(thread.is_alive() for thread in self._threads):
+            return
+        logger.info("Starting %s reply job workers.", self._config.workers)
+        self._stop_event.clear()
+        self._threads = [
+            Thread(target=self._run, name=f"reply-worker-{index}", daemon=True) for index in range(self._config.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def notify(self) -> None:
+        with self._wakeup:
+            self._wakeup.notify()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        if not self._threads:
+            return
+        logger.info("Stopping reply job workers...")
+        self._stop_event.set()
+        with self._wakeup:
+            self._wakeup.notify_all()
+        # A worker blocked on a provider call is abandoned; its lease expires and
+        # the job is retried by the next process to start.
+        deadline = time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(timeout=max(0.0, deadline - time.monotonic()))
+        self._threads = []
+
+    def _run(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                processed = self.process_next()
+            except Exception as exc:  # noqa: BLE001 - background safety net
+                logger.exception("Reply job worker failed: %s", exc)
+                processed = False
+            if not processed and not self._stop_event.is_set():
+                with self._wakeup:
+                    self._wakeup.wait(self._config.poll_interval_seconds)
+
+    def process_next(self) -> bool:
+        """Claim and run one job; returns ``False`` when the queue was empty."""
+
+        with SessionLocal() as session:
+            claimed = claim_next_job(session, lease_seconds=self._config.lease_seconds)
+            session.commit()
+        if claimed is None:
+            return False
+
+        claimed_at = time.perf_counter()
+        WAIT_SECONDS.observe(max(0.0, (datetime.utcnow() - claimed.created_at).total_seconds()))
+        if claimed.attempts > self._config.max_attempts:
+            # Its previous holders all died mid-job; stop retrying.
+            with SessionLocal() as session:
+                fail_job(session, claimed, "Lease expired too many times", max_attempts=self._config.max_attempts)
+                session.commit()
+            JOBS.inc(outcome=JOB_FAILED)
+            return True
+
+        try:
+            # The raising variant: a provider failure is retried or marked failed,
+            # never stored as if a template reply were the model's answer.
+            content = generate_provider_response(claimed.prompt)
+            with SessionLocal() as session:
+                reply = complete_job(session, claimed, content)
+                session.commit()
+                if reply is not None:
+                    get_history_cache().append(claimed.user_id, [reply])
+        except Exception as exc:  # noqa: BLE001 - record the failure on the job
+            logger.exception("Reply job %s failed: %s", claimed.id, exc)
+            with SessionLocal() as session:
+                outcome = fail_job(session, claimed, str(exc) or type(exc).__name__, max_attempts=self._config.max_attempts)
+                session.commit()
+            JOBS.inc(outcome="retried" if outcome == JOB_QUEUED else JOB_FAILED)
+            return True
+
+        JOBS.inc(outcome=JOB_DONE if reply is not None else "lease_lost")
+        RUN_SECONDS.observe(time.perf_counter() - claimed_at)
+        return True
+
+
+@lru_cache(maxsize=1)
+def get_worker_pool() -> ReplyWorkerPool:
+    return ReplyWorkerPool(ReplyQueueConfig.from_settings())
+
+
+def notify_workers() -> None:
+    get_worker_pool().notify()
+
+
+async def job_status_async(db: AsyncSession, *, job_id: int, user_id: int) -> Optional[Dict[str, Any]]:
+    job = await db.get(models.ReplyJob, job_id)
+    if job is None or job.user_id != user_id:
+        return None
+    reply = None
+    if job.reply_message_id is not None:
+        reply = await db.get(models.Message, job.reply_message_id)
+    return job_payload(job, reply)
+
+
+def job_payload(job: models.ReplyJob, reply: Optional[models.Message] = None) -> Dict[str, Any]:
+    return {
+        "id": job.id,
+        "status": job.status,
+        "attempts": job.attempts,
+        "message_id": job.message_id,
+        "reply": reply,
+        "error": job.error,
+        "created_at": job.created_at,
+        "finished_at": job.finished_at,
+    }
+
+
+async def queue_depths_async(db: AsyncSession) -> Dict[str, int]:
+    job = models.ReplyJob
+    rows = await db.execute(
+        select(job.status, func.count(job.id)).where(job.status.in_((JOB_QUEUED, JOB_RUNNING))).group_by(job.status)
+    )
+    depths = {JOB_QUEUED: 0, JOB_RUNNING: 0}
+    depths.update({status: count for status, count in rows.all()})
+    return depths
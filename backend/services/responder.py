@@ -1,17 +1,41 @@
 from __future__ import annotations
 
 import logging
+import sys
+import time
+from dataclasses import dataclass
 from datetime import datetime
 from functools import lru_cache
-from typing import Any, Dict
-
-import httpx
+from typing import Any, Dict, Optional
 
 from ..config import settings
+from .metrics import REGISTRY
+from .prompt_cache import get_prompt_cache
 
 
 logger = logging.getLogger(__name__)
 
+REQUEST_SECONDS = REGISTRY.histogram(
+    "requiem_ai_request_seconds",
+    "Wall time of AI provider calls, by provider, model and outcome.",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0, 60.0),
+)
+PROMPT_TOKENS = REGISTRY.counter(
+    "requiem_ai_prompt_tokens_total", "Prompt tokens reported by AI provider usage fields, by provider and model."
+)
+COMPLETION_TOKENS = REGISTRY.counter(
+    "requiem_ai_completion_tokens_total", "Completion tokens reported by AI provider usage fields, by provider and model."
+)
+TOKENS_PER_SECOND = REGISTRY.histogram(
+    "requiem_ai_completion_tokens_per_second",
+    "Completion tokens per second of wall time for successful AI provider calls.",
+    buckets=(1, 5, 10, 20, 40, 80, 160, 320, 640),
+)
+ERRORS = REGISTRY.counter("requiem_ai_errors_total", "Failed AI provider calls, by provider, model and error type.")
+FALLBACKS = REGISTRY.counter(
+    "requiem_ai_template_fallbacks_total", "Replies served by the template fallback instead of the configured provider, by reason."
+)
+
 
 def _persona_prompt(persona: str) -> str:
     prompts = {
@@ -37,20 +61,48 @@ def _template_response(prompt: str, persona: str) -> str:
     return f"[{timestamp}] {base_response}{prompt.strip()} — {closing}"
 
 
+@dataclass(slots=True)
+class ProviderReply:
+    content: str
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+
+
+def _token_count(value: Any) -> Optional[int]:
+    try:
+        return int(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
 class BaseAIProvider:
-    def generate(self, prompt: str) -> str:  # pragma: no cover - interface definition
+    name = "base"
+    model = ""
+    persona = "mystical"
+
+    def complete(self, prompt: str) -> ProviderReply:  # pragma: no cover - interface definition
         raise NotImplementedError
 
+    def generate(self, prompt: str) -> str:
+        return self.complete(prompt).content
+
 
 class TemplateProvider(BaseAIProvider):
-    def __init__(self, persona: str) -> None:
+    name = "template"
+    model = "template"
+
+    def __init__(self, persona: str, fallback_for: Optional[str] = None) -> None:
         self.persona = persona
+        # The configured provider this stands in for after it failed to initialise.
+        self.fallback_for = fallback_for
 
-    def generate(self, prompt: str) -> str:
-        return _template_response(prompt, self.persona)
+    def complete(self, prompt: str) -> ProviderReply:
+        return ProviderReply(_template_response(prompt, self.persona))
 
 
 class OpenAIChatProvider(BaseAIProvider):
+    name = "openai"
+
     def __init__(self, config: Dict[str, Any], persona: str, timeout: float) -> None:
         api_key = config.get("api_key")
         if not api_key or "REPLACE" in api_key:
@@ -63,7 +115,7 @@ class OpenAIChatProvider(BaseAIProvider):
         self.persona = persona
         self.timeout = timeout
 
-    def generate(self, prompt: str) -> str:
+    def complete(self, prompt: str) -> ProviderReply:
         payload = {
             "model": self.model,
             "messages": [
@@ -77,6 +129,8 @@ class OpenAIChatProvider(BaseAIProvider):
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json",
         }
+        import httpx
+
         with httpx.Client(timeout=self.timeout) as client:
             response = client.post(self.base_url, headers=headers, json=payload)
             response.raise_for_status()
@@ -87,10 +141,17 @@ class OpenAIChatProvider(BaseAIProvider):
         content = choices[0].get("message", {}).get("content", "")
         if not content:
             raise ValueError("OpenAI response did not contain message content")
-        return content.strip()
+        usage = data.get("usage") or {}
+        return ProviderReply(
+            content.strip(),
+            prompt_tokens=_token_count(usage.get("prompt_tokens")),
+            completion_tokens=_token_count(usage.get("completion_tokens")),
+        )
 
 
 class OllamaChatProvider(BaseAIProvider):
+    name = "ollama"
+
     def __init__(self, config: Dict[str, Any], persona: str, timeout: float) -> None:
         base_url = config.get("base_url", "http://localhost:11434")
         self.model = config.get("model")
@@ -101,7 +162,7 @@ class OllamaChatProvider(BaseAIProvider):
         self.persona = persona
         self.timeout = timeout
 
-    def generate(self, prompt: str) -> str:
+    def complete(self, prompt: str) -> ProviderReply:
         payload: Dict[str, Any] = {
             "model": self.model,
             "messages": [
@@ -113,6 +174,8 @@ class OllamaChatProvider(BaseAIProvider):
         if self.options:
             payload["options"] = self.options
 
+        import httpx
+
         with httpx.Client(timeout=self.timeout) as client:
             response = client.post(self.url, json=payload)
             response.raise_for_status()
@@ -120,16 +183,19 @@ class OllamaChatProvider(BaseAIProvider):
 
         message = data.get("message") or {}
         content = message.get("content")
-        if content:
-            return content.strip()
-
-        choices = data.get("choices", [])
-        if choices:
-            content = choices[0].get("message", {}).get("content")
-            if content:
-                return content.strip()
+        if not content:
+            choices = data.get("choices", [])
+            if choices:
+                content = choices[0].get("message", {}).get("content")
+        if not content:
+            raise ValueError("Ollama response did not contain message content")
 
-        raise ValueError("Ollama response did not contain message content")
+        usage = data.get("usage") or {}
+        return ProviderReply(
+            content.strip(),
+            prompt_tokens=_token_count(data.get("prompt_eval_count", usage.get("prompt_tokens"))),
+            completion_tokens=_token_count(data.get("eval_count", usage.get("completion_tokens"))),
+        )
 
 
 def _chat_settings() -> Any:
@@ -165,20 +231,98 @@ def _resolved_provider() -> BaseAIProvider:
             return OllamaChatProvider(ollama_config, persona=persona, timeout=timeout)
     except Exception as exc:  # noqa: BLE001 - logged and falls back to template provider
         logger.error("Failed to initialise AI provider '%s': %s", provider_key, exc)
+        # Counted per reply in ``generate_ai_response``; this runs once per process.
+        return TemplateProvider(persona=persona, fallback_for=provider_key)
 
     return TemplateProvider(persona=persona)
 
 
-def generate_ai_response(prompt: str) -> str:
+def _is_http_error(exc: Exception) -> bool:
+    # httpx is imported lazily by the remote providers; if it was never loaded the
+    # failure cannot have come from it.
+    httpx = sys.modules.get("httpx")
+    return httpx is not None and isinstance(exc, httpx.HTTPError)
+
+
+def _error_type(exc: Exception) -> str:
+    httpx = sys.modules.get("httpx")
+    if httpx is not None:
+        if isinstance(exc, httpx.TimeoutException):
+            return "timeout"
+        if isinstance(exc, httpx.HTTPStatusError):
+            return f"http_{exc.response.status_code}"
+        if isinstance(exc, httpx.TransportError):
+            return "connection"
+    if isinstance(exc, TimeoutError):
+        return "timeout"
+    if isinstance(exc, ValueError):
+        return "invalid_response"
+    return type(exc).__name__
+
+
+def _record_reply(provider: BaseAIProvider, reply: ProviderReply, elapsed: float) -> None:
+    labels = {"provider": provider.name, "model": provider.model}
+    REQUEST_SECONDS.observe(elapsed, outcome="ok", **labels)
+    if reply.prompt_tokens is not None:
+        PROMPT_TOKENS.inc(reply.prompt_tokens, **labels)
+    if reply.completion_tokens is not None:
+        COMPLETION_TOKENS.inc(reply.completion_tokens, **labels)
+        if elapsed > 0:
+            TOKENS_PER_SECOND.observe(reply.completion_tokens / elapsed, **labels)
+
+
+class ProviderError(Exception):
+    """The configured AI provider produced no reply; ``reason`` is the fallback metric label."""
+
+    def __init__(self, provider: str, reason: str, message: str) -> None:
+        super().__init__(message)
+        self.provider = provider
+        self.reason = reason
+
+
+def generate_provider_response(prompt: str) -> str:
+    """A reply from the configured provider (or the prompt cache); raises ``ProviderError`` on failure."""
+
     provider = _resolved_provider()
+    if isinstance(provider, TemplateProvider) and provider.fallback_for:
+        message = f"AI provider '{provider.fallback_for}' failed to initialise"
+        raise ProviderError(provider.fallback_for, "init_failed", message)
+    cache = get_prompt_cache()
+    # Template replies are free and echo the prompt, so they are never cached.
+    cached_provider = cache.enabled and provider.name != TemplateProvider.name
+    if cached_provider:
+        cached = cache.lookup(prompt, provider=provider.name, model=provider.model, persona=provider.persona)
+        if cached is not None:
+            return cached
+
+    started = time.perf_counter()
     try:
-        response = provider.generate(prompt)
-        if response:
-            return response
-    except httpx.HTTPError as http_error:
-        logger.error("HTTP error from AI provider: %s", http_error)
+        reply = provider.complete(prompt)
     except Exception as exc:  # noqa: BLE001 - log unexpected provider failures
-        logger.error("AI provider failed, using template response: %s", exc)
+        error_type = _error_type(exc)
+        REQUEST_SECONDS.observe(time.perf_counter() - started, provider=provider.name, model=provider.model, outcome="error")
+        ERRORS.inc(provider=provider.name, model=provider.model, type=error_type)
+        if _is_http_error(exc):
+            logger.error("HTTP error from AI provider: %s", exc)
+        else:
+            logger.error("AI provider failed: %s", exc)
+        raise ProviderError(provider.name, error_type, str(exc) or type(exc).__name__) from exc
+
+    _record_reply(provider, reply, time.perf_counter() - started)
+    if not reply.content:
+        raise ProviderError(provider.name, "empty_reply", "AI provider returned an empty reply")
+    if cached_provider:
+        cache.store(prompt, reply.content, provider=provider.name, model=provider.model, persona=provider.persona)
+    return reply.content
+
+
+def generate_ai_response(prompt: str) -> str:
+    """Like ``generate_provider_response``, but answers with the template when the provider fails."""
+
+    try:
+        return generate_provider_response(prompt)
+    except ProviderError as exc:
+        FALLBACKS.inc(provider=exc.provider, reason=exc.reason)
 
     chat_settings = _chat_settings()
     persona = "mystical"
@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import base64
+import html
+import json
+import logging
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Sequence
+
+from sqlalchemy import DateTime, Float, Integer, String, Text, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+# Bump when the index DDL changes so ``backend.migrate`` re-runs on existing databases.
+INDEX_VERSION = 1
+FTS_TABLE = "messages_fts"
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_END = "</mark>"
+# Private-use characters stand in for the markers until the message text has been
+# HTML-escaped; inserting the tags directly would pass any markup a user typed through.
+_SENTINEL_START = "\ue000"
+_SENTINEL_END = "\ue001"
+SNIPPET_TOKENS = 24
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+_FTS_DDL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "content, content='messages', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    f"CREATE TRIGGER IF NOT EXISTS messages_fts_ai AFTER INSERT ON messages BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, content) VALUES (new.id, new.content); END",
+    f"CREATE TRIGGER IF NOT EXISTS messages_fts_ad AFTER DELETE ON messages BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, content) VALUES ('delete', old.id, old.content); END",
+    f"CREATE TRIGGER IF NOT EXISTS messages_fts_au AFTER UPDATE OF content ON messages BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, content) VALUES ('delete', old.id, old.content); "
+    f"INSERT INTO {FTS_TABLE}(rowid, content) VALUES (new.id, new.content); END",
+)
+
+
+@dataclass(slots=True)
+class SearchHit:
+    id: int
+    role: str
+    snippet: str
+    rank: float
+    created_at: datetime
+
+
+def _supports_fts(bind: Engine | Connection) -> bool:
+    return bind.dialect.name == "sqlite"
+
+
+def ensure_search_index(bind: Engine) -> None:
+    """Create the FTS5 index and its sync triggers; backfill it when newly created."""
+
+    if not _supports_fts(bind):
+        logger.info("Full-text index is SQLite-only; chat search on %s uses a LIKE scan.", bind.dialect.name)
+        return
+    with bind.begin() as connection:
+        exists = connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": FTS_TABLE}
+        ).first()
+        for statement in _FTS_DDL:
+            connection.execute(text(statement))
+        if exists is None:
+            _rebuild(connection)
+
+
+def _rebuild(connection: Connection) -> None:
+    connection.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+
+
+def rebuild_search_index(bind: Engine) -> None:
+    """Re-index every existing message, e.g. after restoring a backup made without the index."""
+
+    if not _supports_fts(bind):
+        return
+    ensure_search_index(bind)
+    with bind.begin() as connection:
+        _rebuild(connection)
+
+
+def match_expression(query: str) -> Optional[str]:
+    """Turn free text into a safe FTS5 query: every word must match, the last one as a prefix."""
+
+    tokens = _TOKEN.findall(query)
+    if not tokens:
+        return None
+    quoted = [f'"{token}"' for token in tokens]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def encode_cursor(rank: float, message_id: int) -> str:
+    raw = json.dumps([rank, message_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[float, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        rank, message_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return float(rank), int(message_id)
+    except (ValueError, TypeError) as exc:
+        raise ValueError("Invalid search cursor") from exc
+
+
+_RESULT_COLUMNS = {"id": Integer, "role": String, "created_at": DateTime, "snippet": Text, "rank": Float}
+
+
+def _fts_statement(after: Optional[tuple[float, int]]) -> Any:
+    # bm25() is lower-is-better; (rank, id) gives a stable keyset order for the cursor.
+    keyset = ""
+    if after is not None:
+        keyset = "AND (bm25(messages_fts) > :after_rank OR (bm25(messages_fts) = :after_rank AND m.id > :after_id))"
+    return text(
+        f"""
+        SELECT m.id, m.role, m.created_at,
+               snippet({FTS_TABLE}, 0, :hl_start, :hl_end, '…', :tokens) AS snippet,
+               bm25({FTS_TABLE}) AS rank
+        FROM {FTS_TABLE}
+        JOIN messages AS m ON m.id = {FTS_TABLE}.rowid
+        WHERE {FTS_TABLE} MATCH :match AND m.user_id = :user_id {keyset}
+        ORDER BY rank, m.id
+        LIMIT :limit
+        """
+    ).columns(**_RESULT_COLUMNS)
+
+
+def _like_statement(after: Optional[tuple[float, int]]) -> Any:
+    # Unranked fallback for databases without FTS5: newest first, cursor on id.
+    keyset = "AND m.id < :after_id" if after is not None else ""
+    return text(
+        f"""
+        SELECT m.id, m.role, m.created_at, m.content AS snippet, 0.0 AS rank
+        FROM messages AS m
+        WHERE m.user_id = :user_id AND lower(m.content) LIKE :pattern ESCAPE '\\' {keyset}
+        ORDER BY m.id DESC
+        LIMIT :limit
+        """
+    ).columns(**_RESULT_COLUMNS)
+
+
+def _statement_and_params(
+    dialect: str, query: str, user_id: int, limit: int, cursor: Optional[str]
+) -> Optional[tuple[Any, dict]]:
+    after = decode_cursor(cursor) if cursor else None
+    params: dict = {"user_id": user_id, "limit": limit + 1}
+    if after is not None:
+        params["after_id"] = after[1]
+    if dialect == "sqlite":
+        match = match_expression(query)
+        if match is None:
+            return None
+        if after is not None:
+            params["after_rank"] = after[0]
+        params.update(match=match, hl_start=_SENTINEL_START, hl_end=_SENTINEL_END, tokens=SNIPPET_TOKENS)
+        return _fts_statement(after), params
+    terms = query.strip().lower()
+    if not terms:
+        return None
+    escaped = terms.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    params["pattern"] = f"%{escaped}%"
+    return _like_statement(after), params
+
+
+def render_snippet(raw: str) -> str:
+    """HTML-escape an FTS snippet, then turn its sentinel markers into ``<mark>`` tags."""
+
+    # Sentinels typed by the user would otherwise become unbalanced tags.
+    opened = False
+    parts: List[str] = []
+    for piece in re.split(f"([{_SENTINEL_START}{_SENTINEL_END}])", raw):
+        if piece == _SENTINEL_START and not opened:
+            parts.append(HIGHLIGHT_START)
+            opened = True
+        elif piece == _SENTINEL_END and opened:
+            parts.append(HIGHLIGHT_END)
+            opened = False
+        elif piece not in (_SENTINEL_START, _SENTINEL_END):
+            parts.append(html.escape(piece))
+    if opened:
+        parts.append(HIGHLIGHT_END)
+    return "".join(parts)
+
+
+def highlight_substring(content: str, terms: str) -> str:
+    """HTML-escape ``content`` with every case-insensitive occurrence of ``terms`` marked."""
+
+    pieces = re.split(f"({re.escape(terms)})", content, flags=re.IGNORECASE)
+    # ``re.split`` with one group alternates plain text and matches.
+    return "".join(
+        f"{HIGHLIGHT_START}{html.escape(piece)}{HIGHLIGHT_END}" if index % 2 else html.escape(piece)
+        for index, piece in enumerate(pieces)
+    )
+
+
+def _page(rows: Sequence[Any], limit: int, render: Callable[[str], str]) -> tuple[List[SearchHit], Optional[str]]:
+    hits = [
+        SearchHit(
+            id=row.id, role=row.role, snippet=render(row.snippet), rank=float(row.rank), created_at=row.created_at
+        )
+        for row in rows[:limit]
+    ]
+    next_cursor = None
+    if len(rows) > limit and hits:
+        next_cursor = encode_cursor(hits[-1].rank, hits[-1].id)
+    return hits, next_cursor
+
+
+async def search_messages_async(
+    db: AsyncSession, *, user_id: int, query: str, limit: int, cursor: Optional[str] = None
+) -> tuple[List[SearchHit], Optional[str]]:
+    bind = db.get_bind()
+    prepared = _statement_and_params(bind.dialect.name, query, user_id, limit, cursor)
+    if prepared is None:
+        return [], None
+    statement, params = prepared
+    rows = (await db.execute(statement, params)).all()
+    if bind.dialect.name == "sqlite":
+        return _page(rows, limit, render_snippet)
+    terms = query.strip()
+    return _page(rows, limit, lambda content: highlight_substring(content, terms))
@@ -0,0 +1,87 @@
+"""JSON encoding for hot read endpoints.
+
+Read routes build plain dicts from SQL row tuples and encode them once here,
+skipping Pydantic validation of data that came straight from our own schema.
+The routes keep their ``response_model`` so the OpenAPI schema is unchanged.
+"""
+from __future__ import annotations
+
+import json
+import logging
+from dataclasses import fields
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Type
+
+from fastapi.responses import JSONResponse, Response
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _stdlib_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _stdlib_dumps(payload: Any) -> bytes:
+    return json.dumps(payload, default=_stdlib_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+@lru_cache(maxsize=1)
+def _backend() -> str:
+    requested = str(settings.get("serialization", "json_backend", default="orjson")).lower()
+    if requested == "orjson":
+        try:
+            import orjson  # noqa: F401
+        except ImportError:
+            logger.warning("serialization.json_backend is 'orjson' but orjson is not installed; using json.")
+            return "stdlib"
+        return "orjson"
+    return "stdlib"
+
+
+@lru_cache(maxsize=1)
+def _dumps() -> Callable[[Any], bytes]:
+    if _backend() == "orjson":
+        import orjson
+
+        return orjson.dumps
+    return _stdlib_dumps
+
+
+def dumps(payload: Any) -> bytes:
+    return _dumps()(payload)
+
+
+def json_response_class() -> Type[Response]:
+    """Default response class for the app, honouring ``serialization.json_backend``."""
+
+    if _backend() == "orjson":
+        from fastapi.responses import ORJSONResponse
+
+        return ORJSONResponse
+    return JSONResponse
+
+
+def json_response(payload: Any, *, status_code: int = 200, headers: Optional[Mapping[str, str]] = None) -> Response:
+    return Response(content=dumps(payload), status_code=status_code, headers=headers, media_type="application/json")
+
+
+def rows_to_dicts(rows: Iterable[Any]) -> List[Dict[str, Any]]:
+    """Rows selected with field-named labels map one-to-one onto the response objects."""
+
+    return [dict(row._mapping) for row in rows]
+
+
+@lru_cache(maxsize=None)
+def _field_names(cls: type) -> tuple[str, ...]:
+    return tuple(field.name for field in fields(cls))
+
+
+def dataclass_to_dict(instance: Any) -> Dict[str, Any]:
+    """Shallow ``asdict``: no recursive deep copy; nested dataclasses are not converted."""
+
+    return {name: getattr(instance, name) for name in _field_names(type(instance))}
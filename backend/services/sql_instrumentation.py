@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import logging
+from typing import Any, Dict
+
+from ..database import QueryStats, begin_request_query_stats
+from .metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+REQUESTS = REGISTRY.counter(
+    "requiem_http_requests_total", "HTTP requests observed by the SQL instrumentation, by route."
+)
+QUERIES = REGISTRY.counter("requiem_http_db_queries_total", "SQL statements executed while serving requests, by route.")
+DB_SECONDS = REGISTRY.counter("requiem_http_db_seconds_total", "Seconds spent in SQL statements while serving requests, by route.")
+QUERIES_PER_REQUEST = REGISTRY.histogram(
+    "requiem_http_db_queries_per_request",
+    "Distribution of SQL statements per request, by route.",
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100),
+)
+SLOWEST_QUERY = REGISTRY.histogram(
+    "requiem_http_db_slowest_query_seconds",
+    "Distribution of the slowest SQL statement per request, by route.",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+
+
+def _route_label(scope: Dict[str, Any]) -> str:
+    # Never the raw request path: every distinct URL would become a new series.
+    route = scope.get("route")
+    if route is None:
+        return "unmatched"
+    # The frontend is mounted at "/", which Starlette stores as an empty prefix.
+    return getattr(route, "path", None) or "/"
+
+
+def server_timing_value(stats: QueryStats) -> str:
+    value = f'db;dur={stats.total_seconds * 1000:.2f};desc="{stats.count} queries"'
+    if stats.count:
+        value += f", db-slowest;dur={stats.slowest_seconds * 1000:.2f}"
+    return value
+
+
+class SQLInstrumentationMiddleware:
+    """Track per-request query count and DB time; expose them as metrics and ``Server-Timing``."""
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = begin_request_query_stats()
+
+        async def send_with_timing(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"server-timing", server_timing_value(stats).encode("latin-1")),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            route = _route_label(scope)
+            method = scope.get("method", "")
+            REQUESTS.inc(method=method, route=route)
+            QUERIES.inc(stats.count, method=method, route=route)
+            DB_SECONDS.inc(stats.total_seconds, method=method, route=route)
+            QUERIES_PER_REQUEST.observe(stats.count, method=method, route=route)
+            if stats.count:
+                SLOWEST_QUERY.observe(stats.slowest_seconds, method=method, route=route)
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(
+                        "Slowest query for %s %s (%.1f ms of %d): %s",
+                        method,
+                        route,
+                        stats.slowest_seconds * 1000,
+                        stats.count,
+                        " ".join((stats.slowest_statement or "").split()),
+                    )
@@ -1,23 +1,49 @@
+"""Background worker that advances tasks on a fixed-rate schedule.
+
+Every schedule (the shared one, plus one per task override with its own
+``interval_seconds``) sits in a min-heap keyed on its next fire time. Runs are
+due a whole number of intervals after the first, so the time a tick takes
+does not shift the cadence. Runs missed while the agent was busy are skipped
+rather than replayed. ``jitter_seconds`` delays each run by a random amount
+without moving the ones after it.
+"""
 from __future__ import annotations
 
+import heapq
 import logging
+import random
+import time
 from contextlib import contextmanager
 from dataclasses import dataclass
 from datetime import datetime
 from threading import Event, Thread
-from time import sleep
-from typing import Dict, Iterable, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 
 from ..config import settings
 from ..database import SessionLocal
 from .. import models
 from . import progress_tracker
-
+from .metrics import REGISTRY
 
 logger = logging.getLogger(__name__)
 
+TICK_SECONDS = REGISTRY.histogram(
+    "requiem_telemetry_tick_seconds",
+    "Time taken by one telemetry agent run, by schedule.",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0),
+)
+TICK_LAG_SECONDS = REGISTRY.histogram(
+    "requiem_telemetry_tick_lag_seconds",
+    "How late telemetry agent runs started relative to their scheduled time.",
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+)
+TICKS_SKIPPED = REGISTRY.counter(
+    "requiem_telemetry_ticks_skipped_total", "Telemetry runs skipped because the previous run overran them."
+)
+
 
 @dataclass(slots=True)
 class TaskOverride:
@@ -25,6 +51,7 @@ class TaskOverride:
 
     step: int
     note: Optional[str] = None
+    interval_seconds: Optional[float] = None
 
 
 @dataclass(slots=True)
@@ -36,6 +63,7 @@ class TelemetryConfig:
     max_tasks_per_cycle: int = 1
     source: str = "auto-telemetry"
     default_step: int = 5
+    jitter_seconds: float = 0.0
     note_template: str = "Automated telemetry pulse for {task} @ {timestamp}"
     task_overrides: Dict[str, TaskOverride] | None = None
 
@@ -48,19 +76,22 @@ class TelemetryConfig:
         overrides: Dict[str, TaskOverride] = {}
         for name, override in (config.get("task_overrides", {}) or {}).items():
             try:
+                interval = override.get("interval_seconds")
                 overrides[name] = TaskOverride(
                     step=max(1, int(override.get("step", config.get("default_step", 5)))),
                     note=override.get("note"),
+                    interval_seconds=max(0.1, float(interval)) if interval is not None else None,
                 )
             except Exception as exc:  # noqa: BLE001 - defensive parsing
                 logger.warning("Invalid telemetry override for '%s': %s", name, exc)
 
         return cls(
             enabled=bool(config.get("enabled", False)),
-            interval_seconds=float(config.get("interval_seconds", 45)),
+            interval_seconds=max(0.1, float(config.get("interval_seconds", 45))),
             max_tasks_per_cycle=max(1, int(config.get("max_tasks_per_cycle", 1))),
             source=str(config.get("source", "auto-telemetry")),
             default_step=max(1, int(config.get("default_step", 5))),
+            jitter_seconds=max(0.0, float(config.get("jitter_seconds", 0))),
             note_template=str(
                 config.get(
                     "note_template",
@@ -111,68 +142,108 @@ class TelemetryAgent:
         self._thread = Thread(target=self._run, name="telemetry-agent", daemon=True)
         self._thread.start()
 
-    def stop(self) -> None:
+    def stop(self, timeout: float = 5.0) -> None:
         if self._thread and self._thread.is_alive():
             logger.info("Stopping telemetry agent...")
             self._stop_event.set()
-            self._thread.join(timeout=self._config.interval_seconds + 1)
+            # The wait between runs returns as soon as the event is set, so this
+            # only ever waits for a run already in progress.
+            self._thread.join(timeout=timeout)
         self._thread = None
         self._stop_event.clear()
 
+    def schedules(self) -> List[Tuple[Optional[str], float]]:
+        """``(task, interval)`` pairs: the shared cadence (task ``None``) plus each task with its own."""
+
+        overrides = self._config.task_overrides or {}
+        return [(None, self._config.interval_seconds)] + [
+            (name, override.interval_seconds)
+            for name, override in sorted(overrides.items())
+            if override.interval_seconds is not None
+        ]
+
+    def _jitter(self) -> float:
+        return random.uniform(0.0, self._config.jitter_seconds) if self._config.jitter_seconds else 0.0
+
     def _run(self) -> None:
-        while not self._stop_event.is_set():
+        # Entries are (fire_at, order, due, task, interval); ``due`` excludes jitter.
+        start = time.monotonic()
+        heap = [
+            (start + self._jitter(), order, start, task_name, interval)
+            for order, (task_name, interval) in enumerate(self.schedules())
+        ]
+        heapq.heapify(heap)
+        while heap:
+            fire_at, order, due, task_name, interval = heap[0]
+            if self._stop_event.wait(max(0.0, fire_at - time.monotonic())):
+                return
+            heapq.heappop(heap)
+            label = task_name or "shared"
+            started = time.monotonic()
+            TICK_LAG_SECONDS.observe(max(0.0, started - fire_at), schedule=label)
             try:
-                self._tick()
+                self._tick(task_name)
             except Exception as exc:  # noqa: BLE001 - background safety net
                 logger.exception("Telemetry agent tick failed: %s", exc)
-            sleep(self._config.interval_seconds)
-
-    def _tick(self) -> None:
-        tasks_processed = 0
+            finished = time.monotonic()
+            TICK_SECONDS.observe(finished - started, schedule=label)
+
+            due += interval
+            if due <= finished:
+                missed = int((finished - due) // interval) + 1
+                TICKS_SKIPPED.inc(missed, schedule=label)
+                due += missed * interval
+            heapq.heappush(heap, (due + self._jitter(), order, due, task_name, interval))
+
+    def _tick(self, task_name: Optional[str] = None) -> None:
+        """Advance ``task_name`` alone, or the stalest tasks on the shared cadence."""
+
+        overrides = self._config.task_overrides or {}
+        if task_name is None:
+            scope = {
+                "limit": self._config.max_tasks_per_cycle,
+                "exclude": [name for name, _ in self.schedules()[1:]],
+            }
+        else:
+            scope = {"limit": 1, "only": [task_name]}
         with _session_scope() as session:
-            tasks = (
-                session.query(models.Task)
-                .filter(models.Task.progress < 100)
-                .order_by(models.Task.updated_at)
-                .all()
+            advanced = progress_tracker.advance_tasks(
+                session,
+                step=self._config.default_step,
+                step_overrides={name: override.step for name, override in overrides.items()},
+                **scope,
             )
 
-            for task in tasks:
-                if tasks_processed >= self._config.max_tasks_per_cycle:
-                    break
-
-                override = (self._config.task_overrides or {}).get(task.name)
-                step = override.step if override else self._config.default_step
-                next_progress = min(100, task.progress + step)
-                if next_progress <= task.progress:
-                    continue
-
-                note = None
+            rows = []
+            for task in advanced:
+                override = overrides.get(task.name)
                 if override and override.note:
                     note = override.note
                 else:
                     note = self._config.note_template.format(
                         task=task.name,
                         timestamp=datetime.utcnow().strftime("%Y-%m-%d %H:%M:%SZ"),
-                        progress=next_progress,
+                        progress=task.progress,
                     )
-
-                progress_tracker.apply_progress_event(
-                    session,
-                    task=task,
-                    progress_value=next_progress,
-                    source=self._config.source,
-                    note=note,
+                rows.append(
+                    {
+                        "task_id": task.id,
+                        "progress": task.progress,
+                        "source": self._config.source,
+                        "note": note,
+                        "generation": task.generation,
+                    }
                 )
                 logger.debug(
                     "Telemetry agent advanced '%s' to %s%% via source '%s'",
                     task.name,
-                    next_progress,
+                    task.progress,
                     self._config.source,
                 )
-                tasks_processed += 1
+            if rows:
+                session.execute(insert(models.TaskEvent), rows)
 
-        if tasks_processed == 0:
+        if not advanced:
             logger.debug("Telemetry agent tick completed with no tasks updated.")
 
 
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import Integer, Select, case, cast, extract, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .. import models
+from . import progress_tracker
+
+_EPOCH = datetime(1970, 1, 1)
+DEFAULT_RANGE = timedelta(days=7)
+_UNIX_EPOCH_JULIAN_DAY = 2440587.5
+
+
+@dataclass(slots=True)
+class TimeseriesWindow:
+    start: datetime
+    end: datetime
+    buckets: int
+
+    @property
+    def bucket_seconds(self) -> float:
+        return (self.end - self.start).total_seconds() / self.buckets
+
+    def bucket_start(self, index: int) -> datetime:
+        return self.start + timedelta(seconds=index * self.bucket_seconds)
+
+
+def round_up(value: datetime, seconds: float) -> datetime:
+    """``value`` rounded up to a multiple of ``seconds`` since the Unix epoch."""
+
+    step = max(1.0, seconds)
+    offset = (value - _EPOCH).total_seconds()
+    return _EPOCH + timedelta(seconds=math.ceil(offset / step) * step)
+
+
+def naive_utc(value: datetime) -> datetime:
+    """Timestamps are stored as naive UTC; normalise aware query parameters to match."""
+
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _epoch_seconds(column: Any, dialect: str) -> Any:
+    if dialect == "sqlite":
+        # julianday() carries float error of a few microseconds; rounding to ms keeps
+        # events that sit exactly on a bucket boundary in the later bucket.
+        return func.round((func.julianday(column) - _UNIX_EPOCH_JULIAN_DAY) * 86400.0, 3)
+    return extract("epoch", column)
+
+
+def _bucketed_events_query(window: TimeseriesWindow, dialect: str, task_names: Optional[Sequence[str]]) -> Select:
+    """Min/max/last progress and event count per (task, bucket), computed in the database.
+
+    The result has at most ``tasks * buckets`` rows however many events fall in
+    the window.
+    """
+
+    event = models.TaskEvent
+    offset = _epoch_seconds(event.created_at, dialect) - (window.start - _EPOCH).total_seconds()
+    raw_bucket = cast(offset / window.bucket_seconds, Integer)
+    # Guard the float edge at ``end`` so every row lands in a valid bucket.
+    bucket = case((raw_bucket >= window.buckets, window.buckets - 1), else_=raw_bucket)
+
+    bucketed = select(event.id, event.task_id, event.progress, event.created_at, bucket.label("bucket")).where(
+        event.created_at >= window.start,
+        event.created_at < window.end,
+        event.generation == progress_tracker.active_generation(),
+    )
+    if task_names:
+        bucketed = bucketed.join(models.Task, models.Task.id == event.task_id).where(models.Task.name.in_(task_names))
+    bucketed = bucketed.subquery()
+
+    partition = (bucketed.c.task_id, bucketed.c.bucket)
+    ranked = select(
+        bucketed.c.task_id,
+        bucketed.c.bucket,
+        bucketed.c.progress,
+        func.min(bucketed.c.progress).over(partition_by=partition).label("min_progress"),
+        func.max(bucketed.c.progress).over(partition_by=partition).label("max_progress"),
+        func.count().over(partition_by=partition).label("events"),
+        func.row_number()
+        .over(partition_by=partition, order_by=(bucketed.c.created_at.desc(), bucketed.c.id.desc()))
+        .label("recency"),
+    ).subquery()
+
+    return (
+        select(
+            ranked.c.task_id,
+            models.Task.name.label("task_name"),
+            ranked.c.bucket,
+            ranked.c.min_progress,
+            ranked.c.max_progress,
+            ranked.c.progress.label("last_progress"),
+            ranked.c.events,
+        )
+        .join(models.Task, models.Task.id == ranked.c.task_id)
+        .where(ranked.c.recency == 1)
+        .order_by(ranked.c.task_id, ranked.c.bucket)
+    )
+
+
+def build_timeseries(window: TimeseriesWindow, rows: Sequence[Any]) -> Dict[str, Any]:
+    series: Dict[int, Dict[str, Any]] = {}
+    events_per_bucket = [0] * window.buckets
+    for row in rows:
+        entry = series.get(row.task_id)
+        if entry is None:
+            entry = series[row.task_id] = {"task_id": row.task_id, "task_name": row.task_name, "points": []}
+        entry["points"].append(
+            {
+                "bucket": row.bucket,
+                "start": window.bucket_start(row.bucket),
+                "min_progress": row.min_progress,
+                "max_progress": row.max_progress,
+                "last_progress": row.last_progress,
+                "events": row.events,
+            }
+        )
+        events_per_bucket[row.bucket] += row.events
+
+    return {
+        "start": window.start,
+        "end": window.end,
+        "buckets": window.buckets,
+        "bucket_seconds": window.bucket_seconds,
+        "events_per_bucket": events_per_bucket,
+        "tasks": list(series.values()),
+    }
+
+
+async def progress_timeseries_async(
+    db: AsyncSession, window: TimeseriesWindow, task_names: Optional[Sequence[str]] = None
+) -> Dict[str, Any]:
+    dialect = db.get_bind().dialect.name
+    rows: List[Any] = list((await db.execute(_bucketed_events_query(window, dialect, task_names))).all())
+    return build_timeseries(window, rows)
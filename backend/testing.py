@@ -0,0 +1,43 @@
+"""Helpers for exercising the backend from test suites."""
+from __future__ import annotations
+
+from typing import Any, Callable, Iterable, List, Tuple
+
+from .database import capture_queries
+
+
+def query_counts_by_size(
+    call: Callable[[], Any],
+    seed: Callable[[int], None],
+    sizes: Iterable[int] = (2, 20),
+) -> List[Tuple[int, int]]:
+    """Seed the database to each size in turn and record how many queries ``call`` issues."""
+
+    counts = []
+    for size in sizes:
+        seed(size)
+        with capture_queries() as stats:
+            call()
+        counts.append((size, stats.count))
+    return counts
+
+
+def assert_no_n_plus_one(
+    call: Callable[[], Any],
+    seed: Callable[[int], None],
+    sizes: Iterable[int] = (2, 20),
+    allowed_growth: int = 0,
+) -> None:
+    """Fail when ``call``'s query count grows with the amount of seeded data (an N+1 pattern).
+
+    ``seed(n)`` must leave the database holding ``n`` rows for the route under test
+    (it is called once per size, smallest first). ``call`` performs the request,
+    e.g. ``lambda: client.get("/progress/", headers=auth)``.
+    """
+
+    counts = query_counts_by_size(call, seed, sizes)
+    baseline = counts[0][1]
+    for size, count in counts[1:]:
+        if count - baseline > allowed_growth:
+            detail = ", ".join(f"{rows} rows -> {queries} queries" for rows, queries in counts)
+            raise AssertionError(f"Query count grows with result size (possible N+1): {detail}")
@@ -55,9 +55,9 @@ function App() {
   useEffect(() => {
     const loadConfig = async () => {
       try {
-        const response = await fetch('/config/settings.json', { cache: 'no-store' })
+        const response = await fetch('/bootstrap/config')
         if (!response.ok) {
-          throw new Error('Unable to load shared configuration file.')
+          throw new Error('Unable to load the portal configuration.')
         }
         const data = await response.json()
         setConfig(data)
@@ -77,12 +77,16 @@ function App() {
       setDashboardLoading(true)
       setBootstrapError('')
       try {
-        await Promise.all([
-          refreshProfile(),
-          refreshProgress(),
-          refreshMessages(),
-          refreshAnalytics(),
-        ])
+        const response = await authorizedFetch('/bootstrap?history_limit=100')
+        const data = await response.json()
+        if (cancelled) {
+          return
+        }
+        setUser(data.user)
+        applyProgress(data.progress)
+        setMessages(data.messages ?? [])
+        setAnalytics(data.analytics)
+        setConfig(data.config)
       } catch (error) {
         if (!cancelled) {
           setBootstrapError(error.message)
@@ -116,18 +120,15 @@ function App() {
     return response
   }
 
-  const refreshProfile = async () => {
-    const response = await authorizedFetch('/auth/me')
-    const data = await response.json()
-    setUser(data)
+  const applyProgress = (data) => {
+    setTasks(data.tasks ?? [])
+    setOverallProgress(Math.round(Number(data.overall_progress ?? 0)))
+    setEvents(data.events ?? [])
   }
 
   const refreshProgress = async () => {
     const response = await authorizedFetch('/progress/')
-    const data = await response.json()
-    setTasks(data.tasks ?? [])
-    setOverallProgress(Math.round(Number(data.overall_progress ?? 0)))
-    setEvents(data.events ?? [])
+    applyProgress(await response.json())
   }
 
   const refreshAnalytics = async () => {
@@ -136,12 +137,6 @@ function App() {
     setAnalytics(data)
   }
 
-  const refreshMessages = async () => {
-    const response = await authorizedFetch('/chat/history?limit=100')
-    const data = await response.json()
-    setMessages(data)
-  }
-
   const loginRequest = async (payload) => {
     const response = await fetch(buildUrl('/auth/login'), {
       method: 'POST',
@@ -20,7 +20,7 @@ try {
 const devPort = shared?.frontend?.dev_server_port ?? 5173
 const apiBase = shared?.api?.base_url ?? 'http://localhost:8000'
 
-const proxiedPaths = ['/auth', '/chat', '/progress', '/config', '/media']
+const proxiedPaths = ['/auth', '/chat', '/progress', '/bootstrap', '/media']
 const proxy = Object.fromEntries(
   proxiedPaths.map((path) => [
     path,
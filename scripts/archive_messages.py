@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Move old chat messages into the compressed cold tier")
+    parser.add_argument(
+        "--older-than-days",
+        type=int,
+        help="Archive complete days older than this many days (default: archive.older_than_days)",
+    )
+    parser.add_argument("--dry-run", action="store_true", help="Report what would be archived without changing data")
+    parser.add_argument("--vacuum", action="store_true", help="Run VACUUM afterwards so SQLite returns freed pages")
+    args = parser.parse_args()
+    if args.older_than_days is not None and args.older_than_days < 1:
+        parser.error("--older-than-days must be at least 1")
+
+    from backend.database import SessionLocal
+    from backend.migrate import ensure_migrated
+    from backend.services import archive
+
+    ensure_migrated()
+    with SessionLocal() as session:
+        report = archive.archive_old_messages(
+            session, older_than_days=args.older_than_days, dry_run=args.dry_run, vacuum=args.vacuum
+        )
+    for line in archive.describe(report):
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from datetime import datetime
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+DATASETS = ("events", "messages")
+
+
+def parse_timestamp(value: str) -> datetime:
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(f"Invalid ISO-8601 timestamp: {value}") from exc
+
+
+def export_history(args: argparse.Namespace) -> int:
+    from backend.database import read_session_scope
+    from backend.services import exporter
+
+    filters = exporter.ExportFilters(
+        since=args.since,
+        until=args.until,
+        task_name=args.task,
+        username=args.user,
+    )
+    if args.dataset == "events":
+        columns, build_rows = exporter.EVENT_COLUMNS, exporter.task_event_rows
+    else:
+        columns, build_rows = exporter.MESSAGE_COLUMNS, exporter.message_rows
+
+    written = 0
+    output = open(args.output, "wb") if args.output != "-" else sys.stdout.buffer
+    try:
+        with read_session_scope() as session:
+            rows = build_rows(session, filters)
+            for chunk in exporter.encode_rows(columns, rows, export_format=args.format, compress=args.gzip):
+                output.write(chunk)
+                written += len(chunk)
+    finally:
+        if output is not sys.stdout.buffer:
+            output.close()
+    return written
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Stream task events or chat history out of the Requiem database")
+    parser.add_argument("dataset", choices=DATASETS, help="Which history to export")
+    parser.add_argument("--format", choices=("csv", "ndjson"), default="ndjson", help="Output format (default: ndjson)")
+    parser.add_argument("--gzip", action="store_true", help="Compress the output with gzip")
+    parser.add_argument("--since", type=parse_timestamp, help="Only include rows created at or after this time")
+    parser.add_argument("--until", type=parse_timestamp, help="Only include rows created before this time")
+    parser.add_argument("--task", help="Restrict task events to a single task name")
+    parser.add_argument("--user", help="Restrict chat messages to a single username")
+    parser.add_argument("-o", "--output", default="-", help="Destination file (default: stdout)")
+    args = parser.parse_args()
+
+    if args.task and args.dataset != "events":
+        parser.error("--task only applies to the events dataset")
+    if args.user and args.dataset != "messages":
+        parser.error("--user only applies to the messages dataset")
+
+    written = export_history(args)
+    if args.output != "-":
+        print(f"Wrote {written} bytes to {args.output}.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator
+
+
+@dataclass(slots=True)
+class FakeLLMConfig:
+    """Behaviour knobs for the local OpenAI/Ollama stand-in."""
+
+    latency_ms: float = 150.0
+    jitter_ms: float = 50.0
+    error_rate: float = 0.0
+    stream_chunk_delay_ms: float = 10.0
+    reply_words: int = 40
+    seed: int | None = None
+
+
+def _reply_text(prompt: str, words: int) -> str:
+    vocabulary = ("nebula", "oracle", "midnight", "signal", "cycle", "echo", "vector", "beacon", "drift")
+    body = " ".join(vocabulary[index % len(vocabulary)] for index in range(words))
+    return f"Stand-in reply to '{prompt[:40]}': {body}."
+
+
+def _last_user_prompt(payload: Dict[str, Any]) -> str:
+    for message in reversed(payload.get("messages") or []):
+        if message.get("role") == "user":
+            return str(message.get("content", ""))
+    return ""
+
+
+def _make_handler(config: FakeLLMConfig, rng: random.Random, lock: threading.Lock) -> type:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format: str, *args: Any) -> None:  # noqa: A002 - stdlib signature
+            return
+
+        def _sleep_latency(self) -> bool:
+            with lock:
+                delay = max(0.0, rng.gauss(config.latency_ms, config.jitter_ms)) / 1000
+                failed = rng.random() < config.error_rate
+            time.sleep(delay)
+            return failed
+
+        def _send_json(self, status: int, body: Dict[str, Any]) -> None:
+            encoded = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(encoded)))
+            self.end_headers()
+            self.wfile.write(encoded)
+
+        def _send_stream(self, content_type: str, chunks: Iterator[bytes]) -> None:
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for chunk in chunks:
+                self.wfile.write(f"{len(chunk):X}\r\n".encode("ascii") + chunk + b"\r\n")
+                self.wfile.flush()
+                time.sleep(config.stream_chunk_delay_ms / 1000)
+            self.wfile.write(b"0\r\n\r\n")
+
+        def do_POST(self) -> None:  # noqa: N802 - stdlib naming
+            length = int(self.headers.get("Content-Length") or 0)
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            if self._sleep_latency():
+                self._send_json(500, {"error": {"message": "injected failure", "type": "server_error"}})
+                return
+
+            prompt = _last_user_prompt(payload)
+            reply = _reply_text(prompt, config.reply_words)
+            model = payload.get("model", "stand-in")
+            prompt_tokens = max(1, len(prompt.split()))
+            completion_tokens = len(reply.split())
+            words = reply.split(" ")
+
+            if self.path.rstrip("/").endswith("/chat/completions"):
+                if payload.get("stream"):
+                    def sse() -> Iterator[bytes]:
+                        for word in words:
+                            delta = {"choices": [{"delta": {"content": word + " "}}]}
+                            yield f"data: {json.dumps(delta)}\n\n".encode("utf-8")
+                        yield b"data: [DONE]\n\n"
+
+                    self._send_stream("text/event-stream", sse())
+                    return
+                self._send_json(
+                    200,
+                    {
+                        "id": "chatcmpl-standin",
+                        "object": "chat.completion",
+                        "model": model,
+                        "choices": [{"index": 0, "message": {"role": "assistant", "content": reply}}],
+                        "usage": {
+                            "prompt_tokens": prompt_tokens,
+                            "completion_tokens": completion_tokens,
+                            "total_tokens": prompt_tokens + completion_tokens,
+                        },
+                    },
+                )
+                return
+
+            if self.path.rstrip("/").endswith("/api/chat"):
+                if payload.get("stream", True):
+                    def ndjson() -> Iterator[bytes]:
+                        for word in words:
+                            piece = {"model": model, "message": {"role": "assistant", "content": word + " "}, "done": False}
+                            yield (json.dumps(piece) + "\n").encode("utf-8")
+                        final = {
+                            "model": model,
+                            "done": True,
+                            "prompt_eval_count": prompt_tokens,
+                            "eval_count": completion_tokens,
+                        }
+                        yield (json.dumps(final) + "\n").encode("utf-8")
+
+                    self._send_stream("application/x-ndjson", ndjson())
+                    return
+                self._send_json(
+                    200,
+                    {
+                        "model": model,
+                        "message": {"role": "assistant", "content": reply},
+                        "done": True,
+                        "prompt_eval_count": prompt_tokens,
+                        "eval_count": completion_tokens,
+                        "eval_duration": int(completion_tokens * 20_000_000),
+                    },
+                )
+                return
+
+            self._send_json(404, {"error": {"message": f"unknown path {self.path}"}})
+
+    return Handler
+
+
+class FakeLLMServer:
+    """Threaded HTTP server answering OpenAI- and Ollama-style chat requests."""
+
+    def __init__(self, config: FakeLLMConfig, host: str = "127.0.0.1", port: int = 0) -> None:
+        handler = _make_handler(config, random.Random(config.seed), threading.Lock())
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeLLMServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-llm", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run a local OpenAI/Ollama stand-in with injectable latency and errors")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--latency-ms", type=float, default=150.0)
+    parser.add_argument("--jitter-ms", type=float, default=50.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--stream-chunk-delay-ms", type=float, default=10.0)
+    parser.add_argument("--reply-words", type=int, default=40)
+    args = parser.parse_args()
+
+    server = FakeLLMServer(
+        FakeLLMConfig(
+            latency_ms=args.latency_ms,
+            jitter_ms=args.jitter_ms,
+            error_rate=args.error_rate,
+            stream_chunk_delay_ms=args.stream_chunk_delay_ms,
+            reply_words=args.reply_words,
+        ),
+        host=args.host,
+        port=args.port,
+    ).start()
+    print(f"Fake LLM listening on {server.base_url} (OpenAI: /v1/chat/completions, Ollama: /api/chat)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
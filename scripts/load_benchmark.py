@@ -0,0 +1,343 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import socket
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+
+ROOT = Path(__file__).resolve().parent.parent
+CONFIG_PATH = ROOT / "config" / "settings.json"
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "load_baseline.json"
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from fake_llm_server import FakeLLMConfig, FakeLLMServer  # noqa: E402 - sibling script module
+
+DEFAULT_MIX = "login=1,chat=3,progress=4,analytics=2,events=1,metrics=1"
+BENCH_PASSWORD = "benchmark-password"
+
+ENDPOINTS = {
+    "login": ("POST", "/auth/login"),
+    "chat": ("POST", "/chat/message"),
+    "progress": ("GET", "/progress/"),
+    "analytics": ("GET", "/progress/analytics"),
+    "events": ("POST", "/progress/events"),
+    "metrics": ("GET", "/monitoring/metrics"),
+}
+
+
+@dataclass(slots=True)
+class EndpointStats:
+    latencies: List[float] = field(default_factory=list)
+    errors: int = 0
+
+    def summary(self, elapsed: float) -> Dict[str, float]:
+        ordered = sorted(self.latencies)
+        total = len(ordered) + self.errors
+        return {
+            "requests": total,
+            "errors": self.errors,
+            "error_rate": round(self.errors / total, 4) if total else 0.0,
+            "throughput_rps": round(len(ordered) / elapsed, 2) if elapsed else 0.0,
+            "p50_ms": _percentile(ordered, 50),
+            "p95_ms": _percentile(ordered, 95),
+            "p99_ms": _percentile(ordered, 99),
+        }
+
+
+def _percentile(ordered: List[float], pct: float) -> float:
+    if not ordered:
+        return 0.0
+    index = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+    return round(ordered[index] * 1000, 2)
+
+
+def parse_mix(raw: str) -> List[Tuple[str, float]]:
+    mix = []
+    for part in raw.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f"Unknown endpoint '{name}' in mix (choose from {', '.join(ENDPOINTS)})")
+        mix.append((name, float(weight or 1)))
+    return mix
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def write_bench_settings(scratch: Path, provider: str, llm_url: str) -> Path:
+    with CONFIG_PATH.open("r", encoding="utf-8") as config_file:
+        data = json.load(config_file)
+
+    data["database"]["url"] = f"sqlite:///{(scratch / 'bench.db').as_posix()}"
+    data["database"]["read_url"] = ""
+    data["files"] = {"media_root": str(scratch / "media"), "profile_pictures": str(scratch / "media" / "profile_pics")}
+    data.setdefault("telemetry_agent", {})["enabled"] = False
+    chat = data.setdefault("chat", {})
+    chat["provider"] = provider
+    providers = chat.setdefault("providers", {})
+    providers.setdefault("openai", {}).update({"api_key": "bench-key", "base_url": f"{llm_url}/v1/chat/completions"})
+    providers.setdefault("ollama", {}).update({"base_url": llm_url})
+
+    path = scratch / "settings.json"
+    path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+    return path
+
+
+def seed_database(users: int, events: int, messages: int) -> List[str]:
+    from sqlalchemy import insert
+
+    from backend import auth, models
+    from backend.database import session_scope
+    from backend.migrate import run_migrations
+
+    run_migrations(force=True)
+    password_hash = auth.get_password_hash(BENCH_PASSWORD)
+    usernames = [f"bench{index:03d}" for index in range(users)]
+    now = datetime.utcnow()
+    rng = random.Random(7)
+
+    with session_scope() as session:
+        session.add_all(
+            models.User(username=name, email=f"{name}@bench.local", hashed_password=password_hash)
+            for name in usernames
+        )
+        session.flush()
+        user_ids = [user.id for user in session.query(models.User).all()]
+        task_ids = [task.id for task in session.query(models.Task).all()]
+
+        if task_ids and events:
+            session.execute(
+                insert(models.TaskEvent),
+                [
+                    {
+                        "task_id": rng.choice(task_ids),
+                        "progress": rng.randint(0, 100),
+                        "source": rng.choice(("api", "chat-annotation", "automation-pipeline")),
+                        "note": "seeded",
+                        "created_at": now - timedelta(seconds=events - index),
+                    }
+                    for index in range(events)
+                ],
+            )
+        if user_ids and messages:
+            session.execute(
+                insert(models.Message),
+                [
+                    {
+                        "user_id": rng.choice(user_ids),
+                        "role": "user" if index % 2 == 0 else "ai",
+                        "content": f"Seeded message {index} about the midnight build.",
+                        "created_at": now - timedelta(seconds=messages - index),
+                    }
+                    for index in range(messages)
+                ],
+            )
+    return usernames
+
+
+class InProcessServer:
+    def __init__(self, port: int) -> None:
+        import uvicorn
+
+        from backend.main import app
+
+        self._server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+        self._thread = threading.Thread(target=self._server.run, name="bench-uvicorn", daemon=True)
+        self.base_url = f"http://127.0.0.1:{port}"
+
+    def start(self, timeout: float = 30.0) -> None:
+        self._thread.start()
+        deadline = time.monotonic() + timeout
+        while not self._server.started:
+            if time.monotonic() > deadline or not self._thread.is_alive():
+                raise RuntimeError("In-process uvicorn failed to start")
+            time.sleep(0.05)
+
+    def stop(self) -> None:
+        self._server.should_exit = True
+        self._thread.join(timeout=15)
+
+
+async def _login(client, username: str) -> str:
+    response = await client.post("/auth/login", data={"username": username, "password": BENCH_PASSWORD})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def run_load(
+    base_url: str,
+    usernames: List[str],
+    mix: List[Tuple[str, float]],
+    concurrency: int,
+    duration: float,
+) -> Tuple[Dict[str, EndpointStats], float]:
+    import httpx
+
+    stats: Dict[str, EndpointStats] = defaultdict(EndpointStats)
+    names = [name for name, _ in mix]
+    weights = [weight for _, weight in mix]
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        tokens = {name: await _login(client, name) for name in usernames}
+
+        async def virtual_user(index: int, deadline: float) -> None:
+            rng = random.Random(index)
+            username = usernames[index % len(usernames)]
+            while time.perf_counter() < deadline:
+                name = rng.choices(names, weights)[0]
+                headers = {"Authorization": f"Bearer {tokens[username]}"}
+                started = time.perf_counter()
+                try:
+                    if name == "login":
+                        response = await client.post(
+                            "/auth/login", data={"username": username, "password": BENCH_PASSWORD}
+                        )
+                    elif name == "chat":
+                        content = f"Status check {rng.randint(1, 10_000)}"
+                        if rng.random() < 0.2:
+                            content += f" [progress|Bench Task {rng.randint(1, 5)}|{rng.randint(0, 100)}]"
+                        response = await client.post("/chat/message", json={"content": content}, headers=headers)
+                    elif name == "events":
+                        response = await client.post(
+                            "/progress/events",
+                            json={"task_name": f"Bench Task {rng.randint(1, 5)}", "progress": rng.randint(0, 100)},
+                            headers=headers,
+                        )
+                    else:
+                        response = await client.get(ENDPOINTS[name][1], headers=headers)
+                    ok = response.status_code < 400
+                except httpx.HTTPError:
+                    ok = False
+                elapsed = time.perf_counter() - started
+                label = " ".join(ENDPOINTS[name])
+                if ok:
+                    stats[label].latencies.append(elapsed)
+                else:
+                    stats[label].errors += 1
+
+        started = time.perf_counter()
+        deadline = started + duration
+        await asyncio.gather(*(virtual_user(index, deadline) for index in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return stats, elapsed
+
+
+def compare_to_baseline(
+    report: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], tolerance: float
+) -> List[str]:
+    regressions = []
+    for label, previous in baseline.items():
+        current = report.get(label)
+        if current is None:
+            continue
+        if previous.get("p95_ms") and current["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{label}: p95 {current['p95_ms']}ms vs baseline {previous['p95_ms']}ms")
+        if previous.get("throughput_rps") and current["throughput_rps"] < previous["throughput_rps"] * (1 - tolerance):
+            regressions.append(
+                f"{label}: throughput {current['throughput_rps']} rps vs baseline {previous['throughput_rps']} rps"
+            )
+        if current["error_rate"] > previous.get("error_rate", 0.0) + 0.01:
+            regressions.append(f"{label}: error rate {current['error_rate']} vs baseline {previous.get('error_rate', 0.0)}")
+    return regressions
+
+
+def print_report(report: Dict[str, Dict[str, float]]) -> None:
+    header = f"{'endpoint':<26}{'reqs':>7}{'errs':>6}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+    print(header)
+    print("-" * len(header))
+    for label in sorted(report):
+        row = report[label]
+        print(
+            f"{label:<26}{row['requests']:>7}{row['errors']:>6}{row['throughput_rps']:>9}"
+            f"{row['p50_ms']:>10}{row['p95_ms']:>10}{row['p99_ms']:>10}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="End-to-end HTTP load benchmark against an in-process backend")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds of load to generate (default: 20)")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent virtual users (default: 16)")
+    parser.add_argument("--users", type=int, default=8, help="Distinct seeded accounts (default: 8)")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX), help=f"Weighted endpoint mix (default: {DEFAULT_MIX})")
+    parser.add_argument("--seed-events", type=int, default=5000, help="Task events to seed (default: 5000)")
+    parser.add_argument("--seed-messages", type=int, default=2000, help="Chat messages to seed (default: 2000)")
+    parser.add_argument("--provider", choices=("template", "openai", "ollama"), default="openai")
+    parser.add_argument("--llm-latency-ms", type=float, default=150.0)
+    parser.add_argument("--llm-jitter-ms", type=float, default=50.0)
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--llm-stream-chunk-delay-ms", type=float, default=10.0)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="Baseline file to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Write this run's results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression (default: 0.2)")
+    parser.add_argument("--json", type=Path, help="Also write the report to this file")
+    args = parser.parse_args()
+
+    llm = FakeLLMServer(
+        FakeLLMConfig(
+            latency_ms=args.llm_latency_ms,
+            jitter_ms=args.llm_jitter_ms,
+            error_rate=args.llm_error_rate,
+            stream_chunk_delay_ms=args.llm_stream_chunk_delay_ms,
+            seed=1,
+        )
+    ).start()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        os.environ["REQUIEM_SETTINGS_PATH"] = str(write_bench_settings(Path(scratch), args.provider, llm.base_url))
+        usernames = seed_database(max(1, args.users), args.seed_events, args.seed_messages)
+        server = InProcessServer(_free_port())
+        server.start()
+        try:
+            stats, elapsed = asyncio.run(
+                run_load(server.base_url, usernames, args.mix, max(1, args.concurrency), args.duration)
+            )
+        finally:
+            server.stop()
+            llm.stop()
+            from backend.database import engine, read_engine
+
+            engine.dispose()
+            read_engine.dispose()
+
+    report = {label: entry.summary(elapsed) for label, entry in stats.items()}
+    print_report(report)
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        print(f"Baseline written to {args.baseline}.")
+        return
+
+    if args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        regressions = compare_to_baseline(report, baseline, args.tolerance)
+        if regressions:
+            print("Regressions against baseline:", file=sys.stderr)
+            for line in regressions:
+                print(f"  - {line}", file=sys.stderr)
+            sys.exit(1)
+        print(f"No regressions against {args.baseline} (tolerance {args.tolerance:.0%}).")
+
+
+if __name__ == "__main__":
+    main()
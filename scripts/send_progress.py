@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import argparse
+import socket
+import sys
+import time
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Send progress pings to the local ingest socket")
+    parser.add_argument("task", help="Task name")
+    parser.add_argument("progress", type=int, help="Progress value (0-100)")
+    parser.add_argument("--note", default="", help="Optional note stored with the event")
+    parser.add_argument("--host", help="UDP host (default: ingest.udp_host)")
+    parser.add_argument("--port", type=int, help="UDP port (default: ingest.udp_port)")
+    parser.add_argument("--unix-socket", help="Send to this Unix datagram socket instead of UDP")
+    parser.add_argument(
+        "--repeat", type=int, default=1, help="Send this many pings, counting progress up to the given value"
+    )
+    args = parser.parse_args()
+    if "|" in args.task or "\n" in args.task:
+        parser.error("task names cannot contain '|' or newlines")
+
+    from backend.services.ingest import IngestConfig
+
+    config = IngestConfig.from_settings()
+    if args.unix_socket:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        address: object = args.unix_socket
+    else:
+        host = args.host or config.udp_host
+        sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_DGRAM)
+        address = (host, args.port or config.udp_port)
+
+    repeat = max(1, args.repeat)
+    start = time.perf_counter()
+    with sock:
+        for index in range(repeat):
+            value = args.progress if repeat == 1 else round(args.progress * (index + 1) / repeat)
+            sock.sendto(f"{args.task}|{value}|{args.note}".encode("utf-8"), address)
+    elapsed = time.perf_counter() - start
+    print(f"Sent {repeat} pings to {address} in {elapsed * 1000:.1f} ms.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import random
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, List
+
+from sqlalchemy import create_engine, desc, insert, select
+from sqlalchemy.orm import Session, joinedload, lazyload
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from backend import models, schemas  # noqa: E402
+from backend.services import analytics, progress_tracker, serialization  # noqa: E402
+
+SOURCES = ("auto-telemetry", "chat-annotation", "manual-update", "api")
+
+
+def seed(session: Session, tasks: int, events: int, messages: int) -> int:
+    started = datetime.utcnow() - timedelta(days=30)
+    rng = random.Random(7)
+    session.execute(insert(models.User), [{"username": "bench", "email": "bench@example.com", "hashed_password": "x"}])
+    session.execute(
+        insert(models.Task),
+        [
+            {"name": f"Task {index:04d}", "progress": rng.randint(0, 100), "description": f"Benchmark task {index}"}
+            for index in range(tasks)
+        ],
+    )
+    session.execute(
+        insert(models.TaskEvent),
+        [
+            {
+                "task_id": rng.randint(1, tasks),
+                "progress": rng.randint(0, 100),
+                "source": rng.choice(SOURCES),
+                "note": f"Synthetic event {index}",
+                "created_at": started + timedelta(seconds=index * 7),
+            }
+            for index in range(events)
+        ],
+    )
+    session.execute(
+        insert(models.Message),
+        [
+            {
+                "user_id": 1,
+                "role": "user" if index % 2 == 0 else "ai",
+                "content": f"Benchmark message {index} " + "lorem ipsum " * 20,
+                "created_at": started + timedelta(seconds=index),
+            }
+            for index in range(messages)
+        ],
+    )
+    session.commit()
+    return 1
+
+
+# Previous request paths: ORM objects validated through the response models and
+# encoded with the standard library, as FastAPI does for ``response_model`` routes.
+def progress_before(session: Session, limit: int) -> bytes:
+    tasks = list(session.scalars(select(models.Task).options(lazyload(models.Task.events)).order_by(models.Task.id)))
+    events = list(
+        session.scalars(
+            select(models.TaskEvent)
+            .options(joinedload(models.TaskEvent.task).lazyload(models.Task.events))
+            .order_by(models.TaskEvent.created_at.desc())
+            .limit(limit)
+        )
+    )
+    report = schemas.ProgressReport(
+        tasks=tasks, events=events, overall_progress=progress_tracker.calculate_overall_progress(tasks)
+    )
+    return json.dumps(report.model_dump(mode="json")).encode("utf-8")
+
+
+def analytics_before(session: Session) -> bytes:
+    tasks = list(session.scalars(select(models.Task).options(lazyload(models.Task.events)).order_by(models.Task.id)))
+    events = list(session.scalars(select(models.TaskEvent).order_by(models.TaskEvent.created_at)))
+    result = analytics.summarize_progress(tasks, events)
+    payload = asdict(result)
+    payload["per_task"] = [asdict(entry) for entry in result.per_task]
+    return json.dumps(schemas.ProgressAnalytics(**payload).model_dump(mode="json")).encode("utf-8")
+
+
+def history_before(session: Session, user_id: int, limit: int) -> bytes:
+    messages = list(
+        session.scalars(
+            select(models.Message)
+            .where(models.Message.user_id == user_id)
+            .order_by(desc(models.Message.created_at))
+            .limit(limit)
+        )
+    )
+    validated = [schemas.MessageResponse.model_validate(message) for message in reversed(messages)]
+    return json.dumps([message.model_dump(mode="json") for message in validated]).encode("utf-8")
+
+
+def progress_after(session: Session, limit: int) -> bytes:
+    tasks = progress_tracker.list_task_rows(session)
+    events = progress_tracker.get_recent_event_rows(session, limit)
+    return serialization.dumps(
+        {
+            "tasks": serialization.rows_to_dicts(tasks),
+            "events": serialization.rows_to_dicts(events),
+            "overall_progress": progress_tracker.calculate_overall_progress(tasks),
+        }
+    )
+
+
+def analytics_after(session: Session) -> bytes:
+    result = analytics.compute_progress_analytics(session)
+    payload = serialization.dataclass_to_dict(result)
+    payload["per_task"] = [serialization.dataclass_to_dict(entry) for entry in result.per_task]
+    return serialization.dumps(payload)
+
+
+def history_after(session: Session, user_id: int, limit: int) -> bytes:
+    message = models.Message
+    rows = session.execute(
+        select(message.content, message.id, message.role, message.created_at)
+        .where(message.user_id == user_id)
+        .order_by(desc(message.created_at))
+        .limit(limit)
+    ).all()
+    return serialization.dumps(serialization.rows_to_dicts(reversed(rows)))
+
+
+def median_ms(factory: Callable[[], Session], run: Callable[[Session], bytes], repeat: int) -> tuple[float, bytes]:
+    samples: List[float] = []
+    body = b""
+    for _ in range(repeat):
+        with factory() as session:
+            started = time.perf_counter()
+            body = run(session)
+            samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples), body
+
+
+def compressed_sizes(body: bytes) -> str:
+    sizes = [f"gzip {len(gzip.compress(body, compresslevel=6)):>9,}"]
+    try:
+        import brotli
+    except ImportError:
+        sizes.append("br n/a")
+    else:
+        sizes.append(f"br {len(brotli.compress(body, quality=4)):>9,}")
+    return "  ".join(sizes)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare ORM+Pydantic and row-tuple JSON paths on large datasets")
+    parser.add_argument("--tasks", type=int, default=500)
+    parser.add_argument("--events", type=int, default=200_000)
+    parser.add_argument("--messages", type=int, default=20_000)
+    parser.add_argument("--event-limit", type=int, default=200, help="Events returned by /progress/")
+    parser.add_argument("--history-limit", type=int, default=200, help="Messages returned by /chat/history")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{Path(directory) / 'bench.db'}")
+        models.Base.metadata.create_all(engine)
+
+        def factory() -> Session:
+            return Session(engine)
+
+        with factory() as session:
+            user_id = seed(session, args.tasks, args.events, args.messages)
+
+        cases = [
+            ("/progress/", lambda s: progress_before(s, args.event_limit), lambda s: progress_after(s, args.event_limit)),
+            ("/progress/analytics", analytics_before, analytics_after),
+            (
+                "/chat/history",
+                lambda s: history_before(s, user_id, args.history_limit),
+                lambda s: history_after(s, user_id, args.history_limit),
+            ),
+        ]
+        print(
+            f"{args.tasks} tasks, {args.events:,} events, {args.messages:,} messages; "
+            f"median of {args.repeat} runs, JSON backend: {serialization._backend()}"
+        )
+        print(f"{'endpoint':<22}{'before ms':>11}{'after ms':>11}{'speedup':>9}{'bytes':>11}  compressed")
+        for label, before, after in cases:
+            before_ms, before_body = median_ms(factory, before, args.repeat)
+            after_ms, after_body = median_ms(factory, after, args.repeat)
+            if json.loads(before_body) != json.loads(after_body):
+                print(f"{label}: payloads differ between paths", file=sys.stderr)
+                sys.exit(1)
+            print(
+                f"{label:<22}{before_ms:>11.1f}{after_ms:>11.1f}{before_ms / after_ms:>8.1f}x"
+                f"{len(after_body):>11,}  {compressed_sizes(after_body)}"
+            )
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parent.parent
+CONFIG_PATH = ROOT / "config" / "settings.json"
+
+_IMPORT_PROBE = (
+    "import time\n"
+    "started = time.perf_counter()\n"
+    "import backend.main\n"
+    "print(time.perf_counter() - started)\n"
+)
+
+
+def load_budgets() -> dict:
+    with CONFIG_PATH.open("r", encoding="utf-8") as config_file:
+        data = json.load(config_file)
+    return data.get("benchmarks", {}).get("startup", {})
+
+
+def measure_import_seconds(runs: int) -> float:
+    """Median wall time to import ``backend.main`` in a fresh interpreter."""
+
+    samples = []
+    for _ in range(runs):
+        completed = subprocess.run(
+            [sys.executable, "-c", _IMPORT_PROBE],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        samples.append(float(completed.stdout.strip().splitlines()[-1]))
+    return statistics.median(samples)
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def measure_first_health_seconds(timeout: float) -> float:
+    """Seconds from spawning uvicorn until ``/health`` first answers 200."""
+
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}/health"
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.main:app", "--host", "127.0.0.1", "--port", str(port)],
+        cwd=ROOT,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        env={**os.environ, "PYTHONUNBUFFERED": "1"},
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            if server.poll() is not None:
+                raise RuntimeError(f"uvicorn exited early with status {server.returncode}")
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except (urllib.error.URLError, ConnectionError, TimeoutError):
+                pass
+            time.sleep(0.02)
+        raise TimeoutError(f"/health did not respond within {timeout} seconds")
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+
+def main() -> None:
+    budgets = load_budgets()
+    parser = argparse.ArgumentParser(description="Measure backend import time and time-to-first-/health")
+    parser.add_argument("--runs", type=int, default=3, help="Import measurements to take (median is reported)")
+    parser.add_argument(
+        "--import-budget",
+        type=float,
+        default=budgets.get("import_budget_seconds"),
+        help="Fail if importing backend.main takes longer than this many seconds",
+    )
+    parser.add_argument(
+        "--health-budget",
+        type=float,
+        default=budgets.get("first_health_budget_seconds"),
+        help="Fail if the first /health response takes longer than this many seconds",
+    )
+    parser.add_argument("--timeout", type=float, default=60.0, help="Give up waiting for /health after this long")
+    args = parser.parse_args()
+
+    import_seconds = measure_import_seconds(max(1, args.runs))
+    health_seconds = measure_first_health_seconds(args.timeout)
+
+    failures = []
+    for label, value, budget in (
+        ("import backend.main", import_seconds, args.import_budget),
+        ("first /health", health_seconds, args.health_budget),
+    ):
+        verdict = ""
+        if budget is not None:
+            verdict = f" (budget {budget:.3f}s)"
+            if value > budget:
+                verdict += " OVER BUDGET"
+                failures.append(label)
+        print(f"{label:<22} {value:8.3f}s{verdict}")
+
+    if failures:
+        print(f"Startup budget exceeded: {', '.join(failures)}.", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
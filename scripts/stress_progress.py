@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+
+def run_stress(workers: int, iterations: int, tasks: int, database_url: str) -> tuple[int, int]:
+    """Hammer ``advance_tasks`` from many threads and return (applied, stored) increments."""
+
+    from sqlalchemy import create_engine, func, select
+    from sqlalchemy.orm import sessionmaker
+
+    from backend import models
+    from backend.database import sync_schema
+    from backend.services import progress_tracker
+
+    engine = create_engine(database_url, connect_args={"check_same_thread": False, "timeout": 60})
+    sync_schema(models.Base.metadata, bind=engine)
+    factory = sessionmaker(bind=engine, autoflush=False)
+
+    with factory() as session:
+        session.add_all(models.Task(name=f"stress-{index}", progress=0) for index in range(tasks))
+        session.commit()
+
+    applied = 0
+    applied_lock = threading.Lock()
+    start = threading.Barrier(workers)
+    failures: list[BaseException] = []
+
+    def worker() -> None:
+        nonlocal applied
+        start.wait()
+        local = 0
+        try:
+            for _ in range(iterations):
+                with factory() as session:
+                    if progress_tracker.advance_next_task(session, step=1) is not None:
+                        local += 1
+                    session.commit()
+        except BaseException as exc:  # noqa: BLE001 - reported by the caller
+            failures.append(exc)
+        with applied_lock:
+            applied += local
+
+    threads = [threading.Thread(target=worker, name=f"stress-{index}") for index in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if failures:
+        raise failures[0]
+
+    with factory() as session:
+        stored = session.execute(select(func.coalesce(func.sum(models.Task.progress), 0))).scalar_one()
+    engine.dispose()
+    return applied, int(stored)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Verify that concurrent progress increments are never lost")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent writer threads (default: 8)")
+    parser.add_argument("--iterations", type=int, default=50, help="Increments attempted per worker (default: 50)")
+    parser.add_argument("--tasks", type=int, default=10, help="Tasks to spread increments across (default: 10)")
+    parser.add_argument("--database-url", help="Database to use (default: a throwaway SQLite file)")
+    args = parser.parse_args()
+
+    capacity = args.tasks * 100
+    if args.workers * args.iterations > capacity:
+        parser.error(f"workers * iterations must not exceed {capacity} so no task saturates at 100%")
+
+    with tempfile.TemporaryDirectory() as scratch:
+        database_url = args.database_url or f"sqlite:///{Path(scratch) / 'stress.db'}"
+        applied, stored = run_stress(args.workers, args.iterations, args.tasks, database_url)
+
+    print(f"Increments applied: {applied}, progress stored: {stored}.")
+    if applied != args.workers * args.iterations or stored != applied:
+        print("Lost updates detected.", file=sys.stderr)
+        sys.exit(1)
+    print("No lost updates.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from backend.services import forecast
+
+
+def _task(**overrides):
+    values = {
+        "progress": 40,
+        "updated_at": datetime(2024, 1, 1, 12, 0),
+        "velocity": 10 / 3600,
+        "velocity_variance": 0.0,
+        "velocity_samples": 5,
+        "velocity_sampled_at": datetime(2024, 1, 1, 12, 0),
+        "velocity_sampled_progress": 40,
+    }
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+def test_open_task_prediction_does_not_drift_with_now():
+    task = _task()
+    sampled_at = task.velocity_sampled_at
+    first = forecast.forecast_for(task, sampled_at + timedelta(minutes=5))
+    later = forecast.forecast_for(task, sampled_at + timedelta(hours=2))
+
+    assert first.predicted_completion_at == later.predicted_completion_at == sampled_at + timedelta(hours=6)
+    assert first.eta_seconds - later.eta_seconds == pytest.approx(timedelta(hours=1, minutes=55).total_seconds())
+
+
+def test_completed_task_reports_when_it_finished():
+    task = _task(progress=100, velocity_sampled_progress=100)
+    first = forecast.forecast_for(task, task.velocity_sampled_at + timedelta(minutes=1))
+    later = forecast.forecast_for(task, task.velocity_sampled_at + timedelta(days=1))
+
+    assert first.predicted_completion_at == later.predicted_completion_at == task.velocity_sampled_at
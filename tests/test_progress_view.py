@@ -0,0 +1,56 @@
+import asyncio
+
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session
+
+from backend.config import get_settings
+from backend.models import Base
+from backend.services import data_version, progress_tracker, progress_view
+
+
+def _report(url, limit):
+    async def run():
+        engine = create_async_engine(url)
+        try:
+            async with AsyncSession(engine) as db:
+                version = data_version.DATA_VERSIONS.current(data_version.PROGRESS_TABLES)
+                return await progress_tracker.progress_report_async(db, limit=limit, data_version=version)
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(run())
+
+
+def _seed(engine, monkeypatch, progress, *, other_worker=False):
+    monkeypatch.setitem(get_settings()._data, "progress", [{"name": "Build", "progress": progress}])
+    with Session(engine) as session, session.begin():
+        progress_tracker.seed_tasks_from_config(session)
+        if other_worker:
+            # The write lands in the database but never reaches this process's read model.
+            session.info.pop(progress_view._PENDING_KEY, None)
+
+
+def test_seed_change_invalidates_read_model(tmp_path, monkeypatch):
+    path = tmp_path / "progress.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    progress_view.get_progress_view.cache_clear()
+    view = progress_view.get_progress_view()
+    limit = view.capacity
+    try:
+        _seed(engine, monkeypatch, 10)
+        report = _report(f"sqlite+aiosqlite:///{path}", limit)
+        assert [task["progress"] for task in report["tasks"]] == [10]
+        before = view.snapshot
+
+        _seed(engine, monkeypatch, 60, other_worker=True)
+        version = data_version.DATA_VERSIONS.current(data_version.PROGRESS_TABLES)
+        assert view.read(limit=limit, data_version=version) is None
+
+        report = _report(f"sqlite+aiosqlite:///{path}", limit)
+        assert [task["progress"] for task in report["tasks"]] == [60]
+        assert view.snapshot is not before
+    finally:
+        progress_view.get_progress_view.cache_clear()
+        engine.dispose()